@@ -0,0 +1,247 @@
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+
+import pandas as pd
+from sqlalchemy import text
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+from datos import RUTA_BASE, RUTA_CACHE, CONSULTA_VENTAS, tipar_ventas, enriquecer_fechas
+from agregaciones import agregar_pandas
+from proyeccion import tabla_proyeccion
+from embebida import engine_sqlite
+from generador import (
+    REGIONES, CATEGORIAS, PRODUCTOS, BASE_VENTAS, FECHAS_CLIENTES, FECHAS_VENDEDORES,
+    tamanos, generar_personas, generar_ventas, bloques_ventas
+)
+
+# ================================
+# BENCHMARK - ANÁLISIS 02-04 A VARIAS ESCALAS
+# ================================
+# Corre sin servidor: genera las tablas de crear.sql en un SQLite local con
+# el mismo generador que crear_datos.py y mide cada operación de 02, 03 y 04.
+# Uso: python benchmarks/bench_escalas.py --escalas 10k 1M 20M [--guardar]
+RUTA_BASES = os.path.join(RUTA_CACHE, 'bench')
+RUTA_LINEA_BASE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'linea_base_escalas.json')
+
+SUFIJOS = {'k': 1_000, 'm': 1_000_000}
+
+
+def filas_escala(escala):
+    escala = escala.lower().replace('_', '')
+    if escala[-1] in SUFIJOS:
+        return int(float(escala[:-1]) * SUFIJOS[escala[-1]])
+    return int(escala)
+
+
+# ================================
+# BASE EMBEBIDA
+# ================================
+def _ddl():
+    with open(os.path.join(RUTA_BASE, 'crear.sql'), encoding='utf-8') as f:
+        ddl = f.read()
+    # Solo los CREATE TABLE, sin la base ni el motor de MySQL
+    return ddl.split('USE ventas_portafolio;')[1].replace('ENGINE=InnoDB', '')
+
+
+def crear_base(ruta, filas, semilla=42, bloque=1_000_000):
+    """SQLite con el esquema de crear.sql y datos de crear_datos.py para `filas` ventas."""
+    n = tamanos(filas / BASE_VENTAS)
+    temporal = ruta + '.tmp'
+    if os.path.exists(temporal):
+        os.remove(temporal)
+    conexion = sqlite3.connect(temporal)
+    conexion.executescript(_ddl())
+    conexion.executemany("INSERT INTO regiones (ID, Nombre) VALUES (?, ?)", list(enumerate(REGIONES, start=1)))
+    conexion.executemany("INSERT INTO categorias (ID, Nombre) VALUES (?, ?)", list(enumerate(CATEGORIAS, start=1)))
+    conexion.executemany("INSERT INTO productos (ID, Nombre, Categoria, Costo, PrecioVenta) VALUES (?, ?, ?, ?, ?)",
+                         [(i, *producto) for i, producto in enumerate(PRODUCTOS, start=1)])
+
+    for tabla, n_filas, semilla_tabla, rango, columna_fecha, con_email in [
+        ('clientes', n['clientes'], semilla, FECHAS_CLIENTES, 'FechaRegistro', True),
+        ('vendedores', n['vendedores'], semilla + 1, FECHAS_VENDEDORES, 'FechaIngreso', False),
+    ]:
+        personas = generar_personas(n_filas, semilla_tabla, rango, con_email=con_email)
+        personas = personas.rename(columns={'Fecha': columna_fecha})
+        personas[columna_fecha] = personas[columna_fecha].dt.strftime('%Y-%m-%d')
+        personas.to_sql(tabla, conexion, if_exists='append', index=False)
+
+    for parte, id_inicial, n_filas in bloques_ventas(n['ventas'], bloque):
+        ventas = generar_ventas(n_filas, semilla, parte, id_inicial, n['clientes'], n['vendedores'])
+        ventas['Fecha'] = ventas['Fecha'].dt.strftime('%Y-%m-%d')
+        ventas.to_sql('ventas', conexion, if_exists='append', index=False, chunksize=100_000)
+    conexion.commit()
+    conexion.close()
+    os.replace(temporal, ruta)
+
+
+# ================================
+# OPERACIONES DE 02, 03 Y 04
+# ================================
+# Cada operación recibe y completa el mismo diccionario de estado, en el
+# orden en que la hacen los scripts en modo pandas.
+def carga(estado, columnas):
+    df = pd.read_sql(text(CONSULTA_VENTAS), estado['engine'])
+    estado['df'] = tipar_ventas(df[columnas])
+
+
+def fechas(estado):
+    estado['df'] = enriquecer_fechas(estado['df'])
+
+
+def resumenes_02(estado):
+    df = estado['df']
+    agregar_pandas(df, [], TotalVenta=('TotalVenta', 'sum'), Ganancia=('Ganancia', 'sum'))
+    agregar_pandas(df, ['Categoria'], Total_Ventas=('TotalVenta', 'sum'),
+                   Total_Ganancia=('Ganancia', 'sum'), Transacciones=('TotalVenta', 'count'))
+    agregar_pandas(df, ['Region'], TotalVenta=('TotalVenta', 'sum'))
+    agregar_pandas(df, ['Año'], TotalVenta=('TotalVenta', 'sum'))
+    estado['ventas_mes'] = agregar_pandas(df, ['Año', 'Mes'], TotalVenta=('TotalVenta', 'sum'))['TotalVenta']
+
+
+def unstack_mes(estado):
+    estado['ventas_mes'].unstack('Año')
+
+
+def categoria_region(estado):
+    estado['cat_region'] = agregar_pandas(estado['df'], ['Region', 'Categoria'],
+                                          TotalVenta=('TotalVenta', 'sum'))['TotalVenta']
+
+
+def unstack_categoria(estado):
+    estado['cat_region'].round(2).unstack()
+
+
+def resumenes_03(estado):
+    df = estado['df']
+    agregar_pandas(df, ['Mes'], {'Año': 2024}, TotalVenta=('TotalVenta', 'sum'))
+    agregar_pandas(df, ['Categoria'], Ventas=('TotalVenta', 'sum'), Ganancia=('Ganancia', 'sum'))
+    agregar_pandas(df, ['Region'], Total_Ventas=('TotalVenta', 'sum'), Transacciones=('TotalVenta', 'count'))
+
+
+def promedio_mensual(estado):
+    mensual = agregar_pandas(estado['df'], ['Año', 'Mes'], TotalVenta=('TotalVenta', 'sum')).reset_index()
+    estado['promedio_mensual'] = mensual.groupby('Mes')['TotalVenta'].mean().round(2)
+
+
+def proyeccion(estado):
+    tabla_proyeccion(estado['promedio_mensual'])
+
+
+COLUMNAS_02 = ['Fecha', 'Cantidad', 'TotalVenta', 'TotalCosto', 'Ganancia', 'Descuento',
+               'Vendedor', 'ApellidoVendedor', 'Region', 'Producto', 'Categoria']
+COLUMNAS_03 = ['Fecha', 'Cantidad', 'TotalVenta', 'TotalCosto', 'Ganancia', 'Descuento',
+               'Region', 'Producto', 'Categoria']
+
+ANALISIS = {
+    '02_analisis_ventas': [
+        ('carga', lambda e: carga(e, COLUMNAS_02)),
+        ('fechas', fechas),
+        ('groupby resúmenes', resumenes_02),
+        ('unstack año x mes', unstack_mes),
+    ],
+    '03_analisis_profundo': [
+        ('carga', lambda e: carga(e, COLUMNAS_03)),
+        ('fechas', fechas),
+        ('groupby categoría x región', categoria_region),
+        ('unstack categoría x región', unstack_categoria),
+        ('groupby resúmenes', resumenes_03),
+        ('promedio mensual', promedio_mensual),
+    ],
+    '04_proyeccion_2025': [
+        ('carga', lambda e: carga(e, ['Fecha', 'TotalVenta'])),
+        ('fechas', fechas),
+        ('promedio mensual', promedio_mensual),
+        ('proyección', proyeccion),
+    ],
+}
+
+
+def medir(engine, analisis, repeticiones):
+    """Mejor tiempo de cada operación y de la suma de punta a punta."""
+    mejores = {}
+    for _ in range(repeticiones):
+        estado = {'engine': engine}
+        total = 0.0
+        for nombre, operacion in ANALISIS[analisis]:
+            inicio = time.perf_counter()
+            operacion(estado)
+            segundos = time.perf_counter() - inicio
+            total += segundos
+            mejores[nombre] = min(mejores.get(nombre, segundos), segundos)
+        mejores['punta a punta'] = min(mejores.get('punta a punta', total), total)
+    return mejores
+
+
+# ================================
+# LÍNEA BASE
+# ================================
+def cargar_linea_base(ruta):
+    if not os.path.exists(ruta):
+        return {}
+    with open(ruta, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def guardar_linea_base(ruta, resultados):
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump(resultados, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Tiempos de 02-04 a varias escalas sobre un SQLite local')
+    parser.add_argument('--escalas', nargs='+', default=['10k', '1M'],
+                        help='Filas de ventas: 10k, 1M, 20M...')
+    parser.add_argument('--analisis', nargs='+', choices=list(ANALISIS), default=list(ANALISIS))
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--linea-base', default=RUTA_LINEA_BASE)
+    parser.add_argument('--guardar', action='store_true', help='Guarda los tiempos como nueva línea base')
+    parser.add_argument('--tolerancia', type=float, default=0.20,
+                        help='Regresión permitida contra la línea base (0.20 = 20%%)')
+    args = parser.parse_args()
+
+    os.makedirs(RUTA_BASES, exist_ok=True)
+    linea_base = cargar_linea_base(args.linea_base)
+    resultados = {}
+    regresiones = []
+
+    for escala in args.escalas:
+        filas = filas_escala(escala)
+        ruta = os.path.join(RUTA_BASES, f'ventas_{filas}_{args.semilla}.db')
+        if not os.path.exists(ruta):
+            inicio = time.perf_counter()
+            crear_base(ruta, filas, args.semilla)
+            print(f"✅ Base de {filas:,} ventas creada en {time.perf_counter() - inicio:.1f} s")
+        engine = engine_sqlite(ruta)
+
+        for analisis in args.analisis:
+            clave = f'{analisis} @ {filas}'
+            resultados[clave] = medir(engine, analisis, args.repeticiones)
+            base = linea_base.get(clave, {})
+            print(f"\n=== {analisis} ({filas:,} ventas) ===")
+            print(f"{'Operación':<28} {'Segundos':>10} {'Filas/s':>14} {'Línea base':>11} {'Cambio':>8}")
+            for operacion, segundos in resultados[clave].items():
+                referencia = base.get(operacion)
+                cambio = ''
+                if referencia:
+                    relativo = segundos / referencia - 1
+                    cambio = f'{relativo:+.0%}'
+                    if relativo > args.tolerancia:
+                        regresiones.append(f'{clave} / {operacion}: {cambio}')
+                print(f"{operacion:<28} {segundos:>10.4f} {filas / max(segundos, 1e-9):>14,.0f} "
+                      f"{'' if referencia is None else f'{referencia:.4f}':>11} {cambio:>8}")
+        engine.dispose()
+
+    if args.guardar:
+        guardar_linea_base(args.linea_base, {**linea_base, **resultados})
+        print(f"\n✅ Línea base guardada en: {args.linea_base}")
+    elif regresiones:
+        print(f"\n⚠️ Regresiones mayores a {args.tolerancia:.0%}:")
+        for regresion in regresiones:
+            print(f"   {regresion}")
+        sys.exit(1)
@@ -0,0 +1,96 @@
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+from sqlalchemy import text
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+from datos import crear_engine, CONSULTA_VENTAS, CONSULTA_CLIENTES_REGION
+from dimensiones import CONSULTA_HECHOS_CLAVES
+from agregaciones import construir_consulta
+
+# ================================
+# BENCHMARK - ESQUEMA ORIGINAL VS OPTIMIZADO
+# ================================
+# Requiere las dos bases en el mismo servidor MySQL/MariaDB:
+#   mysql < crear.sql && python scripts/crear_datos.py --escala 100
+#   mysql < crear_optimizado.sql            (opcional: crear_particiones.sql)
+# Uso: python benchmarks/bench_esquema.py --original ventas_portafolio --optimizada ventas_portafolio_opt
+
+
+def _agregado(por, filtros=None, **agregaciones):
+    consulta, parametros = construir_consulta(por, filtros, **agregaciones)
+    return consulta.text, parametros
+
+
+# Las consultas que ejecutan los scripts, tal cual
+CONSULTAS = {
+    '01 JOIN completo de ventas': (CONSULTA_VENTAS, {}),
+    '01 sincronización incremental': (CONSULTA_VENTAS + " WHERE v.ID > :marca", {'marca': 0}),
+    '01 claves enteras (estrella)': (CONSULTA_HECHOS_CLAVES, {}),
+    '02 ventas por categoría': _agregado(
+        ['Categoria'], Total_Ventas=('TotalVenta', 'sum'), Total_Ganancia=('Ganancia', 'sum'),
+        Transacciones=('TotalVenta', 'count')),
+    '02 ventas por región': _agregado(['Region'], TotalVenta=('TotalVenta', 'sum')),
+    '02 ventas por año y mes': _agregado(['Año', 'Mes'], TotalVenta=('TotalVenta', 'sum')),
+    '03 categoría x región': _agregado(['Region', 'Categoria'], TotalVenta=('TotalVenta', 'sum')),
+    '03 mensual 2024': _agregado(['Mes'], {'Año': 2024}, TotalVenta=('TotalVenta', 'sum')),
+    '03 clientes por región': (CONSULTA_CLIENTES_REGION, {}),
+    '04 serie Fecha/TotalVenta': ("SELECT v.Fecha, (v.Cantidad * v.PrecioVenta) AS TotalVenta FROM ventas v", {}),
+}
+
+
+def medir(engine, sql, parametros, repeticiones):
+    tiempos = []
+    with engine.connect() as conexion:
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            conexion.execute(text(sql), parametros).fetchall()
+            tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos)
+
+
+def explicar(engine, sql, parametros):
+    plan = pd.read_sql(text('EXPLAIN ' + sql), engine, params=parametros)
+    columnas = [c for c in ('table', 'partitions', 'type', 'key', 'rows', 'Extra') if c in plan]
+    return plan[columnas]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compara las consultas de los scripts en dos esquemas')
+    parser.add_argument('--original', default='ventas_portafolio')
+    parser.add_argument('--optimizada', default='ventas_portafolio_opt')
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--sin-explain', action='store_true', help='Solo tiempos, sin planes de ejecución')
+    args = parser.parse_args()
+
+    esquemas = {
+        'original': crear_engine(base=args.original),
+        'optimizado': crear_engine(base=args.optimizada),
+    }
+
+    resultados = []
+    for nombre, (sql, parametros) in CONSULTAS.items():
+        tiempos = {esquema: medir(engine, sql, parametros, args.repeticiones)
+                   for esquema, engine in esquemas.items()}
+        resultados.append({
+            'Consulta': nombre,
+            'Original_s': round(tiempos['original'], 4),
+            'Optimizado_s': round(tiempos['optimizado'], 4),
+            'Mejora_x': round(tiempos['original'] / max(tiempos['optimizado'], 1e-9), 2),
+        })
+
+        if not args.sin_explain:
+            print(f"\n=== {nombre.upper()} ===")
+            for esquema, engine in esquemas.items():
+                print(f"--- {esquema} ---")
+                print(explicar(engine, sql, parametros).to_string(index=False))
+
+    print(f"\n=== TIEMPOS (mejor de {args.repeticiones} repeticiones) ===")
+    print(pd.DataFrame(resultados).to_string(index=False))
+
+    for engine in esquemas.values():
+        engine.dispose()
@@ -0,0 +1,37 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+from datos import crear_engine, leer_hechos, CONSULTA_VENTAS
+from dimensiones import CONSULTA_HECHOS_CLAVES
+
+# ================================
+# BENCHMARK - EXTRACCIÓN PARALELA POR RANGOS DE ID
+# ================================
+# Uso: python benchmarks/bench_extraccion_paralela.py --trabajadores 1 2 4 8
+parser = argparse.ArgumentParser(description='Throughput de la extracción de ventas según trabajadores')
+parser.add_argument('--trabajadores', type=int, nargs='+', default=[1, 2, 4, 8])
+parser.add_argument('--repeticiones', type=int, default=3)
+parser.add_argument('--consulta', choices=['join', 'estrella'], default='join')
+args = parser.parse_args()
+
+consulta = CONSULTA_VENTAS if args.consulta == 'join' else CONSULTA_HECHOS_CLAVES
+
+print(f"{'Trabajadores':>12} {'Filas':>12} {'Segundos':>10} {'Filas/s':>14} {'Speedup':>8}")
+base = None
+for trabajadores in args.trabajadores:
+    engine = crear_engine(pool_size=trabajadores)
+    tiempos = []
+    for _ in range(args.repeticiones):
+        inicio = time.perf_counter()
+        df = leer_hechos(engine, consulta, trabajadores=trabajadores)
+        tiempos.append(time.perf_counter() - inicio)
+    engine.dispose()
+
+    # Se reporta la mejor repetición para descontar el calentamiento del buffer pool
+    segundos = min(tiempos)
+    base = base or segundos
+    print(f"{trabajadores:>12} {len(df):>12,} {segundos:>10.2f} {len(df) / segundos:>14,.0f} {base / segundos:>7.2f}x")
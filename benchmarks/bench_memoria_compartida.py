@@ -0,0 +1,110 @@
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+import datos
+import memoria_compartida
+from agregaciones import agregar_pandas
+from embebida import engine_sqlite
+from memoria_compartida import HechosCompartidos, publicar_hechos
+from bench_escalas import RUTA_BASES, filas_escala, crear_base
+
+# ================================
+# BENCHMARK - MEMORIA POR TRABAJADOR
+# ================================
+# Cada trabajador hace un análisis sobre la tabla de hechos completa, como si
+# 02, 03 y 04 corrieran en procesos separados. En modo 'copia' cada proceso
+# lee el almacén parquet y arma su propio DataFrame; en modo 'compartida' abre
+# las columnas mapeadas de memoria_compartida.py. RSS cuenta en cada proceso
+# las páginas compartidas que tocó, así que la suma que importa es PSS (cada
+# página compartida se reparte entre los procesos que la usan) y la memoria
+# privada. Lee /proc/<pid>/smaps_rollup: solo Linux.
+# Uso: python benchmarks/bench_memoria_compartida.py --escala 1M --trabajadores 1 2 4 8
+DIMENSIONES_ANALISIS = ['Region', 'Categoria', 'Producto', 'Vendedor', 'AñoMes']
+COLUMNAS_ANALISIS = ['Fecha', 'Cantidad', 'TotalVenta', 'Ganancia', *DIMENSIONES_ANALISIS[:-1]]
+
+_df = None
+
+
+def memoria_proceso():
+    """{'Rss', 'Pss', 'Privada'} en MB del proceso actual."""
+    valores = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for linea in f:
+            partes = linea.split()
+            if len(partes) == 3 and partes[2] == 'kB':
+                valores[partes[0].rstrip(':')] = int(partes[1]) / 1024
+    return {'Rss': valores['Rss'], 'Pss': valores['Pss'],
+            'Privada': valores['Private_Clean'] + valores['Private_Dirty']}
+
+
+def _copiar(ruta):
+    # Lo que haría cada proceso sin la tabla compartida: leer y tipar su propia copia
+    global _df
+    _df = datos.enriquecer_fechas(datos.tipar_ventas(pd.read_parquet(ruta, columns=COLUMNAS_ANALISIS)))
+
+
+def _compartir(ruta):
+    global _df
+    _df = HechosCompartidos(ruta).marco()
+
+
+def analizar(numero, espera):
+    dimension = DIMENSIONES_ANALISIS[numero % len(DIMENSIONES_ANALISIS)]
+    agregar_pandas(_df, [dimension], TotalVenta=('TotalVenta', 'sum'), Ganancia=('Ganancia', 'sum'),
+                   Cantidad=('Cantidad', 'sum'))
+    # Se mide con la tarea todavía viva y se espera, para que cada proceso del pool tome una sola
+    memoria = memoria_proceso()
+    time.sleep(espera)
+    return os.getpid(), memoria
+
+
+def medir(modo, trabajadores, espera):
+    if modo == 'compartida':
+        inicializador, argumentos = _compartir, (memoria_compartida.RUTA_COMPARTIDA,)
+    else:
+        inicializador, argumentos = _copiar, (datos.RUTA_ALMACEN,)
+    inicio = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=trabajadores, initializer=inicializador, initargs=argumentos) as ejecutor:
+        resultados = dict(ejecutor.map(analizar, range(trabajadores), [espera] * trabajadores))
+    segundos = time.perf_counter() - inicio
+    total = {clave: sum(m[clave] for m in resultados.values()) for clave in ('Rss', 'Pss', 'Privada')}
+    return len(resultados), total, segundos
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Memoria de los trabajadores con y sin la tabla de hechos compartida')
+    parser.add_argument('--escala', default='1M', help='Filas de ventas: 100k, 1M...')
+    parser.add_argument('--trabajadores', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--espera', type=float, default=0.5, help='Segundos que cada tarea retiene su proceso')
+    args = parser.parse_args()
+
+    filas = filas_escala(args.escala)
+    os.makedirs(RUTA_BASES, exist_ok=True)
+    ruta = os.path.join(RUTA_BASES, f'ventas_{filas}_{args.semilla}.db')
+    if not os.path.exists(ruta):
+        crear_base(ruta, filas, args.semilla)
+
+    # El almacén y la tabla compartida de esta base van aparte, para no pisar los del proyecto
+    prefijo = os.path.join(RUTA_BASES, f'memoria_{filas}_{args.semilla}')
+    datos.RUTA_ALMACEN, datos.RUTA_META = prefijo + '_ventas', prefijo + '_ventas.json'
+    memoria_compartida.RUTA_COMPARTIDA = prefijo + '_hechos'
+    engine = engine_sqlite(ruta)
+    datos.sincronizar_ventas(engine)
+    publicar_hechos(engine)
+    engine.dispose()
+
+    print(f"=== MEMORIA DE LOS TRABAJADORES ({filas:,} ventas) ===")
+    print(f"{'Modo':<11} {'Procesos':>8} {'RSS MB':>9} {'PSS MB':>9} {'Privada MB':>11} {'PSS/proc':>9} {'Segundos':>9}")
+    for modo in ('copia', 'compartida'):
+        for trabajadores in args.trabajadores:
+            procesos, total, segundos = medir(modo, trabajadores, args.espera)
+            print(f"{modo:<11} {procesos:>8} {total['Rss']:>9.1f} {total['Pss']:>9.1f} {total['Privada']:>11.1f} "
+                  f"{total['Pss'] / procesos:>9.1f} {segundos:>9.2f}")
@@ -0,0 +1,63 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+from proyeccion import proyectar, muestrear_escenarios, bandas, factores_estacionales, crecimiento_base
+
+# ================================
+# BENCHMARK - ESCENARIOS DE PROYECCIÓN POR SEGUNDO
+# ================================
+# No necesita base de datos: usa promedios mensuales sintéticos.
+# Uso: python benchmarks/bench_proyeccion.py --escenarios 1000 10000 100000 --series 1 25
+
+
+def bucle_original(promedios, crecimientos, factores):
+    # El cálculo de 04_proyeccion_2025.py antes del motor vectorizado, escenario por escenario
+    resultado = np.empty((len(crecimientos), *promedios.shape))
+    for e, crecimiento in enumerate(crecimientos):
+        for s, promedio_serie in enumerate(promedios):
+            for mes, promedio in enumerate(promedio_serie, start=1):
+                resultado[e, s, mes - 1] = promedio * crecimiento * factores[e, mes - 1]
+    return resultado
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Throughput del motor de proyección')
+    parser.add_argument('--escenarios', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--series', type=int, nargs='+', default=[1, 25, 125])
+    parser.add_argument('--sin-bucle', action='store_true', help='No medir el bucle de Python de referencia')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'Series':>7} {'Escenarios':>11} {'Vectorizado s':>14} {'Escenarios/s':>14} {'Bucle s':>10} {'Speedup':>8}")
+    for series in args.series:
+        promedios = rng.uniform(20_000, 50_000, size=(series, 12))
+        for n in args.escenarios:
+            crecimientos, factores = muestrear_escenarios(n, semilla=1)
+            inicio = time.perf_counter()
+            proyecciones = proyectar(promedios, crecimientos, factores)
+            bandas(proyecciones.sum(axis=2))
+            bandas(proyecciones)
+            vectorizado = time.perf_counter() - inicio
+
+            bucle = ''
+            speedup = ''
+            # El bucle es lento: se mide con una muestra y se extrapola
+            if not args.sin_bucle:
+                muestra = min(n, 200)
+                inicio = time.perf_counter()
+                bucle_original(promedios, crecimientos[:muestra], factores[:muestra])
+                segundos_bucle = (time.perf_counter() - inicio) * n / muestra
+                bucle = f'{segundos_bucle:.3f}'
+                speedup = f'{segundos_bucle / vectorizado:.0f}x'
+            print(f"{series:>7} {n:>11,} {vectorizado:>14.4f} {n / vectorizado:>14,.0f} {bucle:>10} {speedup:>8}")
+
+    # Control: un solo escenario con los factores fijos reproduce la proyección original
+    base = rng.uniform(20_000, 50_000, size=12)
+    factores_fijos = np.array([factores_estacionales[m] for m in range(1, 13)])
+    assert np.allclose(proyectar(base, [crecimiento_base], factores_fijos)[0], base * crecimiento_base * factores_fijos)
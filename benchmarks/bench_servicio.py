@@ -0,0 +1,88 @@
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+import os
+import sys
+import threading
+import time
+import urllib.request
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+from embebida import engine_sqlite
+from servicio_consultas import ServicioAgregados, crear_servidor, ruta_cache_engine
+from bench_escalas import RUTA_BASES, filas_escala, crear_base
+from generador import REGIONES, CATEGORIAS
+
+# ================================
+# BENCHMARK - SERVICIO DE AGREGADOS
+# ================================
+# Levanta el servicio sobre un SQLite local (el mismo de bench_escalas.py) y
+# lo consulta con varios clientes a la vez. La primera pasada resuelve cada
+# consulta; las siguientes deberían salir de la caché de respuestas.
+# Uso: python benchmarks/bench_servicio.py --escala 1M --clientes 8
+
+
+def consultas():
+    """Mezcla de preguntas chicas: cubo (región, categoría, mes) y hechos (vendedor)."""
+    año = quote('Año')
+    urls = []
+    for region in REGIONES:
+        urls.append(f'/agregado?por=Categoria&Region={quote(region)}&{año}=2024&medidas=TotalVenta,Ganancia')
+        urls.append(f'/agregado?por=Vendedor&Region={quote(region)}&medidas=TotalVenta,Transacciones')
+    for categoria in CATEGORIAS:
+        urls.append(f'/agregado?por=Mes&Categoria={quote(categoria)}&{año}=2023,2024')
+    for mes in range(1, 13):
+        urls.append(f'/agregado?por=Region&Mes={mes}&medidas=TotalVenta,Ganancia:mean')
+    return urls
+
+
+def pasada(base, urls, clientes):
+    def pedir(url):
+        inicio = time.perf_counter()
+        with urllib.request.urlopen(base + url) as respuesta:
+            respuesta.read()
+        return time.perf_counter() - inicio
+
+    with ThreadPoolExecutor(max_workers=clientes) as ejecutor:
+        return np.array(list(ejecutor.map(pedir, urls)))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Latencia del servicio de agregados con clientes concurrentes')
+    parser.add_argument('--escala', default='100k', help='Filas de ventas: 10k, 1M...')
+    parser.add_argument('--clientes', type=int, default=8, help='Consultas simultáneas')
+    parser.add_argument('--pasadas', type=int, default=3, help='Pasadas sobre la misma mezcla de consultas')
+    parser.add_argument('--semilla', type=int, default=42)
+    args = parser.parse_args()
+
+    filas = filas_escala(args.escala)
+    os.makedirs(RUTA_BASES, exist_ok=True)
+    ruta = os.path.join(RUTA_BASES, f'ventas_{filas}_{args.semilla}.db')
+    if not os.path.exists(ruta):
+        crear_base(ruta, filas, args.semilla)
+
+    engine = engine_sqlite(ruta)
+    # El cubo y el almacén de esta base van aparte, para no pisar los del proyecto
+    servicio = ServicioAgregados(engine, ruta_cache_engine(engine))
+    servidor = crear_servidor(servicio, puerto=0)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{servidor.server_port}'
+
+    urls = consultas()
+    print(f"=== SERVICIO DE AGREGADOS ({filas:,} ventas, {len(urls)} consultas, {args.clientes} clientes) ===")
+    print(f"{'Pasada':<8} {'p50 ms':>10} {'p99 ms':>10} {'Consultas/s':>12}")
+    for numero in range(1, args.pasadas + 1):
+        inicio = time.perf_counter()
+        tiempos = pasada(base, urls, args.clientes)
+        segundos = time.perf_counter() - inicio
+        print(f"{numero:<8} {np.percentile(tiempos, 50) * 1000:>10.2f} {np.percentile(tiempos, 99) * 1000:>10.2f} "
+              f"{len(urls) / segundos:>12,.0f}")
+
+    metricas = servicio.metricas()
+    print(f"\nEn el servidor: p50 {metricas['latencia_ms']['p50']} ms, p99 {metricas['latencia_ms']['p99']} ms, "
+          f"aciertos de caché {metricas['tasa_aciertos']:.0%}")
+    servidor.shutdown()
+    engine.dispose()
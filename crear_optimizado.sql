@@ -0,0 +1,81 @@
+-- ================================
+-- ESQUEMA OPTIMIZADO
+-- ================================
+-- Mismas tablas que crear.sql, en una base aparte para poder comparar
+-- ambos esquemas con benchmarks/bench_esquema.py. Agrega índices en las
+-- claves de JOIN y en Fecha, llaves foráneas e índices que cubren los
+-- agregados mensuales. Al final copia los datos de ventas_portafolio.
+CREATE DATABASE ventas_portafolio_opt CHARACTER SET utf8mb4;
+USE ventas_portafolio_opt;
+CREATE TABLE regiones (
+    ID INT PRIMARY KEY,
+    Nombre VARCHAR(100)
+) ENGINE=InnoDB;
+CREATE TABLE categorias (
+    ID INT PRIMARY KEY,
+    Nombre VARCHAR(100)
+) ENGINE=InnoDB;
+CREATE TABLE vendedores (
+    ID INT PRIMARY KEY,
+    Nombre VARCHAR(100),
+    Apellido VARCHAR(100),
+    Region INT,
+    FechaIngreso DATE,
+    INDEX idx_vendedores_region (Region),
+    CONSTRAINT fk_vendedores_region FOREIGN KEY (Region) REFERENCES regiones (ID)
+) ENGINE=InnoDB;
+CREATE TABLE clientes (
+    ID INT PRIMARY KEY,
+    Nombre VARCHAR(100),
+    Apellido VARCHAR(100),
+    Email VARCHAR(150),
+    Region INT,
+    FechaRegistro DATE,
+    -- Cubre el conteo de clientes por región de 03_analisis_profundo.py
+    INDEX idx_clientes_region (Region),
+    CONSTRAINT fk_clientes_region FOREIGN KEY (Region) REFERENCES regiones (ID)
+) ENGINE=InnoDB;
+CREATE TABLE productos (
+    ID INT PRIMARY KEY,
+    Nombre VARCHAR(100),
+    Categoria INT,
+    Costo DECIMAL(10,2),
+    PrecioVenta DECIMAL(10,2),
+    INDEX idx_productos_categoria (Categoria),
+    CONSTRAINT fk_productos_categoria FOREIGN KEY (Categoria) REFERENCES categorias (ID)
+) ENGINE=InnoDB;
+CREATE TABLE ventas (
+    ID INT PRIMARY KEY,
+    Fecha DATE NOT NULL,
+    Cliente INT,
+    Producto INT,
+    Vendedor INT,
+    Cantidad INT,
+    PrecioVenta DECIMAL(10,2),
+    Descuento DECIMAL(10,2),
+    TotalVenta DECIMAL(10,2),
+    -- Claves de JOIN
+    INDEX idx_ventas_cliente (Cliente),
+    INDEX idx_ventas_producto (Producto),
+    INDEX idx_ventas_vendedor (Vendedor),
+    -- Filtros por fecha (Año = 2024, rangos del backtesting)
+    INDEX idx_ventas_fecha (Fecha),
+    -- Índice cubriente de los agregados mensuales: la serie Fecha/TotalVenta
+    -- de 04 y los GROUP BY por mes, región y categoría se resuelven sin leer
+    -- las filas de la tabla (InnoDB agrega el ID al final del índice)
+    INDEX idx_ventas_mensual (Fecha, Producto, Vendedor, Cantidad, PrecioVenta),
+    CONSTRAINT fk_ventas_cliente FOREIGN KEY (Cliente) REFERENCES clientes (ID),
+    CONSTRAINT fk_ventas_producto FOREIGN KEY (Producto) REFERENCES productos (ID),
+    CONSTRAINT fk_ventas_vendedor FOREIGN KEY (Vendedor) REFERENCES vendedores (ID)
+) ENGINE=InnoDB;
+
+-- ================================
+-- COPIA DE DATOS DESDE EL ESQUEMA ORIGINAL
+-- ================================
+INSERT INTO regiones SELECT * FROM ventas_portafolio.regiones;
+INSERT INTO categorias SELECT * FROM ventas_portafolio.categorias;
+INSERT INTO vendedores SELECT * FROM ventas_portafolio.vendedores;
+INSERT INTO clientes SELECT * FROM ventas_portafolio.clientes;
+INSERT INTO productos SELECT * FROM ventas_portafolio.productos;
+INSERT INTO ventas SELECT * FROM ventas_portafolio.ventas;
+ANALYZE TABLE regiones, categorias, vendedores, clientes, productos, ventas;
@@ -0,0 +1,27 @@
+-- ================================
+-- PARTICIONES POR AÑO (OPCIONAL)
+-- ================================
+-- Se aplica sobre ventas_portafolio_opt después de crear_optimizado.sql.
+-- MySQL no permite llaves foráneas en tablas particionadas y exige que la
+-- columna de partición forme parte de la llave primaria, por eso se quitan
+-- las FK de ventas y la llave pasa a ser (ID, Fecha). Los filtros por año
+-- leen solo su partición.
+USE ventas_portafolio_opt;
+ALTER TABLE ventas
+    DROP FOREIGN KEY fk_ventas_cliente,
+    DROP FOREIGN KEY fk_ventas_producto,
+    DROP FOREIGN KEY fk_ventas_vendedor;
+ALTER TABLE ventas
+    DROP PRIMARY KEY,
+    ADD PRIMARY KEY (ID, Fecha);
+-- La sincronización incremental filtra por ID > marca de agua
+ALTER TABLE ventas ADD INDEX idx_ventas_id (ID);
+ALTER TABLE ventas
+    PARTITION BY RANGE (YEAR(Fecha)) (
+        PARTITION p2022 VALUES LESS THAN (2023),
+        PARTITION p2023 VALUES LESS THAN (2024),
+        PARTITION p2024 VALUES LESS THAN (2025),
+        PARTITION p2025 VALUES LESS THAN (2026),
+        PARTITION pfuturo VALUES LESS THAN MAXVALUE
+    );
+ANALYZE TABLE ventas;
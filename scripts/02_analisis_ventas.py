@@ -1,57 +1,134 @@
-import pandas as pd
-from sqlalchemy import create_engine
-from urllib.parse import quote_plus
-from dotenv import load_dotenv
-import os
-
-load_dotenv()
-
-password = quote_plus(os.getenv('DB_PASSWORD'))
-engine = create_engine(f'mysql+mysqlconnector://{os.getenv("DB_USER")}:{password}@{os.getenv("DB_HOST")}/{os.getenv("DB_NAME")}')
-
-df_ventas = pd.read_sql("""
-    SELECT 
-        v.Fecha,
-        v.Cantidad,
-        (v.Cantidad * v.PrecioVenta) AS TotalVenta,
-        (v.Cantidad * p.Costo) AS TotalCosto,
-        ((v.Cantidad * v.PrecioVenta) - (v.Cantidad * p.Costo)) AS Ganancia,
-        v.Descuento,
-        vd.Nombre AS Vendedor,
-        vd.Apellido AS ApellidoVendedor,
-        r.Nombre AS Region,
-        p.Nombre AS Producto,
-        cat.Nombre AS Categoria
-    FROM ventas v
-    LEFT JOIN vendedores vd ON v.Vendedor = vd.ID
-    LEFT JOIN productos p ON v.Producto = p.ID
-    LEFT JOIN categorias cat ON p.Categoria = cat.ID
-    LEFT JOIN regiones r ON vd.Region = r.ID
-""", engine)
-
-df_ventas['Fecha'] = pd.to_datetime(df_ventas['Fecha'])
-df_ventas['Año'] = df_ventas['Fecha'].dt.year
-df_ventas['Mes'] = df_ventas['Fecha'].dt.month
-df_ventas['AñoMes'] = df_ventas['Fecha'].dt.to_period('M')
+import argparse
+from datos import crear_engine, cargar_ventas, iterar_ventas, enriquecer_fechas
+from acumuladores import AcumuladorGrupos
+from agregaciones import agregar, agregar_pandas, comparar
+from aproximado import muestrear_ventas, resumir_muestra, error_relativo
+from cubo import actualizar_cubo, resumir_cubo
+from perfilado import etapa
+
+parser = argparse.ArgumentParser(description='Análisis de ventas por categoría, región y año')
+parser.add_argument('--streaming', action='store_true',
+                    help='Lee las ventas por lotes con cursor del servidor, en memoria acotada')
+parser.add_argument('--pushdown', action='store_true',
+                    help='Calcula cada resumen con GROUP BY en MySQL y trae solo el resultado')
+parser.add_argument('--cubo', action='store_true',
+                    help='Responde los resúmenes desde el cubo mensual pre-agregado')
+parser.add_argument('--validar', action='store_true',
+                    help='Compara cada resumen de MySQL contra el cálculo en pandas')
+parser.add_argument('--aproximado', type=float, metavar='FRACCION',
+                    help='Estima los resúmenes con una muestra estratificada de esta fracción de las ventas')
+parser.add_argument('--lote', type=int, default=50_000, help='Filas por lote en modo streaming')
+args = parser.parse_args()
+
+if args.streaming:
+    # ================================
+    # MODO STREAMING - LOTES + ACUMULADORES
+    # ================================
+    engine = crear_engine(driver='pymysql')
+
+    general = AcumuladorGrupos([], TotalVenta=('TotalVenta', 'sum'), Ganancia=('Ganancia', 'sum'))
+    por_categoria = AcumuladorGrupos(
+        ['Categoria'],
+        Total_Ventas=('TotalVenta', 'sum'),
+        Total_Ganancia=('Ganancia', 'sum'),
+        Transacciones=('TotalVenta', 'count')
+    )
+    por_region = AcumuladorGrupos(['Region'], TotalVenta=('TotalVenta', 'sum'))
+    por_año = AcumuladorGrupos(['Año'], TotalVenta=('TotalVenta', 'sum'))
+    por_mes = AcumuladorGrupos(['Año', 'Mes'], TotalVenta=('TotalVenta', 'sum'))
+
+    # Carga, fechas y agregación van intercaladas por lote: se miden juntas
+    with etapa('streaming') as medicion:
+        medicion.filas = 0
+        for lote in iterar_ventas(engine, args.lote):
+            lote = enriquecer_fechas(lote)
+            for acumulador in (general, por_categoria, por_region, por_año, por_mes):
+                acumulador.agregar(lote)
+            medicion.filas += len(lote)
+
+    total_ventas = general.resultado()['TotalVenta'].iloc[0]
+    total_ganancia = general.resultado()['Ganancia'].iloc[0]
+    categoria = por_categoria.resultado().round(2)
+    ventas_region = por_region.resultado()['TotalVenta']
+    ventas_año = por_año.resultado()['TotalVenta']
+    ventas_mes = por_mes.resultado()['TotalVenta']
+else:
+    engine = crear_engine()
+
+    if args.cubo:
+        # Solo se agregan a MySQL las ventas nuevas desde la última actualización
+        with etapa('carga_cubo') as medicion:
+            cubo = actualizar_cubo(engine)
+            medicion.filas = len(cubo)
+    columnas = [
+        'Fecha', 'Cantidad', 'TotalVenta', 'TotalCosto', 'Ganancia', 'Descuento',
+        'Vendedor', 'ApellidoVendedor', 'Region', 'Producto', 'Categoria'
+    ]
+    if args.aproximado:
+        with etapa('muestra') as medicion:
+            df_ventas = muestrear_ventas(engine, args.aproximado, columnas)
+            medicion.filas = len(df_ventas)
+    elif args.validar or not (args.pushdown or args.cubo):
+        with etapa('carga') as medicion:
+            df_ventas = cargar_ventas(engine, columnas=columnas)
+            medicion.filas = len(df_ventas)
+
+    if args.aproximado or args.validar or not (args.pushdown or args.cubo):
+        with etapa('fechas', len(df_ventas)):
+            df_ventas = enriquecer_fechas(df_ventas)
+
+    errores = {}
+
+    def resumir(por, filtros=None, **agregaciones):
+        if args.aproximado:
+            estimacion, error = resumir_muestra(df_ventas, por, filtros, **agregaciones)
+            errores[' x '.join(por) or 'General'] = error_relativo(estimacion, error)
+            return estimacion
+        if args.validar:
+            # Falla si el GROUP BY de MySQL no coincide con pandas
+            return comparar(engine, df_ventas, por, filtros, **agregaciones)
+        if args.cubo:
+            return resumir_cubo(cubo, por, filtros, **agregaciones)
+        if args.pushdown:
+            return agregar(engine, por, filtros, **agregaciones)
+        return agregar_pandas(df_ventas, por, filtros, **agregaciones)
+
+    with etapa('agregacion'):
+        general = resumir([], TotalVenta=('TotalVenta', 'sum'), Ganancia=('Ganancia', 'sum'))
+        total_ventas = general['TotalVenta'].iloc[0]
+        total_ganancia = general['Ganancia'].iloc[0]
+        categoria = resumir(
+            ['Categoria'],
+            Total_Ventas=('TotalVenta', 'sum'),
+            Total_Ganancia=('Ganancia', 'sum'),
+            Transacciones=('TotalVenta', 'count')
+        ).round(2)
+        ventas_region = resumir(['Region'], TotalVenta=('TotalVenta', 'sum'))['TotalVenta']
+        ventas_año = resumir(['Año'], TotalVenta=('TotalVenta', 'sum'))['TotalVenta']
+        ventas_mes = resumir(['Año', 'Mes'], TotalVenta=('TotalVenta', 'sum'))['TotalVenta']
 
 print("=== RESUMEN GENERAL ===")
-print(f"Total ventas: ${df_ventas['TotalVenta'].sum():,.2f}")
-print(f"Total ganancia: ${df_ventas['Ganancia'].sum():,.2f}")
-print(f"Margen general: {(df_ventas['Ganancia'].sum() / df_ventas['TotalVenta'].sum() * 100):.1f}%")
+print(f"Total ventas: ${total_ventas:,.2f}")
+print(f"Total ganancia: ${total_ganancia:,.2f}")
+print(f"Margen general: {(total_ganancia / total_ventas * 100):.1f}%")
 
 print("\n=== VENTAS POR CATEGORÍA ===")
-categoria = df_ventas.groupby('Categoria').agg(
-    Total_Ventas=('TotalVenta', 'sum'),
-    Total_Ganancia=('Ganancia', 'sum'),
-    Transacciones=('TotalVenta', 'count')
-).round(2)
 categoria['Margen_%'] = (categoria['Total_Ganancia'] / categoria['Total_Ventas'] * 100).round(1)
 print(categoria.sort_values('Total_Ventas', ascending=False))
 
 print("\n=== VENTAS POR REGIÓN ===")
-print(df_ventas.groupby('Region')['TotalVenta'].sum().round(2).sort_values(ascending=False))
+print(ventas_region.round(2).sort_values(ascending=False))
 
 print("\n=== VENTAS POR AÑO ===")
-print(df_ventas.groupby('Año')['TotalVenta'].sum().round(2))
+print(ventas_año.round(2))
+
+print("\n=== VENTAS POR MES ===")
+print(ventas_mes.round(2).unstack('Año'))
+
+if not args.streaming and args.aproximado:
+    print(f"\n=== MODO APROXIMADO: MUESTRA DE {len(df_ventas):,} VENTAS ===")
+    print("Mayor margen de error al 95% en cada resumen:")
+    for resumen, porcentaje in errores.items():
+        print(f"   {resumen}: ±{porcentaje:.1f}%")
 
-engine.dispose()
\ No newline at end of file
+engine.dispose()
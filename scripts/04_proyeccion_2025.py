@@ -1,133 +1,115 @@
+import argparse
 import pandas as pd
-from sqlalchemy import create_engine
-from urllib.parse import quote_plus
-from dotenv import load_dotenv
-import os
-import matplotlib.pyplot as plt
-import numpy as np
-
-load_dotenv()
-
-password = quote_plus(os.getenv('DB_PASSWORD'))
-engine = create_engine(f'mysql+mysqlconnector://{os.getenv("DB_USER")}:{password}@{os.getenv("DB_HOST")}/{os.getenv("DB_NAME")}')
-
-df = pd.read_sql("""
-    SELECT 
-        v.Fecha,
-        (v.Cantidad * v.PrecioVenta) AS TotalVenta
-    FROM ventas v
-""", engine)
-
-df['Fecha'] = pd.to_datetime(df['Fecha'])
-df['Año'] = df['Fecha'].dt.year
-df['Mes'] = df['Fecha'].dt.month
-
-# ================================
-# FACTORES ESTACIONALES POR MES
-# ================================
-# Basado en el análisis de temporadas comerciales
-factores_estacionales = {
-    1: 0.90,   # Enero - inicio de año, liquidaciones
-    2: 1.20,   # Febrero - San Valentín, demostró ser fuerte
-    3: 1.05,   # Marzo - Día de la Mujer, oportunidad
-    4: 1.10,   # Abril - Semana Santa
-    5: 1.25,   # Mayo - Día de la Madre, muy fuerte
-    6: 0.95,   # Junio - cayó en 2024, reforzar
-    7: 1.00,   # Julio - vacaciones
-    8: 1.15,   # Agosto - regreso a clases
-    9: 1.05,   # Septiembre - fiestas
-    10: 1.20,  # Octubre - Halloween, demostró ser fuerte
-    11: 1.25,  # Noviembre - Black Friday, oportunidad
-    12: 1.35,  # Diciembre - Navidad, el más fuerte
-}
-
-# ================================
-# PROMEDIO MENSUAL HISTÓRICO
-# ================================
-promedio_mensual = df.groupby(['Año', 'Mes'])['TotalVenta'].sum().reset_index()
-promedio_mensual = promedio_mensual.groupby('Mes')['TotalVenta'].mean().round(2)
-
-# ================================
-# PROYECCIÓN 2025
-# ================================
-# Aplicamos crecimiento del 10% sobre el promedio histórico
-# más los factores estacionales
-crecimiento_base = 1.10
-
-proyeccion_2025 = {}
-for mes, promedio in promedio_mensual.items():
-    proyeccion_2025[mes] = round(promedio * crecimiento_base * factores_estacionales[mes], 2)
-
-df_proyeccion = pd.DataFrame({
-    'Mes': list(proyeccion_2025.keys()),
-    'Proyeccion_2025': list(proyeccion_2025.values()),
-    'Promedio_Historico': promedio_mensual.values
-})
-
-df_proyeccion['Crecimiento_%'] = ((df_proyeccion['Proyeccion_2025'] - df_proyeccion['Promedio_Historico']) / df_proyeccion['Promedio_Historico'] * 100).round(1)
-
-meses_nombres = ['Ene','Feb','Mar','Abr','May','Jun',
-                 'Jul','Ago','Sep','Oct','Nov','Dic']
-df_proyeccion['Mes_Nombre'] = meses_nombres
-
-print("=== PROYECCIÓN DE VENTAS 2025 ===")
-print(df_proyeccion[['Mes_Nombre', 'Promedio_Historico', 'Proyeccion_2025', 'Crecimiento_%']].to_string(index=False))
-print(f"\nTotal proyectado 2025: ${df_proyeccion['Proyeccion_2025'].sum():,.2f}")
-print(f"Total promedio histórico: ${df_proyeccion['Promedio_Historico'].sum():,.2f}")
-print(f"Crecimiento proyectado: {((df_proyeccion['Proyeccion_2025'].sum() / df_proyeccion['Promedio_Historico'].sum()) - 1) * 100:.1f}%")
-
-# ================================
-# VISUALIZACIÓN
-# ================================
-fig, axes = plt.subplots(2, 1, figsize=(14, 12))
-fig.suptitle('Proyección de Ventas 2025', fontsize=16, fontweight='bold')
-
-# GRÁFICA 1 - Barras proyección + línea 2024
-ventas_2024 = df[df['Año'] == 2024].groupby('Mes')['TotalVenta'].sum().round(2)
-
-x = list(range(1, 13))
-ax1 = axes[0]
-ax2 = ax1.twinx()
-
-# Barras
-ax1.bar([i - 0.2 for i in x], df_proyeccion['Promedio_Historico'],
-        width=0.4, label='Promedio Histórico', color='steelblue', alpha=0.7)
-ax1.bar([i + 0.2 for i in x], df_proyeccion['Proyeccion_2025'],
-        width=0.4, label='Proyección 2025', color='orange', alpha=0.7)
-
-# Línea 2024
-ax2.plot(x, ventas_2024.values,
-         marker='D', linewidth=2.5, color='red',
-         label='Real 2024', zorder=5)
-ax2.set_ylabel('Ventas 2024 ($)', color='red')
-ax2.tick_params(axis='y', labelcolor='red')
-
-ax1.set_title('Histórico vs Proyección 2025 vs Real 2024')
-ax1.set_xlabel('Mes')
-ax1.set_ylabel('Ventas ($)')
-ax1.set_xticks(x)
-ax1.set_xticklabels(meses_nombres)
-ax1.grid(True, alpha=0.3)
-
-lines1, labels1 = ax1.get_legend_handles_labels()
-lines2, labels2 = ax2.get_legend_handles_labels()
-ax1.legend(lines1 + lines2, labels1 + labels2, loc='upper left')
-
-# GRÁFICA 2 - Línea de proyección con tendencia
-axes[1].plot(meses_nombres, df_proyeccion['Promedio_Historico'],
-             marker='o', linewidth=2, color='steelblue', label='Promedio Histórico')
-axes[1].plot(meses_nombres, df_proyeccion['Proyeccion_2025'],
-             marker='s', linewidth=2, color='orange', label='Proyección 2025')
-axes[1].fill_between(meses_nombres, df_proyeccion['Promedio_Historico'],
-                     df_proyeccion['Proyeccion_2025'],
-                     alpha=0.2, color='green')
-axes[1].set_title('Tendencia Proyectada 2025')
-axes[1].set_xlabel('Mes')
-axes[1].set_ylabel('Ventas ($)')
-axes[1].legend()
-axes[1].grid(True, alpha=0.3)
-
-plt.tight_layout()
-plt.show()
-
-engine.dispose()
\ No newline at end of file
+from datos import crear_engine, cargar_ventas, enriquecer_fechas
+from agregaciones import agregar, agregar_pandas
+from cubo import actualizar_cubo, resumir_cubo
+from proyeccion import (proyectar, muestrear_escenarios, bandas, tabla_bandas,
+                        tabla_proyeccion)
+from perfilado import etapa
+from graficas import figura_proyeccion, publicar, agregar_argumentos, meses_nombres
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Proyección de ventas 2025')
+    parser.add_argument('--pushdown', action='store_true',
+                        help='Calcula las ventas mensuales con GROUP BY en MySQL')
+    parser.add_argument('--cubo', action='store_true',
+                        help='Lee las ventas mensuales del cubo pre-agregado')
+    parser.add_argument('--escenarios', type=int, default=0,
+                        help='Cantidad de escenarios Monte Carlo para bandas P10/P50/P90')
+    parser.add_argument('--crecimiento-min', type=float, default=1.00)
+    parser.add_argument('--crecimiento-max', type=float, default=1.20)
+    parser.add_argument('--ruido', type=float, default=0.05,
+                        help='Desviación del ruido lognormal sobre los factores estacionales')
+    parser.add_argument('--semilla', type=int, default=None)
+    agregar_argumentos(parser)
+    args = parser.parse_args()
+
+    engine = crear_engine()
+
+    if args.cubo:
+        with etapa('carga_cubo') as medicion:
+            cubo = actualizar_cubo(engine)
+            medicion.filas = len(cubo)
+    elif not args.pushdown:
+        with etapa('carga') as medicion:
+            columnas = ['Fecha', 'TotalVenta']
+            if args.escenarios:
+                # Las bandas por segmento agrupan por Región x Categoría
+                columnas += ['Region', 'Categoria']
+            df = cargar_ventas(engine, columnas=columnas)
+            medicion.filas = len(df)
+
+        with etapa('fechas', len(df)):
+            df = enriquecer_fechas(df)
+
+    def resumir(por, filtros=None, **agregaciones):
+        if args.cubo:
+            return resumir_cubo(cubo, por, filtros, **agregaciones)
+        if args.pushdown:
+            return agregar(engine, por, filtros, **agregaciones)
+        return agregar_pandas(df, por, filtros, **agregaciones)
+
+    # ================================
+    # PROMEDIO MENSUAL HISTÓRICO
+    # ================================
+    with etapa('agregacion'):
+        promedio_mensual = resumir(['Año', 'Mes'], TotalVenta=('TotalVenta', 'sum')).reset_index()
+        promedio_mensual = promedio_mensual.groupby('Mes')['TotalVenta'].mean().round(2)
+        ventas_2024 = resumir(['Mes'], {'Año': 2024}, TotalVenta=('TotalVenta', 'sum'))['TotalVenta'].round(2)
+
+    # ================================
+    # PROYECCIÓN 2025
+    # ================================
+    with etapa('proyeccion', len(promedio_mensual)):
+        df_proyeccion = tabla_proyeccion(promedio_mensual)
+
+    df_proyeccion['Mes_Nombre'] = meses_nombres
+
+    print("=== PROYECCIÓN DE VENTAS 2025 ===")
+    print(df_proyeccion[['Mes_Nombre', 'Promedio_Historico', 'Proyeccion_2025', 'Crecimiento_%']].to_string(index=False))
+    print(f"\nTotal proyectado 2025: ${df_proyeccion['Proyeccion_2025'].sum():,.2f}")
+    print(f"Total promedio histórico: ${df_proyeccion['Promedio_Historico'].sum():,.2f}")
+    print(f"Crecimiento proyectado: {((df_proyeccion['Proyeccion_2025'].sum() / df_proyeccion['Promedio_Historico'].sum()) - 1) * 100:.1f}%")
+
+    # ================================
+    # ESCENARIOS MONTE CARLO
+    # ================================
+    with etapa('escenarios', args.escenarios):
+        if args.escenarios:
+            crecimientos, factores = muestrear_escenarios(
+                args.escenarios, crecimiento=(args.crecimiento_min, args.crecimiento_max),
+                ruido_estacional=args.ruido, semilla=args.semilla
+            )
+
+            print(f"\n=== BANDAS DE PROYECCIÓN 2025 ({args.escenarios:,} escenarios) ===")
+            escenarios_total = proyectar(promedio_mensual.values, crecimientos, factores)
+            bandas_mes = tabla_bandas(escenarios_total)
+            bandas_mes.index = meses_nombres
+            print(bandas_mes)
+            p10, p50, p90 = bandas(escenarios_total.sum(axis=1))
+            print(f"\nTotal 2025 → P10: ${p10:,.2f}  P50: ${p50:,.2f}  P90: ${p90:,.2f}")
+
+            # Mismos escenarios aplicados a cada serie Región x Categoría
+            por_segmento = resumir(['Region', 'Categoria', 'Año', 'Mes'], TotalVenta=('TotalVenta', 'sum'))
+            promedios_segmento = (por_segmento.groupby(['Region', 'Categoria', 'Mes'])['TotalVenta'].mean()
+                                  .unstack('Mes').reindex(columns=range(1, 13)).fillna(0))
+            escenarios_segmento = proyectar(promedios_segmento.values, crecimientos, factores)
+            totales_segmento = bandas(escenarios_segmento.sum(axis=2))
+            print("\n=== TOTAL 2025 POR REGIÓN Y CATEGORÍA (P10 / P50 / P90) ===")
+            print(pd.DataFrame(totales_segmento.T, index=promedios_segmento.index,
+                               columns=['P10', 'P50', 'P90']).round(2))
+
+    # ================================
+    # VISUALIZACIÓN
+    # ================================
+    engine.dispose()
+
+    with etapa('graficas'):
+        publicar({
+            'proyeccion_2025': (figura_proyeccion, (df_proyeccion, ventas_2024)),
+        }, formatos=args.salida, trabajadores=args.trabajadores_graficas)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,54 +1,50 @@
+import argparse
 import os
+import time
+from datos import crear_engine, RUTA_BASE
+from metricas import cargar_metricas
+
 # ================================
 # CONCLUSIONES Y PLAN DE ACCIÓN
 # ================================
-
-conclusiones = """
+# Las cifras y los hallazgos se llenan con las métricas calculadas sobre
+# los datos. El plan de acción tiene una campaña fija por mes y se marca con
+# las métricas si el mes fue fuerte o retador; las recomendaciones son texto fijo.
+PLANTILLA = """
 ╔══════════════════════════════════════════════════════════════╗
-║     REPORTE EJECUTIVO - ANÁLISIS DE VENTAS 2022-2024        ║
-║              PROYECCIÓN Y PLAN DE ACCIÓN 2025               ║
+║     REPORTE EJECUTIVO - ANÁLISIS DE VENTAS {inicio}-{fin}        ║
+║              PROYECCIÓN Y PLAN DE ACCIÓN {siguiente}               ║
 ╚══════════════════════════════════════════════════════════════╝
 
 📊 RESUMEN EJECUTIVO
 ─────────────────────────────────────────────────────────────
-- Período analizado: 2022 - 2024
-- Total ventas acumuladas: $1,221,446.60
-- Margen de ganancia general: 38%
-- Crecimiento 2024 vs promedio histórico: +10%
-- Proyección crecimiento 2025: +15%
+- Período analizado: {inicio} - {fin}
+- Total ventas acumuladas: ${total_ventas:,.2f}
+- Margen de ganancia general: {margen:.0f}%
+- Crecimiento {fin} vs promedio histórico: {crecimiento_ultimo:+.0f}%
+- Proyección crecimiento {siguiente}: {crecimiento_proyectado:+.0f}%
 
 📈 HALLAZGOS PRINCIPALES
 ─────────────────────────────────────────────────────────────
 1. REGIONES
-   • Centro lidera en ventas con mejores prácticas comerciales
-   • El poder adquisitivo es uniforme en todo el país
-   • Oportunidad: replicar estrategia de Centro en Oeste y Norte
+   • {region_lider} lidera en ventas con mejores prácticas comerciales
+   • {poder_adquisitivo}
+   • Oportunidad: replicar estrategia de {region_lider} en {rezagadas}
 
 2. CATEGORÍAS
-   • Electrónica genera mayor volumen de ventas
-   • Ropa tiene el mayor margen de ganancia → PRIORIDAD
-   • Alimentos es rentable con bajo volumen → potencial de crecimiento
+   • {categoria_volumen} genera mayor volumen de ventas
+   • {categoria_margen} tiene el mayor margen de ganancia → PRIORIDAD
+   • {categoria_menor_volumen} es la de menor volumen → potencial de crecimiento
    • Oportunidad: combinar categorías para aumentar ticket promedio
 
 3. TEMPORALIDAD
-   • Meses fuertes: Febrero, Mayo, Octubre, Diciembre
-   • Meses retadores: Marzo, Junio, Noviembre
-   • La tendencia general es positiva pero con picos irregulares
+   • Meses fuertes: {meses_fuertes}
+   • Meses retadores: {meses_retadores}
+   • La tendencia general es {tendencia} pero con picos irregulares
 
-⚡ PLAN DE ACCIÓN 2025
+⚡ PLAN DE ACCIÓN {siguiente}
 ─────────────────────────────────────────────────────────────
-ENERO   → Campaña de inicio de año y liquidaciones
-FEBRERO → Potenciar San Valentín (demostró ser fuerte)
-MARZO   → Campaña Día de la Mujer (mes retador, crear evento)
-ABRIL   → Promociones Semana Santa en Hogar y Alimentos
-MAYO    → Maximizar Día de la Madre (mayor potencial del año)
-JUNIO   → Campaña fin de año escolar anticipada (cayó en 2024)
-JULIO   → Promociones de verano en Deportes y Ropa
-AGOSTO  → Campaña regreso a clases en Electrónica y Ropa
-SEPTIEMBRE → Fiestas regionales por zona geográfica
-OCTUBRE → Potenciar Halloween (demostró ser fuerte)
-NOVIEMBRE → Implementar Black Friday agresivo (sin variación en 2024)
-DICIEMBRE → Maximizar temporada navideña en todas las categorías
+{plan_accion}
 
 🎯 RECOMENDACIONES ESTRATÉGICAS
 ─────────────────────────────────────────────────────────────
@@ -60,12 +56,12 @@ DICIEMBRE → Maximizar temporada navideña en todas las categorías
    Alimentos + Hogar → cliente familiar
 
 3. Desarrollar programa de fidelización por región enfocado
-   en Norte y Oeste para elevar su desempeño al nivel de Centro
+   en {rezagadas} para elevar su desempeño al nivel de {region_lider}
 
 4. Revisar política de descuentos, actualmente representan
    pérdida de margen sin impacto claro en volumen
 
-5. Documentar las buenas prácticas de la región Centro
+5. Documentar las buenas prácticas de la región {region_lider}
    y capacitar a los vendedores de otras regiones
 
 📌 PRÓXIMOS PASOS
@@ -76,13 +72,74 @@ DICIEMBRE → Maximizar temporada navideña en todas las categorías
 - Revisar estructura de comisiones del equipo de ventas
 """
 
-print(conclusiones)
-
-# Ruta dinámica que funciona sin importar dónde esté el proyecto
-ruta_base = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-ruta_salida = os.path.join(ruta_base, 'salida', 'reporte_ejecutivo.txt')
-
-with open(ruta_salida, 'w', encoding='utf-8') as f:
-    f.write(conclusiones)
-
-print(f"✅ Reporte guardado en: {ruta_salida}")
\ No newline at end of file
+# Campaña de cada mes; si el mes fue fuerte o retador lo dicen las métricas
+CAMPAÑAS = {
+    'Enero': 'Campaña de inicio de año y liquidaciones',
+    'Febrero': 'San Valentín',
+    'Marzo': 'Campaña Día de la Mujer',
+    'Abril': 'Promociones Semana Santa en Hogar y Alimentos',
+    'Mayo': 'Día de la Madre',
+    'Junio': 'Campaña fin de año escolar anticipada',
+    'Julio': 'Promociones de verano en Deportes y Ropa',
+    'Agosto': 'Campaña regreso a clases en Electrónica y Ropa',
+    'Septiembre': 'Fiestas regionales por zona geográfica',
+    'Octubre': 'Halloween',
+    'Noviembre': 'Black Friday',
+    'Diciembre': 'Temporada navideña en todas las categorías',
+}
+
+
+def plan_accion(metricas):
+    """Una línea por mes: la campaña y, según los datos, si hay que potenciarla o reforzarla."""
+    ancho = max(len(mes) for mes in CAMPAÑAS)
+    lineas = []
+    for mes, campaña in CAMPAÑAS.items():
+        if mes in metricas['meses_fuertes']:
+            campaña = f'Potenciar: {campaña} (mes fuerte)'
+        elif mes in metricas['meses_retadores']:
+            campaña = f'Reforzar: {campaña} (mes retador, crear evento)'
+        lineas.append(f'{mes.upper():<{ancho}} → {campaña}')
+    return '\n'.join(lineas)
+
+
+def redactar(metricas):
+    """Llena la plantilla con las métricas de `cargar_metricas`."""
+    return PLANTILLA.format(
+        siguiente=metricas['fin'] + 1,
+        rezagadas=' y '.join(metricas['regiones_rezagadas']),
+        poder_adquisitivo=('El poder adquisitivo es uniforme en todo el país'
+                           if metricas['ticket_uniforme']
+                           else 'El ticket promedio varía entre regiones'),
+        tendencia='positiva' if metricas['tendencia_positiva'] else 'negativa',
+        plan_accion=plan_accion(metricas),
+        meses_fuertes=', '.join(metricas['meses_fuertes']),
+        meses_retadores=', '.join(metricas['meses_retadores']),
+        **{clave: valor for clave, valor in metricas.items()
+           if clave not in ('meses_fuertes', 'meses_retadores')},
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Reporte ejecutivo a partir de las métricas de ventas')
+    parser.add_argument('--recalcular', action='store_true',
+                        help='Recalcula las métricas aunque los datos no hayan cambiado')
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    engine = crear_engine()
+    metricas = cargar_metricas(engine, recalcular=args.recalcular)
+    engine.dispose()
+
+    conclusiones = redactar(metricas)
+    print(conclusiones)
+
+    ruta_salida = os.path.join(RUTA_BASE, 'salida', 'reporte_ejecutivo.txt')
+
+    with open(ruta_salida, 'w', encoding='utf-8') as f:
+        f.write(conclusiones)
+
+    print(f"✅ Reporte guardado en: {ruta_salida} ({time.perf_counter() - inicio:.2f} s)")
+
+
+if __name__ == '__main__':
+    main()
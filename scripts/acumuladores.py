@@ -0,0 +1,46 @@
+import pandas as pd
+
+# Solo se aceptan agregaciones que se pueden combinar lote a lote
+AGREGACIONES_SUMABLES = {'sum', 'count'}
+
+
+class AcumuladorGrupos:
+    """Group-by incremental: guarda totales parciales por grupo, nunca las filas.
+
+    Las agregaciones usan la misma forma que `DataFrame.agg` con nombre:
+    AcumuladorGrupos(['Categoria'], Total_Ventas=('TotalVenta', 'sum'))
+    """
+
+    def __init__(self, por, **agregaciones):
+        for columna, funcion in agregaciones.values():
+            if funcion not in AGREGACIONES_SUMABLES:
+                raise ValueError(f"Agregación no acumulable: {funcion!r} sobre {columna!r}")
+        self.por = list(por)
+        self.agregaciones = agregaciones
+        self.total = None
+        self.filas = 0
+
+    def agregar(self, lote):
+        if self.por:
+            parcial = lote.groupby(self.por, observed=True).agg(**self.agregaciones)
+        else:
+            parcial = pd.DataFrame({
+                nombre: [getattr(lote[columna], funcion)()]
+                for nombre, (columna, funcion) in self.agregaciones.items()
+            })
+        self.sumar(parcial, len(lote))
+
+    def sumar(self, parcial, filas=0):
+        """Suma un resultado ya agrupado por `por`, por ejemplo un GROUP BY de MySQL."""
+        self.total = parcial if self.total is None else self.total.add(parcial, fill_value=0)
+        self.filas += filas
+
+    def resultado(self):
+        if self.total is None:
+            return pd.DataFrame(columns=list(self.agregaciones))
+        resultado = self.total.sort_index()
+        # Los conteos vuelven a ser enteros después de sumar con fill_value
+        for nombre, (_, funcion) in self.agregaciones.items():
+            if funcion == 'count':
+                resultado[nombre] = resultado[nombre].astype('int64')
+        return resultado
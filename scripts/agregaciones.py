@@ -0,0 +1,191 @@
+import pandas as pd
+from sqlalchemy import text, bindparam
+
+from cache_consultas import leer_sql
+
+# ================================
+# CATÁLOGO DE MEDIDAS Y DIMENSIONES
+# ================================
+# Cada nombre corresponde a una columna de CONSULTA_VENTAS (datos.py) y a su
+# expresión SQL equivalente sobre el JOIN, con los alias que necesita
+MEDIDAS = {
+    'TotalVenta': ('(v.Cantidad * v.PrecioVenta)', ()),
+    'TotalCosto': ('(v.Cantidad * p.Costo)', ('p',)),
+    'Ganancia': ('((v.Cantidad * v.PrecioVenta) - (v.Cantidad * p.Costo))', ('p',)),
+    'Cantidad': ('v.Cantidad', ()),
+    'PrecioVenta': ('v.PrecioVenta', ()),
+    'Descuento': ('v.Descuento', ()),
+}
+
+DIMENSIONES = {
+    'ID': ('v.ID', ()),
+    'Fecha': ('v.Fecha', ()),
+    'Año': ('YEAR(v.Fecha)', ()),
+    'Mes': ('MONTH(v.Fecha)', ()),
+    # Clave yyyymm: un solo entero por mes para las series de tiempo
+    'AñoMes': ('(YEAR(v.Fecha) * 100 + MONTH(v.Fecha))', ()),
+    # Los nombres se repiten entre personas: para identificar a cada una, su ID
+    'IDVendedor': ('v.Vendedor', ()),
+    'Vendedor': ('vd.Nombre', ('vd',)),
+    'IDCliente': ('v.Cliente', ()),
+    'Cliente': ('c.Nombre', ('c',)),
+    'Region': ('r.Nombre', ('vd', 'r')),
+    'Producto': ('p.Nombre', ('p',)),
+    'Categoria': ('cat.Nombre', ('p', 'cat')),
+}
+
+# Los JOIN en el orden en que deben aparecer
+JOINS = [
+    ('vd', 'LEFT JOIN vendedores vd ON v.Vendedor = vd.ID'),
+    ('c', 'LEFT JOIN clientes c ON v.Cliente = c.ID'),
+    ('p', 'LEFT JOIN productos p ON v.Producto = p.ID'),
+    ('cat', 'LEFT JOIN categorias cat ON p.Categoria = cat.ID'),
+    ('r', 'LEFT JOIN regiones r ON vd.Region = r.ID'),
+]
+
+FUNCIONES_SQL = {
+    'sum': 'SUM({})',
+    'count': 'COUNT({})',
+    'mean': 'AVG({})',
+    'min': 'MIN({})',
+    'max': 'MAX({})',
+    'nunique': 'COUNT(DISTINCT {})',
+}
+
+OPERADORES = {'=', '<>', '<', '<=', '>', '>=', 'BETWEEN'}
+
+
+def _expresion(columna):
+    if columna in MEDIDAS:
+        return MEDIDAS[columna]
+    if columna in DIMENSIONES:
+        return DIMENSIONES[columna]
+    raise KeyError(f"Columna desconocida para agregar: {columna!r}")
+
+
+def construir_consulta(por, filtros=None, **agregaciones):
+    """Traduce una especificación de agregación a un SELECT ... GROUP BY.
+
+    `por` son dimensiones, `filtros` un dict {columna: valor}, donde el valor
+    puede ser una lista (IN) o una tupla (operador, valor); con 'BETWEEN' el
+    valor es el par (desde, hasta), ambos incluidos. Las agregaciones
+    usan la forma de `DataFrame.agg` con nombre: Total=('TotalVenta', 'sum').
+    Devuelve el texto SQL y sus parámetros.
+    """
+    filtros = filtros or {}
+    alias = set()
+    columnas = []
+    for dimension in por:
+        expresion, requeridos = DIMENSIONES[dimension]
+        alias.update(requeridos)
+        columnas.append(f'{expresion} AS `{dimension}`')
+    for nombre, (columna, funcion) in agregaciones.items():
+        if funcion not in FUNCIONES_SQL:
+            raise ValueError(f"Agregación no soportada en SQL: {funcion!r}")
+        expresion, requeridos = _expresion(columna)
+        alias.update(requeridos)
+        columnas.append(f'{FUNCIONES_SQL[funcion].format(expresion)} AS `{nombre}`')
+
+    condiciones = []
+    parametros = {}
+    listas = []
+    for i, (columna, valor) in enumerate(filtros.items()):
+        expresion, requeridos = _expresion(columna)
+        alias.update(requeridos)
+        nombre = f'f{i}'
+        if columna == 'Año' and not isinstance(valor, (list, set, tuple)):
+            # Rango sobre Fecha en lugar de YEAR(Fecha) = x: así MySQL puede usar
+            # el índice de Fecha y descartar particiones por año
+            condiciones.append(f'v.Fecha >= :{nombre}_desde AND v.Fecha < :{nombre}_hasta')
+            parametros[f'{nombre}_desde'] = f'{int(valor)}-01-01'
+            parametros[f'{nombre}_hasta'] = f'{int(valor) + 1}-01-01'
+        elif isinstance(valor, (list, set)):
+            condiciones.append(f'{expresion} IN :{nombre}')
+            parametros[nombre] = list(valor)
+            listas.append(nombre)
+        elif isinstance(valor, tuple):
+            operador, valor = valor
+            if operador not in OPERADORES:
+                raise ValueError(f"Operador no soportado: {operador!r}")
+            if operador == 'BETWEEN':
+                condiciones.append(f'{expresion} BETWEEN :{nombre}_desde AND :{nombre}_hasta')
+                parametros[f'{nombre}_desde'], parametros[f'{nombre}_hasta'] = valor
+            else:
+                condiciones.append(f'{expresion} {operador} :{nombre}')
+                parametros[nombre] = valor
+        else:
+            condiciones.append(f'{expresion} = :{nombre}')
+            parametros[nombre] = valor
+
+    sql = 'SELECT ' + ', '.join(columnas) + '\nFROM ventas v'
+    for clave, join in JOINS:
+        if clave in alias:
+            sql += '\n' + join
+    if condiciones:
+        sql += '\nWHERE ' + ' AND '.join(condiciones)
+    if por:
+        sql += '\nGROUP BY ' + ', '.join(DIMENSIONES[d][0] for d in por)
+
+    consulta = text(sql)
+    for nombre in listas:
+        consulta = consulta.bindparams(bindparam(nombre, expanding=True))
+    return consulta, parametros
+
+
+def agregar(engine, por, filtros=None, incluir_nulos=False, **agregaciones):
+    """Ejecuta la agregación en MySQL y devuelve solo el resultado agrupado."""
+    consulta, parametros = construir_consulta(por, filtros, **agregaciones)
+    resultado = leer_sql(engine, consulta, parametros)
+    for nombre, (columna, funcion) in agregaciones.items():
+        # SUM/AVG sobre DECIMAL llegan como objetos Decimal: el dinero se
+        # devuelve como float64, igual que en la tabla de hechos tipada
+        if funcion in ('sum', 'mean', 'min', 'max') and columna in MEDIDAS:
+            resultado[nombre] = resultado[nombre].astype('float64')
+    if not por:
+        return resultado
+    if not incluir_nulos:
+        # Igual que pandas, los grupos con clave nula no se reportan
+        resultado = resultado.dropna(subset=list(por))
+    return resultado.set_index(list(por)).sort_index()
+
+
+def _comparar(serie, operador, valor):
+    return {
+        '=': serie.eq, '<>': serie.ne, '<': serie.lt,
+        '<=': serie.le, '>': serie.gt, '>=': serie.ge,
+        'BETWEEN': lambda limites: serie.between(*limites),
+    }[operador](valor)
+
+
+def agregar_pandas(df, por, filtros=None, **agregaciones):
+    """Misma especificación que `agregar`, calculada sobre las filas ya cargadas."""
+    for columna, valor in (filtros or {}).items():
+        if isinstance(valor, (list, set)):
+            df = df[df[columna].isin(valor)]
+        elif isinstance(valor, tuple):
+            operador, valor = valor
+            df = df[_comparar(df[columna], operador, valor)]
+        else:
+            df = df[df[columna] == valor]
+    if not por:
+        return pd.DataFrame({
+            nombre: [df[columna].agg(funcion)]
+            for nombre, (columna, funcion) in agregaciones.items()
+        })
+    resultado = df.groupby(list(por), observed=True).agg(**agregaciones).reset_index()
+    # Con dimensiones categóricas el índice sale igual que en la versión SQL
+    for dimension in por:
+        if resultado[dimension].dtype == 'category':
+            resultado[dimension] = resultado[dimension].astype(object)
+    return resultado.set_index(list(por)).sort_index()
+
+
+def comparar(engine, df, por, filtros=None, tolerancia=1e-6, **agregaciones):
+    """Valida que el resultado en SQL coincida con el de pandas sobre las filas crudas."""
+    en_sql = agregar(engine, por, filtros, **agregaciones)
+    en_pandas = agregar_pandas(df, por, filtros, **agregaciones)
+    pd.testing.assert_frame_equal(
+        en_sql.astype('float64'), en_pandas.astype('float64'),
+        check_names=False, check_index_type=False, rtol=tolerancia
+    )
+    return en_sql
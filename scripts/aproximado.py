@@ -0,0 +1,478 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import reduce
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from datos import (CONSULTA_VENTAS, PARALELISMO, RANGOS_POR_TRABAJADOR, RUTA_CACHE, huella_ventas,
+                   rangos_id, tipar_ventas)
+from agregaciones import agregar_pandas
+from dimensiones import cargar_dimensiones
+
+# ================================
+# MODO APROXIMADO: MUESTRAS Y BOCETOS
+# ================================
+# Con cientos de millones de ventas, explorar no necesita la respuesta exacta.
+# - Sumas, conteos y promedios salen de una muestra estratificada por Region y
+#   Categoria, con su margen de error al 95%.
+# - Clientes distintos por región (HyperLogLog) y cuantiles del ticket
+#   (t-digest) salen de bocetos de tamaño fijo, armados por rango de IDs en
+#   paralelo y combinados al final. Se guardan con la huella de `ventas` y,
+#   como el cubo, después solo se les suman las ventas con ID nuevo.
+FRACCION = float(os.getenv('FRACCION_MUESTRA', '0.01'))
+# Muestras por debajo de este tamaño en un estrato se completan con una segunda pasada
+MIN_ESTRATO = 100
+Z_95 = 1.96
+
+# La muestra se elige en la base con un hash del ID, sin ORDER BY RAND():
+# es repetible entre corridas y una fracción mayor contiene a la menor
+MODULO_MUESTRA = 1_000_000
+MULTIPLICADOR = 2654435761
+HASH_ID = f'((v.ID * {MULTIPLICADOR}) % {MODULO_MUESTRA})'
+
+BITS_HLL = 14
+COMPRESION_TDIGEST = 300
+
+RUTA_BOCETOS = os.path.join(RUTA_CACHE, 'bocetos.npz')
+RUTA_META_BOCETOS = os.path.join(RUTA_CACHE, 'bocetos.json')
+
+
+# ================================
+# MUESTRA ESTRATIFICADA
+# ================================
+def _umbral(fraccion):
+    return max(1, min(MODULO_MUESTRA, int(round(fraccion * MODULO_MUESTRA))))
+
+
+def _leer_muestra(engine, condicion, parametros, trabajadores):
+    consulta = CONSULTA_VENTAS + f'\n    WHERE {condicion}'
+    if trabajadores <= 1:
+        return pd.read_sql(text(consulta), engine, params=parametros)
+
+    with engine.connect() as conexion:
+        minimo, maximo = conexion.execute(text("SELECT MIN(ID), MAX(ID) FROM ventas")).one()
+    if minimo is None:
+        return pd.read_sql(text(consulta), engine, params=parametros)
+
+    def leer(rango):
+        with engine.connect() as conexion:
+            return pd.read_sql(text(consulta + ' AND v.ID BETWEEN :desde AND :hasta'), conexion,
+                               params={**parametros, 'desde': rango[0], 'hasta': rango[1]})
+
+    rangos = rangos_id(int(minimo), int(maximo), trabajadores * RANGOS_POR_TRABAJADOR)
+    with ThreadPoolExecutor(max_workers=trabajadores) as ejecutor:
+        return pd.concat(list(ejecutor.map(leer, rangos)), ignore_index=True)
+
+
+def muestrear_ventas(engine, fraccion=FRACCION, columnas=None, minimo_estrato=MIN_ESTRATO, trabajadores=None):
+    """Muestra de CONSULTA_VENTAS estratificada por Region x Categoria.
+
+    Primero se toma `fraccion` de todas las ventas. Los estratos con menos de
+    `minimo_estrato` filas se completan en una sola pasada más, con una tasa
+    propia; `_peso` es el inverso de la tasa de cada fila.
+    """
+    trabajadores = trabajadores or PARALELISMO
+    base = _umbral(fraccion)
+    muestra = _leer_muestra(engine, f'{HASH_ID} < :umbral', {'umbral': base}, trabajadores)
+    muestra['_peso'] = MODULO_MUESTRA / base
+
+    # Todos los estratos posibles, también los que no salieron en la muestra
+    dimensiones = cargar_dimensiones(engine)
+    vistos = muestra.groupby(['Region', 'Categoria']).size()
+    condiciones, parametros, umbrales = [], {'base': base}, {}
+    for region in dimensiones['regiones']['Nombre']:
+        for categoria in dimensiones['categorias']['Nombre']:
+            filas = int(vistos.get((region, categoria), 0))
+            if filas >= minimo_estrato or base == MODULO_MUESTRA:
+                continue
+            i = len(condiciones)
+            umbral = _umbral(fraccion * minimo_estrato / max(filas, 1))
+            condiciones.append(f'(r.Nombre = :r{i} AND cat.Nombre = :c{i} AND {HASH_ID} < :u{i})')
+            parametros.update({f'r{i}': region, f'c{i}': categoria, f'u{i}': umbral})
+            umbrales[(region, categoria)] = umbral
+
+    if condiciones:
+        # Las filas con hash menor a `base` ya están en la muestra
+        extra = _leer_muestra(engine, f'{HASH_ID} >= :base AND (' + ' OR '.join(condiciones) + ')',
+                              parametros, trabajadores)
+        muestra = pd.concat([muestra, extra], ignore_index=True)
+        for (region, categoria), umbral in umbrales.items():
+            estrato = (muestra['Region'] == region) & (muestra['Categoria'] == categoria)
+            muestra.loc[estrato, '_peso'] = MODULO_MUESTRA / umbral
+
+    peso = muestra.pop('_peso')
+    if columnas is not None:
+        muestra = muestra[columnas]
+    muestra = tipar_ventas(muestra)
+    muestra['_peso'] = peso.to_numpy()
+    return muestra
+
+
+def resumir_muestra(muestra, por, filtros=None, **agregaciones):
+    """Misma especificación que `agregar`, estimada sobre la muestra.
+
+    Devuelve (estimación, margen de error al 95%). Sumas y conteos usan el
+    estimador de Horvitz-Thompson con los pesos de cada estrato; los promedios,
+    su cociente.
+    """
+    peso = muestra['_peso'].to_numpy()
+    # Var(HT) con muestreo de Bernoulli: sum((1 - p) / p^2 * y^2) = sum(w * (w - 1) * y^2)
+    varianza = peso * (peso - 1)
+    columnas = {}
+    for columna, funcion in agregaciones.values():
+        if funcion not in ('sum', 'count', 'mean'):
+            raise ValueError(f"No hay estimador para {funcion!r} en modo aproximado")
+        y = muestra[columna].to_numpy(dtype='float64')
+        presente = ~np.isnan(y)
+        y = np.where(presente, y, 0.0)
+        columnas.update({
+            f'_w_{columna}': peso * presente,
+            f'_v_{columna}': varianza * presente,
+            f'_wy_{columna}': peso * y,
+            f'_vy_{columna}': varianza * y,
+            f'_vyy_{columna}': varianza * y * y,
+        })
+
+    dimensiones = list(dict.fromkeys(list(por) + list(filtros or {})))
+    sumas = agregar_pandas(muestra[dimensiones].assign(**columnas), por, filtros,
+                           **{columna: (columna, 'sum') for columna in columnas})
+
+    estimacion = pd.DataFrame(index=sumas.index)
+    error = pd.DataFrame(index=sumas.index)
+    for nombre, (columna, funcion) in agregaciones.items():
+        w, v, wy, vy, vyy = (sumas[f'_{s}_{columna}'] for s in ('w', 'v', 'wy', 'vy', 'vyy'))
+        if funcion == 'sum':
+            valor, var = wy, vyy
+        elif funcion == 'count':
+            valor, var = w, v
+        else:
+            # Linealización del cociente sum(w*y) / sum(w)
+            valor = wy / w
+            var = (vyy - 2 * valor * vy + valor ** 2 * v) / w ** 2
+        estimacion[nombre] = valor.round().astype('int64') if funcion == 'count' else valor
+        error[nombre] = Z_95 * np.sqrt(var.clip(lower=0))
+    return estimacion, error
+
+
+def error_relativo(estimacion, error):
+    """Mayor margen de error (% del valor) entre todas las celdas de un resumen."""
+    return float((error / estimacion.abs()).max().max() * 100)
+
+
+# ================================
+# HYPERLOGLOG
+# ================================
+def _mezclar(claves):
+    """Hash de 64 bits (splitmix64) de claves enteras, vectorizado."""
+    x = np.asarray(claves, dtype=np.int64).astype(np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def _largo_bits(x):
+    # frexp es exacto con float64 solo hasta 2^53: se mira cada mitad de 32 bits
+    alto = (x >> np.uint64(32)).astype(np.float64)
+    bajo = (x & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    return np.where(alto > 0, 32 + np.frexp(alto)[1], np.frexp(bajo)[1])
+
+
+class HyperLogLog:
+    """Conteo aproximado de valores distintos en 2^bits registros de un byte.
+
+    Error relativo típico de 1.04 / sqrt(2^bits) (0.8% con 14 bits). Dos
+    bocetos con los mismos bits se combinan con el máximo por registro.
+    """
+
+    def __init__(self, bits=BITS_HLL):
+        self.bits = bits
+        self.registros = np.zeros(1 << bits, dtype=np.uint8)
+
+    def agregar(self, claves):
+        h = _mezclar(claves)
+        resto = 64 - self.bits
+        indices = (h >> np.uint64(resto)).astype(np.int64)
+        cola = h & np.uint64((1 << resto) - 1)
+        rango = (resto - _largo_bits(cola) + 1).astype(np.uint8)
+        np.maximum.at(self.registros, indices, rango)
+        return self
+
+    def unir(self, otro):
+        np.maximum(self.registros, otro.registros, out=self.registros)
+        return self
+
+    def estimar(self):
+        m = len(self.registros)
+        alfa = 0.7213 / (1 + 1.079 / m)
+        estimado = alfa * m * m / np.sum(np.ldexp(1.0, -self.registros.astype(np.int64)))
+        vacios = int(np.count_nonzero(self.registros == 0))
+        if estimado <= 2.5 * m and vacios:
+            # Pocos valores: conteo lineal sobre los registros vacíos
+            estimado = m * np.log(m / vacios)
+        return float(estimado)
+
+    @property
+    def error_relativo(self):
+        return 1.04 / np.sqrt(len(self.registros))
+
+
+# ================================
+# T-DIGEST
+# ================================
+class TDigest:
+    """Cuantiles aproximados con centroides más finos en las colas.
+
+    Versión vectorizada del t-digest con fusión: los centroides se ordenan y
+    se agrupan por tramos de la función de escala k(q) = d/(2 pi) asin(2q - 1),
+    así cada uno cubre a lo sumo un tramo de k y las colas quedan casi exactas.
+    """
+
+    def __init__(self, compresion=COMPRESION_TDIGEST):
+        self.compresion = compresion
+        self.medias = np.empty(0)
+        self.pesos = np.empty(0)
+        self.minimo = np.inf
+        self.maximo = -np.inf
+
+    def _comprimir(self, medias, pesos):
+        orden = np.argsort(medias, kind='stable')
+        medias, pesos = medias[orden], pesos[orden]
+        total = pesos.sum()
+        q = (np.cumsum(pesos) - pesos / 2) / total
+        tramos = np.floor(self.compresion / (2 * np.pi) * np.arcsin(2 * q - 1))
+        inicios = np.flatnonzero(np.r_[True, np.diff(tramos) != 0])
+        self.pesos = np.add.reduceat(pesos, inicios)
+        self.medias = np.add.reduceat(medias * pesos, inicios) / self.pesos
+
+    def agregar(self, valores):
+        valores = np.asarray(valores, dtype='float64')
+        valores = valores[~np.isnan(valores)]
+        if valores.size == 0:
+            return self
+        self.minimo = min(self.minimo, valores.min())
+        self.maximo = max(self.maximo, valores.max())
+        self._comprimir(np.concatenate([self.medias, valores]),
+                        np.concatenate([self.pesos, np.ones(valores.size)]))
+        return self
+
+    def unir(self, otro):
+        if otro.pesos.size:
+            self.minimo = min(self.minimo, otro.minimo)
+            self.maximo = max(self.maximo, otro.maximo)
+            self._comprimir(np.concatenate([self.medias, otro.medias]),
+                            np.concatenate([self.pesos, otro.pesos]))
+        return self
+
+    def cuantil(self, q):
+        if self.pesos.size == 0:
+            return float('nan')
+        total = self.pesos.sum()
+        centros = np.cumsum(self.pesos) - self.pesos / 2
+        return float(np.interp(q * total, np.r_[0, centros, total], np.r_[self.minimo, self.medias, self.maximo]))
+
+
+# ================================
+# BOCETOS POR RANGO DE IDS
+# ================================
+# Solo la tabla de hechos con claves enteras: la región sale del vendedor
+# con las dimensiones en caché, sin JOIN en la base
+CONSULTA_BOCETOS = """
+    SELECT v.Cliente, v.Vendedor, (v.Cantidad * v.PrecioVenta) AS TotalVenta
+    FROM ventas v
+    WHERE v.ID BETWEEN :desde AND :hasta
+"""
+
+
+CONSULTA_CLIENTES_DISTINTOS = """
+    SELECT r.Nombre AS Region, COUNT(DISTINCT v.Cliente) AS Clientes
+    FROM ventas v
+    LEFT JOIN vendedores vd ON v.Vendedor = vd.ID
+    LEFT JOIN regiones r ON vd.Region = r.ID
+    WHERE r.Nombre IS NOT NULL
+    GROUP BY r.Nombre
+"""
+
+
+def _bocetos_rango(engine, region_vendedor, desde, hasta):
+    with engine.connect() as conexion:
+        df = pd.read_sql(text(CONSULTA_BOCETOS), conexion, params={'desde': desde, 'hasta': hasta})
+    df['TotalVenta'] = df['TotalVenta'].astype('float64')
+    df['Region'] = df['Vendedor'].map(region_vendedor)
+
+    clientes, tickets = {}, {}
+    for region, grupo in df.groupby('Region'):
+        clientes[region] = HyperLogLog().agregar(grupo['Cliente'].dropna())
+        tickets[region] = TDigest().agregar(grupo['TotalVenta'])
+    return {'clientes': clientes, 'tickets': tickets, 'total': TDigest().agregar(df['TotalVenta'])}
+
+
+def _unir_bocetos(a, b):
+    for tipo in ('clientes', 'tickets'):
+        for region, boceto in b[tipo].items():
+            if region in a[tipo]:
+                a[tipo][region].unir(boceto)
+            else:
+                a[tipo][region] = boceto
+    a['total'].unir(b['total'])
+    return a
+
+
+def _bocetos_ids(engine, desde, hasta, trabajadores):
+    # Cada rango de IDs arma sus propios bocetos en un hilo; al final se combinan
+    dimensiones = cargar_dimensiones(engine)
+    regiones = dimensiones['regiones'].set_index('ID')['Nombre']
+    vendedores = dimensiones['vendedores']
+    region_vendedor = pd.Series(pd.to_numeric(vendedores['Region']).to_numpy(), index=vendedores['ID']).map(regiones)
+
+    vacio = {'clientes': {}, 'tickets': {}, 'total': TDigest()}
+    rangos = rangos_id(desde, hasta, trabajadores * RANGOS_POR_TRABAJADOR)
+    with ThreadPoolExecutor(max_workers=trabajadores) as ejecutor:
+        partes = ejecutor.map(lambda rango: _bocetos_rango(engine, region_vendedor, *rango), rangos)
+        return reduce(_unir_bocetos, partes, vacio)
+
+
+def _guardar_bocetos(bocetos, huella):
+    # Solo arreglos de NumPy: registros del HLL y centroides de cada t-digest
+    regiones = sorted(bocetos['clientes'])
+    arreglos = {f'clientes_{i}': bocetos['clientes'][region].registros for i, region in enumerate(regiones)}
+    digests = {f'tickets_{i}': bocetos['tickets'][region] for i, region in enumerate(regiones)}
+    digests['total'] = bocetos['total']
+    for clave, digest in digests.items():
+        arreglos[f'{clave}_medias'] = digest.medias
+        arreglos[f'{clave}_pesos'] = digest.pesos
+        arreglos[f'{clave}_extremos'] = np.array([digest.minimo, digest.maximo])
+
+    os.makedirs(RUTA_CACHE, exist_ok=True)
+    temporal = RUTA_BOCETOS + '.tmp'
+    with open(temporal, 'wb') as f:
+        np.savez(f, **arreglos)
+    os.replace(temporal, RUTA_BOCETOS)
+    with open(RUTA_META_BOCETOS, 'w', encoding='utf-8') as f:
+        json.dump({**huella, 'regiones': regiones, 'bits': BITS_HLL, 'compresion': COMPRESION_TDIGEST}, f, indent=2)
+
+
+def _leer_bocetos(meta):
+    def digest(clave):
+        resultado = TDigest(meta['compresion'])
+        resultado.medias = arreglos[f'{clave}_medias']
+        resultado.pesos = arreglos[f'{clave}_pesos']
+        resultado.minimo, resultado.maximo = arreglos[f'{clave}_extremos'].tolist()
+        return resultado
+
+    with np.load(RUTA_BOCETOS) as arreglos:
+        clientes, tickets = {}, {}
+        for i, region in enumerate(meta['regiones']):
+            clientes[region] = HyperLogLog(meta['bits'])
+            clientes[region].registros = arreglos[f'clientes_{i}']
+            tickets[region] = digest(f'tickets_{i}')
+        return {'clientes': clientes, 'tickets': tickets, 'total': digest('total')}
+
+
+def construir_bocetos(engine, trabajadores=None, completo=False):
+    """HyperLogLog de clientes y t-digest de ticket por región, más el t-digest general.
+
+    Los bocetos guardados se reusan mientras la huella de `ventas` no cambie;
+    si solo hubo inserciones se les suman las ventas con ID mayor a la marca
+    de agua. Un HLL no puede restar, así que con borrados se rearman.
+    """
+    trabajadores = max(trabajadores or PARALELISMO, 1)
+    huella = huella_ventas(engine)
+    meta = None
+    if not completo and os.path.exists(RUTA_META_BOCETOS) and os.path.exists(RUTA_BOCETOS):
+        with open(RUTA_META_BOCETOS, encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta['bits'] != BITS_HLL or meta['compresion'] != COMPRESION_TDIGEST:
+            meta = None
+
+    if meta is not None and {k: meta[k] for k in huella} == huella:
+        return _leer_bocetos(meta)
+
+    if meta is not None and meta['max_id'] is not None and (huella['max_id'] or 0) >= meta['max_id']:
+        with engine.connect() as conexion:
+            nuevas_filas = conexion.execute(
+                text("SELECT COUNT(*) FROM ventas WHERE ID > :marca AND ID <= :hasta"),
+                {'marca': meta['max_id'], 'hasta': huella['max_id']}
+            ).scalar()
+        if meta['filas'] + nuevas_filas == huella['filas']:
+            bocetos = _unir_bocetos(_leer_bocetos(meta),
+                                    _bocetos_ids(engine, meta['max_id'] + 1, huella['max_id'], trabajadores))
+            _guardar_bocetos(bocetos, huella)
+            return bocetos
+
+    # Acotado por el MAX(ID) de la huella que se guarda, igual que el cubo
+    with engine.connect() as conexion:
+        minimo = conexion.execute(
+            text("SELECT MIN(ID) FROM ventas WHERE ID <= :hasta"), {'hasta': huella['max_id'] or 0}
+        ).scalar()
+    if minimo is None:
+        bocetos = {'clientes': {}, 'tickets': {}, 'total': TDigest()}
+    else:
+        bocetos = _bocetos_ids(engine, int(minimo), huella['max_id'], trabajadores)
+    _guardar_bocetos(bocetos, huella)
+    return bocetos
+
+
+if __name__ == '__main__':
+    # Uso: python scripts/aproximado.py [--fraccion 0.01] [--trabajadores 4] [--exacto]
+    import argparse
+    import time
+    from datos import crear_engine
+    from agregaciones import agregar
+
+    parser = argparse.ArgumentParser(description='Resúmenes aproximados con muestra estratificada y bocetos')
+    parser.add_argument('--fraccion', type=float, default=FRACCION, help='Fracción de ventas en la muestra')
+    parser.add_argument('--minimo-estrato', type=int, default=MIN_ESTRATO,
+                        help='Filas mínimas por Region x Categoria en la muestra')
+    parser.add_argument('--trabajadores', type=int, default=max(PARALELISMO, 4),
+                        help='Conexiones simultáneas, una por rango de IDs')
+    parser.add_argument('--exacto', action='store_true', help='Compara contra el GROUP BY exacto en la base')
+    parser.add_argument('--completo', action='store_true', help='Rearma los bocetos sin usar los guardados')
+    args = parser.parse_args()
+
+    engine = crear_engine()
+
+    inicio = time.perf_counter()
+    muestra = muestrear_ventas(engine, args.fraccion, ['Region', 'Categoria', 'TotalVenta', 'Ganancia'],
+                               args.minimo_estrato, args.trabajadores)
+    segundos_muestra = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    bocetos = construir_bocetos(engine, args.trabajadores, args.completo)
+    segundos_bocetos = time.perf_counter() - inicio
+
+    print(f"=== MUESTRA ESTRATIFICADA: {len(muestra):,} ventas en {segundos_muestra:.2f} s ===")
+    estimacion, error = resumir_muestra(muestra, ['Region', 'Categoria'], TotalVenta=('TotalVenta', 'sum'))
+    tabla = estimacion.assign(**{'±95%': error['TotalVenta'], 'Error_%': error['TotalVenta'] / estimacion['TotalVenta'] * 100})
+    if args.exacto:
+        tabla['Exacto'] = agregar(engine, ['Region', 'Categoria'], TotalVenta=('TotalVenta', 'sum'))['TotalVenta']
+    print(tabla.round(2))
+
+    print("\n=== TICKET PROMEDIO POR REGIÓN ===")
+    estimacion, error = resumir_muestra(muestra, ['Region'], Ticket_Promedio=('TotalVenta', 'mean'))
+    tabla = estimacion.assign(**{'±95%': error['Ticket_Promedio']})
+    if args.exacto:
+        tabla['Exacto'] = agregar(engine, ['Region'], Ticket_Promedio=('TotalVenta', 'mean'))['Ticket_Promedio']
+    print(tabla.round(2))
+
+    print(f"\n=== CLIENTES DISTINTOS POR REGIÓN (HyperLogLog, bocetos en {segundos_bocetos:.2f} s) ===")
+    clientes = pd.Series({region: hll.estimar() for region, hll in bocetos['clientes'].items()},
+                         name='Clientes').sort_index()
+    error_hll = next(iter(bocetos['clientes'].values())).error_relativo if bocetos['clientes'] else 0
+    tabla = clientes.round().astype('int64').to_frame().assign(**{'±95%': (clientes * Z_95 * error_hll).round()})
+    if args.exacto:
+        # Cliente en agregaciones.py es el nombre; el boceto cuenta IDs
+        tabla['Exacto'] = pd.read_sql(text(CONSULTA_CLIENTES_DISTINTOS), engine).set_index('Region')['Clientes']
+    print(tabla)
+
+    print("\n=== CUANTILES DEL TICKET (t-digest) ===")
+    cuantiles = [0.5, 0.9, 0.99]
+    tabla = pd.DataFrame(
+        {region: [digest.cuantil(q) for q in cuantiles]
+         for region, digest in sorted(bocetos['tickets'].items())} | {'Total': [bocetos['total'].cuantil(q) for q in cuantiles]},
+        index=[f'p{int(q * 100)}' for q in cuantiles]
+    ).T
+    print(tabla.round(2))
+
+    engine.dispose()
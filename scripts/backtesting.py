@@ -0,0 +1,153 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed, TimeoutError
+import numpy as np
+import pandas as pd
+import os
+import time
+
+from proyeccion import FACTORES, crecimiento_base
+
+# ================================
+# BACKTESTING POR SERIE
+# ================================
+# Cada serie es la venta mensual de una combinación Región x Categoría x
+# Producto. Con origen móvil se entrena con los años anteriores y se prueba
+# contra el año siguiente: 2022-2023 -> 2024, y así con más historia.
+SEGMENTO = ['Region', 'Categoria', 'Producto']
+METODOS = ['proyeccion', 'tendencia']
+
+
+def series_mensuales(cubo):
+    """Matriz (series, años, 12) de TotalVenta a partir del cubo mensual."""
+    mensual = cubo.groupby(SEGMENTO + ['Año', 'Mes'])['TotalVenta'].sum()
+    años = sorted(mensual.index.get_level_values('Año').unique())
+    tabla = mensual.unstack(['Año', 'Mes'])
+    columnas = pd.MultiIndex.from_product([años, range(1, 13)], names=['Año', 'Mes'])
+    tabla = tabla.reindex(columns=columnas).fillna(0)
+    # La serie de toda la empresa también se evalúa, como la de 04_proyeccion_2025.py
+    total = pd.DataFrame([tabla.sum().values], columns=columnas,
+                         index=pd.MultiIndex.from_tuples([('Total', 'Total', 'Total')], names=SEGMENTO))
+    tabla = pd.concat([total, tabla])
+    return tabla.index, np.asarray(años), tabla.to_numpy().reshape(len(tabla), len(años), 12)
+
+
+def _pronostico_proyeccion(entrenamiento):
+    # Promedio por mes de los años de entrenamiento x crecimiento x estacionalidad
+    return entrenamiento.mean(axis=1) * crecimiento_base * FACTORES
+
+
+def _pronostico_tendencia(entrenamiento):
+    # Recta de np.polyfit sobre la serie mensual, como la tendencia de 03; polyfit
+    # acepta una columna por serie, así que todo el lote se ajusta de una vez
+    series, años, _ = entrenamiento.shape
+    x = np.arange(años * 12)
+    pendiente, ordenada = np.polyfit(x, entrenamiento.reshape(series, -1).T, 1)
+    futuro = np.arange(años * 12, años * 12 + 12)
+    return pendiente[:, None] * futuro + ordenada[:, None]
+
+
+PRONOSTICOS = {
+    'proyeccion': _pronostico_proyeccion,
+    'tendencia': _pronostico_tendencia,
+}
+
+
+def errores(real, pronostico):
+    """MAPE y sesgo en % por serie; los meses sin ventas no cuentan para el MAPE."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        relativo = np.where(real != 0, np.abs(real - pronostico) / np.abs(real), np.nan)
+        conteo = np.sum(~np.isnan(relativo), axis=1)
+        mape = np.where(conteo > 0, np.nansum(relativo, axis=1) / np.maximum(conteo, 1), np.nan) * 100
+        total_real = real.sum(axis=1)
+        sesgo = np.where(total_real != 0, (pronostico.sum(axis=1) - total_real) / total_real, np.nan) * 100
+    return mape, sesgo
+
+
+def evaluar_lote(inicio, valores, años, min_entrenamiento=2, limite=None):
+    """Evalúa todos los pliegues y métodos para un lote de series (corre en un proceso).
+
+    Con `limite` (time.time() de corte) el lote se abandona entre pliegues y
+    devuelve None: un proceso ya en marcha no se puede cancelar desde afuera.
+    """
+    filas = []
+    for i in range(min_entrenamiento, len(años)):
+        if limite is not None and time.time() > limite:
+            return None
+        entrenamiento, real = valores[:, :i, :], valores[:, i, :]
+        for metodo in METODOS:
+            mape, sesgo = errores(real, PRONOSTICOS[metodo](entrenamiento))
+            filas.append((inicio, metodo, int(años[i]), mape, sesgo))
+    return filas
+
+
+def backtesting(indice, años, valores, trabajadores=None, lote=500, presupuesto=None,
+                min_entrenamiento=2):
+    """Reparte las series en lotes por un pool de procesos y arma la tabla de errores.
+
+    Con `presupuesto` (segundos) los lotes que no terminan a tiempo se cancelan
+    y sus series quedan fuera de la tabla; se devuelve cuántas se evaluaron.
+    """
+    trabajadores = trabajadores or os.cpu_count()
+    inicio_reloj = time.perf_counter()
+    limite = None if presupuesto is None else time.time() + presupuesto
+    resultados = []
+    evaluadas = 0
+    ejecutor = ProcessPoolExecutor(max_workers=trabajadores)
+    futuros = {
+        ejecutor.submit(evaluar_lote, inicio, valores[inicio:inicio + lote], años, min_entrenamiento, limite):
+            min(lote, len(valores) - inicio)
+        for inicio in range(0, len(valores), lote)
+    }
+    try:
+        for futuro in as_completed(futuros, timeout=presupuesto):
+            filas_lote = futuro.result()
+            if filas_lote is not None:
+                resultados.extend(filas_lote)
+                evaluadas += futuros[futuro]
+    except TimeoutError:
+        pass
+    finally:
+        # Sin esperar: los lotes pendientes se cancelan y los que están corriendo
+        # se cortan solos en el próximo pliegue al pasar el límite
+        ejecutor.shutdown(wait=False, cancel_futures=True)
+
+    filas = []
+    for inicio, metodo, año, mape, sesgo in resultados:
+        for j in range(len(mape)):
+            filas.append((*indice[inicio + j], metodo, año, mape[j], sesgo[j]))
+    tabla = pd.DataFrame(filas, columns=SEGMENTO + ['Metodo', 'Año_Prueba', 'MAPE_%', 'Sesgo_%'])
+    tabla[['MAPE_%', 'Sesgo_%']] = tabla[['MAPE_%', 'Sesgo_%']].round(2)
+    segundos = time.perf_counter() - inicio_reloj
+    return tabla.sort_values(SEGMENTO + ['Metodo', 'Año_Prueba']), evaluadas, segundos
+
+
+if __name__ == '__main__':
+    # Uso: python scripts/backtesting.py --trabajadores 8 --presupuesto 60
+    import argparse
+    from datos import crear_engine, RUTA_BASE
+    from cubo import actualizar_cubo
+
+    parser = argparse.ArgumentParser(description='Backtesting de la proyección y la tendencia por serie')
+    parser.add_argument('--trabajadores', type=int, default=None, help='Procesos (por defecto, uno por CPU)')
+    parser.add_argument('--lote', type=int, default=500, help='Series por tarea del pool')
+    parser.add_argument('--presupuesto', type=float, default=None, help='Tiempo máximo en segundos')
+    parser.add_argument('--min-entrenamiento', type=int, default=2, help='Años mínimos de entrenamiento')
+    args = parser.parse_args()
+
+    engine = crear_engine()
+    cubo = actualizar_cubo(engine)
+    engine.dispose()
+
+    indice, años, valores = series_mensuales(cubo)
+    tabla, evaluadas, segundos = backtesting(
+        indice, años, valores, trabajadores=args.trabajadores, lote=args.lote,
+        presupuesto=args.presupuesto, min_entrenamiento=args.min_entrenamiento
+    )
+
+    print(f"=== BACKTESTING ({evaluadas:,} de {len(valores):,} series en {segundos:.2f} s) ===")
+    print(tabla[tabla['Region'] == 'Total'].to_string(index=False))
+    print("\n=== ERROR MEDIO POR MÉTODO Y AÑO DE PRUEBA ===")
+    print(tabla.groupby(['Metodo', 'Año_Prueba'])[['MAPE_%', 'Sesgo_%']].median().round(2))
+
+    ruta_salida = os.path.join(RUTA_BASE, 'salida', 'backtesting.csv')
+    tabla.to_csv(ruta_salida, index=False)
+    print(f"\n✅ Tabla de errores guardada en: {ruta_salida}")
@@ -0,0 +1,175 @@
+import pandas as pd
+from sqlalchemy import text
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+from datos import RUTA_CACHE
+
+# ================================
+# CACHÉ DE RESULTADOS DE CONSULTAS
+# ================================
+# Los mismos GROUP BY y la consulta de clientes por región se repiten entre
+# scripts y corridas. Cada resultado se guarda en parquet con la huella
+# (COUNT(*), MAX(ID)) de las tablas que lee; si alguna cambió, la entrada
+# se descarta. El espacio en disco está acotado y se desaloja la entrada
+# usada hace más tiempo.
+# La tabla de hechos completa no pasa por aquí: ya la guarda el almacén
+# incremental de datos.py (cache/ventas/).
+RUTA_CONSULTAS = os.path.join(RUTA_CACHE, 'consultas')
+RUTA_INDICE = os.path.join(RUTA_CONSULTAS, 'indice.json')
+
+ACTIVA = os.getenv('CACHE_CONSULTAS', '1') != '0'
+MAX_MB = float(os.getenv('CACHE_CONSULTAS_MB', '256'))
+
+_candado = threading.Lock()
+
+
+def normalizar(sql):
+    return re.sub(r'\s+', ' ', str(sql)).strip()
+
+
+def tablas_consultadas(sql):
+    return sorted(set(re.findall(r'\b(?:FROM|JOIN)\s+(\w+)', normalizar(sql), flags=re.IGNORECASE)))
+
+
+def clave_consulta(engine, sql, parametros=None):
+    origen = engine.url.render_as_string(hide_password=True)
+    contenido = json.dumps([origen, normalizar(sql), parametros or {}], sort_keys=True, default=str)
+    return hashlib.sha256(contenido.encode('utf-8')).hexdigest()
+
+
+def huellas_tablas(engine, tablas):
+    """{tabla: [filas, max_id]} con una sola consulta para todas las tablas.
+
+    Se consultan en cada lectura, sin reutilizarlas: quien llama compara su
+    propia huella de `ventas` y una entrada vieja no puede pasar por vigente.
+    """
+    if not tablas:
+        return {}
+    consulta = ' UNION ALL '.join(f"SELECT '{tabla}', COUNT(*), MAX(ID) FROM {tabla}" for tabla in tablas)
+    with engine.connect() as conexion:
+        return {
+            tabla: [int(filas), None if max_id is None else int(max_id)]
+            for tabla, filas, max_id in conexion.execute(text(consulta))
+        }
+
+
+# ================================
+# ÍNDICE EN DISCO
+# ================================
+def _leer_indice():
+    if not os.path.exists(RUTA_INDICE):
+        return {'entradas': {}, 'estadisticas': {'aciertos': 0, 'fallos': 0, 'invalidadas': 0, 'desalojadas': 0}}
+    with open(RUTA_INDICE, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _guardar_indice(indice):
+    os.makedirs(RUTA_CONSULTAS, exist_ok=True)
+    temporal = RUTA_INDICE + '.tmp'
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(indice, f, indent=2)
+    os.replace(temporal, RUTA_INDICE)
+
+
+def _borrar(clave):
+    ruta = os.path.join(RUTA_CONSULTAS, f'{clave}.parquet')
+    if os.path.exists(ruta):
+        os.remove(ruta)
+
+
+def _desalojar(indice):
+    # LRU: se borran las entradas usadas hace más tiempo hasta entrar en MAX_MB
+    limite = MAX_MB * 1024 ** 2
+    total = sum(entrada['bytes'] for entrada in indice['entradas'].values())
+    for clave, entrada in sorted(indice['entradas'].items(), key=lambda item: item[1]['ultimo_uso']):
+        if total <= limite:
+            break
+        _borrar(clave)
+        total -= entrada['bytes']
+        del indice['entradas'][clave]
+        indice['estadisticas']['desalojadas'] += 1
+
+
+def leer_sql(engine, consulta, parametros=None, usar_cache=None):
+    """pd.read_sql con caché en disco; se invalida cuando cambia alguna tabla leída."""
+    if not (ACTIVA if usar_cache is None else usar_cache):
+        return pd.read_sql(consulta, engine, params=parametros)
+
+    clave = clave_consulta(engine, consulta, parametros)
+    huellas = huellas_tablas(engine, tablas_consultadas(consulta))
+    ruta = os.path.join(RUTA_CONSULTAS, f'{clave}.parquet')
+
+    with _candado:
+        indice = _leer_indice()
+        entrada = indice['entradas'].get(clave)
+        if entrada is not None and entrada['huellas'] == huellas and os.path.exists(ruta):
+            entrada['ultimo_uso'] = time.time()
+            indice['estadisticas']['aciertos'] += 1
+            _guardar_indice(indice)
+            return pd.read_parquet(ruta)
+        if entrada is not None:
+            indice['estadisticas']['invalidadas'] += 1
+        indice['estadisticas']['fallos'] += 1
+        _guardar_indice(indice)
+
+    resultado = pd.read_sql(consulta, engine, params=parametros)
+
+    with _candado:
+        os.makedirs(RUTA_CONSULTAS, exist_ok=True)
+        temporal = ruta + '.tmp'
+        resultado.to_parquet(temporal)
+        os.replace(temporal, ruta)
+        indice = _leer_indice()
+        indice['entradas'][clave] = {
+            'sql': normalizar(consulta)[:200],
+            'huellas': huellas,
+            'bytes': os.path.getsize(ruta),
+            'ultimo_uso': time.time(),
+        }
+        _desalojar(indice)
+        _guardar_indice(indice)
+    return resultado
+
+
+def estadisticas():
+    indice = _leer_indice()
+    consultas = indice['estadisticas']['aciertos'] + indice['estadisticas']['fallos']
+    return {
+        **indice['estadisticas'],
+        'tasa_aciertos': indice['estadisticas']['aciertos'] / consultas if consultas else None,
+        'entradas': len(indice['entradas']),
+        'mb': sum(entrada['bytes'] for entrada in indice['entradas'].values()) / 1024 ** 2,
+    }
+
+
+def limpiar():
+    with _candado:
+        for clave in _leer_indice()['entradas']:
+            _borrar(clave)
+        if os.path.exists(RUTA_INDICE):
+            os.remove(RUTA_INDICE)
+
+
+if __name__ == '__main__':
+    # Uso: python scripts/cache_consultas.py [--limpiar]
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Estadísticas de la caché de consultas')
+    parser.add_argument('--limpiar', action='store_true', help='Borra todas las entradas y los contadores')
+    args = parser.parse_args()
+
+    if args.limpiar:
+        limpiar()
+        print("✅ Caché de consultas vacía")
+    else:
+        e = estadisticas()
+        tasa = '-' if e['tasa_aciertos'] is None else f"{e['tasa_aciertos']:.0%}"
+        print("=== CACHÉ DE CONSULTAS ===")
+        print(f"Aciertos: {e['aciertos']:,}  Fallos: {e['fallos']:,}  Tasa de aciertos: {tasa}")
+        print(f"Invalidadas: {e['invalidadas']:,}  Desalojadas: {e['desalojadas']:,}")
+        print(f"Entradas: {e['entradas']:,}  Tamaño: {e['mb']:.2f} MB de {MAX_MB:g} MB")
@@ -1,128 +1,146 @@
 import mysql.connector
-from faker import Faker
-import random
-from datetime import date
+from concurrent.futures import ProcessPoolExecutor
 from dotenv import load_dotenv
+import argparse
+import importlib.util
 import os
+import tempfile
+import time
+
+from generador import (
+    REGIONES, CATEGORIAS, PRODUCTOS, FECHAS_CLIENTES, FECHAS_VENDEDORES,
+    NOMBRES_RESPALDO, APELLIDOS_RESPALDO, tamanos, generar_personas, generar_ventas, bloques_ventas
+)
 
 load_dotenv()
-fake = Faker('es_MX')  # Datos en español
 
-conexion = mysql.connector.connect(
-    host=os.getenv('DB_HOST'),
-    user=os.getenv('DB_USER'),
-    password=os.getenv('DB_PASSWORD'),
-    database='ventas_portafolio'
-)
-cursor = conexion.cursor()
-
-# REGIONES
-regiones = ['Norte', 'Sur', 'Este', 'Oeste', 'Centro']
-for region in regiones:
-    cursor.execute("INSERT INTO regiones (Nombre) VALUES (%s)", (region,))
-
-# CATEGORÍAS
-categorias = ['Electrónica', 'Ropa', 'Hogar', 'Deportes', 'Alimentos']
-for categoria in categorias:
-    cursor.execute("INSERT INTO categorias (Nombre) VALUES (%s)", (categoria,))
-
-conexion.commit()
-print("✅ Regiones y categorías creadas!")
-
-# PRODUCTOS con costos y precios coherentes por categoría
-productos = [
-    ('Laptop', 1, 800, 1200),
-    ('Smartphone', 1, 400, 650),
-    ('Tablet', 1, 300, 480),
-    ('Audífonos', 1, 50, 90),
-    ('Smart TV', 1, 500, 800),
-    ('Camisa', 2, 15, 35),
-    ('Pantalón', 2, 20, 50),
-    ('Zapatos', 2, 30, 80),
-    ('Vestido', 2, 25, 65),
-    ('Chaqueta', 2, 40, 100),
-    ('Sofá', 3, 300, 600),
-    ('Mesa', 3, 150, 300),
-    ('Lámpara', 3, 30, 70),
-    ('Silla', 3, 80, 160),
-    ('Estante', 3, 60, 120),
-    ('Bicicleta', 4, 200, 380),
-    ('Pesas', 4, 40, 80),
-    ('Tenis', 4, 45, 90),
-    ('Mochila', 4, 25, 55),
-    ('Tienda Camping', 4, 100, 200),
-    ('Arroz 5kg', 5, 5, 10),
-    ('Aceite 1L', 5, 3, 6),
-    ('Café 500g', 5, 8, 15),
-    ('Azúcar 2kg', 5, 4, 8),
-    ('Pasta 500g', 5, 2, 5),
-]
-
-for producto in productos:
-    cursor.execute("""
-        INSERT INTO productos (Nombre, Categoria, Costo, PrecioVenta) 
-        VALUES (%s, %s, %s, %s)
-    """, producto)
-
-conexion.commit()
-print("✅ Productos creados!")
-
-# CLIENTES - 200 clientes
-for _ in range(200):
-    cursor.execute("""
-        INSERT INTO clientes (Nombre, Apellido, Email, Region, FechaRegistro)
+
+def conectar(metodo):
+    return mysql.connector.connect(
+        host=os.getenv('DB_HOST'),
+        user=os.getenv('DB_USER'),
+        password=os.getenv('DB_PASSWORD'),
+        database='ventas_portafolio',
+        allow_local_infile=(metodo == 'infile')
+    )
+
+
+# ================================
+# INSERCIÓN MASIVA
+# ================================
+def insertar(conexion, tabla, df, metodo, lote):
+    """Inserta un DataFrame completo con executemany por lotes o LOAD DATA LOCAL INFILE."""
+    columnas = list(df.columns)
+    cursor = conexion.cursor()
+    if metodo == 'infile':
+        # CSV temporal: MySQL lo lee de una vez, sin armar un INSERT por lote
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, encoding='utf-8', newline='') as f:
+            df.to_csv(f, index=False, header=False, date_format='%Y-%m-%d')
+            ruta = f.name
+        try:
+            cursor.execute(f"""
+                LOAD DATA LOCAL INFILE '{ruta.replace(os.sep, '/')}' INTO TABLE {tabla}
+                CHARACTER SET utf8mb4
+                FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"'
+                LINES TERMINATED BY '\\n'
+                ({', '.join(columnas)})
+            """)
+        finally:
+            os.remove(ruta)
+    else:
+        sql = f"INSERT INTO {tabla} ({', '.join(columnas)}) VALUES ({', '.join(['%s'] * len(columnas))})"
+        filas = df.astype(object).where(df.notna(), None).to_numpy().tolist()
+        for inicio in range(0, len(filas), lote):
+            # mysql.connector convierte executemany de INSERT en un INSERT multi-fila
+            cursor.executemany(sql, filas[inicio:inicio + lote])
+    conexion.commit()
+    cursor.close()
+
+
+def _cargar_bloque(bloque, semilla, n_clientes, n_vendedores, metodo, lote):
+    # Cada proceso genera e inserta su propio bloque con su propia conexión
+    parte, id_inicial, filas = bloque
+    ventas = generar_ventas(filas, semilla, parte, id_inicial, n_clientes, n_vendedores)
+    ventas['Fecha'] = ventas['Fecha'].dt.strftime('%Y-%m-%d')
+    conexion = conectar(metodo)
+    insertar(conexion, 'ventas', ventas, metodo, lote)
+    conexion.close()
+    return filas
+
+
+def reportar(tabla, filas, inicio):
+    segundos = time.perf_counter() - inicio
+    print(f"✅ {filas:,} {tabla} creados en {segundos:.2f} s ({filas / max(segundos, 1e-9):,.0f} filas/s)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Genera datos de prueba para ventas_portafolio')
+    parser.add_argument('--escala', type=float, default=1,
+                        help='Factor de escala: 1 = 200 clientes, 20 vendedores y 2,000 ventas')
+    parser.add_argument('--metodo', choices=['executemany', 'infile'], default='executemany',
+                        help='executemany por lotes o LOAD DATA LOCAL INFILE desde CSV')
+    parser.add_argument('--lote', type=int, default=10_000, help='Filas por executemany')
+    parser.add_argument('--bloque', type=int, default=500_000, help='Ventas generadas por bloque/proceso')
+    parser.add_argument('--procesos', type=int, default=1, help='Procesos para generar e insertar ventas')
+    parser.add_argument('--semilla', type=int, default=42)
+    args = parser.parse_args()
+
+    n = tamanos(args.escala)
+    # Sin Faker los nombres salen de una lista fija: con más clientes que
+    # combinaciones se repetirían en masa, así que se corta antes de insertar
+    combinaciones = len(NOMBRES_RESPALDO) * len(APELLIDOS_RESPALDO)
+    if importlib.util.find_spec('faker') is None and n['clientes'] > combinaciones:
+        parser.error(f"Faker no está instalado y sin él solo hay {combinaciones} combinaciones de nombre "
+                     f"para {n['clientes']:,} clientes: pip install -r requirements.txt o baja --escala")
+    conexion = conectar(args.metodo)
+    cursor = conexion.cursor()
+    inicio_total = time.perf_counter()
+
+    # REGIONES Y CATEGORÍAS
+    cursor.executemany("INSERT INTO regiones (ID, Nombre) VALUES (%s, %s)",
+                       list(enumerate(REGIONES, start=1)))
+    cursor.executemany("INSERT INTO categorias (ID, Nombre) VALUES (%s, %s)",
+                       list(enumerate(CATEGORIAS, start=1)))
+    conexion.commit()
+    print("✅ Regiones y categorías creadas!")
+
+    # PRODUCTOS
+    cursor.executemany("""
+        INSERT INTO productos (ID, Nombre, Categoria, Costo, PrecioVenta)
         VALUES (%s, %s, %s, %s, %s)
-    """, (
-        fake.first_name(),
-        fake.last_name(),
-        fake.email(),
-        random.randint(1, 5),
-        fake.date_between(start_date=date(2020, 1, 1), end_date=date(2021, 12, 31))
-    ))
-
-conexion.commit()
-print("✅ 200 clientes creados!")
-
-# VENDEDORES - 20 vendedores
-for _ in range(20):
-    cursor.execute("""
-        INSERT INTO vendedores (Nombre, Apellido, Region, FechaIngreso)
-        VALUES (%s, %s, %s, %s)
-    """, (
-        fake.first_name(),
-        fake.last_name(),
-        random.randint(1, 5),
-        fake.date_between(start_date=date(2019, 1, 1), end_date=date(2022, 12, 31))
-    ))
-
-conexion.commit()
-print("✅ 20 vendedores creados!")
-
-# VENTAS - 2000 registros coherentes
-cursor.execute("SELECT ID, PrecioVenta FROM productos")
-productos_db = cursor.fetchall()
-
-for _ in range(2000):
-    producto = random.choice(productos_db)
-    descuento = random.choice([0, 0, 0, 5, 10, 15, 20])  # Mayoría sin descuento
-    precio_final = round(float(producto[1]) * (1 - descuento/100), 2)
-    
-    cursor.execute("""
-        INSERT INTO ventas (Fecha, Cliente, Vendedor, Producto, Cantidad, PrecioVenta, Descuento)
-        VALUES (%s, %s, %s, %s, %s, %s, %s)
-    """, (
-        fake.date_between(start_date=date(2022, 1, 1), end_date=date(2024, 12, 31)),
-        random.randint(1, 200),
-        random.randint(1, 20),
-        producto[0],
-        random.randint(1, 5),
-        precio_final,
-        descuento
-    ))
-
-conexion.commit()
-print("✅ 2000 registros de ventas creados!")
-
-cursor.close()
-conexion.close()
-print("\n🎉 Base de datos lista para el análisis!")
\ No newline at end of file
+    """, [(i, *producto) for i, producto in enumerate(PRODUCTOS, start=1)])
+    conexion.commit()
+    cursor.close()
+    print("✅ Productos creados!")
+
+    # CLIENTES
+    inicio = time.perf_counter()
+    clientes = generar_personas(n['clientes'], args.semilla, FECHAS_CLIENTES, con_email=True)
+    clientes = clientes.rename(columns={'Fecha': 'FechaRegistro'})
+    clientes['FechaRegistro'] = clientes['FechaRegistro'].dt.strftime('%Y-%m-%d')
+    insertar(conexion, 'clientes', clientes, args.metodo, args.lote)
+    reportar('clientes', n['clientes'], inicio)
+
+    # VENDEDORES
+    inicio = time.perf_counter()
+    vendedores = generar_personas(n['vendedores'], args.semilla + 1, FECHAS_VENDEDORES)
+    vendedores = vendedores.rename(columns={'Fecha': 'FechaIngreso'})
+    vendedores['FechaIngreso'] = vendedores['FechaIngreso'].dt.strftime('%Y-%m-%d')
+    insertar(conexion, 'vendedores', vendedores, args.metodo, args.lote)
+    reportar('vendedores', n['vendedores'], inicio)
+    conexion.close()
+
+    # VENTAS - bloques deterministas, en paralelo si se piden procesos
+    inicio = time.perf_counter()
+    bloques = bloques_ventas(n['ventas'], args.bloque)
+    parametros = (args.semilla, n['clientes'], n['vendedores'], args.metodo, args.lote)
+    if args.procesos > 1:
+        with ProcessPoolExecutor(max_workers=args.procesos) as ejecutor:
+            filas = sum(ejecutor.map(_cargar_bloque, bloques, *[[p] * len(bloques) for p in parametros]))
+    else:
+        filas = sum(_cargar_bloque(bloque, *parametros) for bloque in bloques)
+    reportar('registros de ventas', filas, inicio)
+
+    total = sum(n.values()) + len(REGIONES) + len(CATEGORIAS) + len(PRODUCTOS)
+    reportar('registros en total', total, inicio_total)
+    print("\n🎉 Base de datos lista para el análisis!")
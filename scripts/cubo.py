@@ -0,0 +1,140 @@
+import pandas as pd
+from sqlalchemy import text
+import json
+import os
+
+from datos import RUTA_CACHE, huella_ventas
+from agregaciones import agregar, agregar_pandas
+
+# ================================
+# CUBO MENSUAL PRE-AGREGADO
+# ================================
+# Casi todos los resúmenes de 02, 03 y 04 son sumas por mes, región y
+# categoría (a veces producto). El cubo guarda esas sumas a ese grano y se
+# actualiza solo con las ventas nuevas, así que consultarlo no depende del
+# tamaño de la tabla de hechos.
+RUTA_CUBO = os.path.join(RUTA_CACHE, 'cubo_mensual.parquet')
+RUTA_META_CUBO = os.path.join(RUTA_CACHE, 'cubo_mensual.json')
+
+GRANO = ['Año', 'Mes', 'Region', 'Categoria', 'Producto']
+
+MEDIDAS_CUBO = {
+    'TotalVenta': ('TotalVenta', 'sum'),
+    'TotalCosto': ('TotalCosto', 'sum'),
+    'Ganancia': ('Ganancia', 'sum'),
+    'Cantidad': ('Cantidad', 'sum'),
+    # COUNT(TotalVenta): mismo conteo que usan los scripts para Transacciones
+    'Transacciones': ('TotalVenta', 'count'),
+}
+
+
+def _agregar_ventas(engine, hasta, marca=None):
+    # Acotado por el MAX(ID) de la huella que se guarda: una venta insertada
+    # mientras tanto queda para la próxima actualización en lugar de sumarse
+    # sin constar en la meta
+    filtros = {'ID': ('<=', hasta) if marca is None else ('BETWEEN', (marca + 1, hasta))}
+    # Con claves nulas incluidas el cubo suma exactamente lo mismo que las filas crudas
+    return agregar(engine, GRANO, filtros, incluir_nulos=True, **MEDIDAS_CUBO).reset_index()
+
+
+def _combinar(cubo, nuevas):
+    combinado = pd.concat([cubo, nuevas], ignore_index=True)
+    return combinado.groupby(GRANO, dropna=False).sum().reset_index()
+
+
+def _guardar(cubo, meta, ruta_cubo, ruta_meta):
+    os.makedirs(os.path.dirname(ruta_cubo), exist_ok=True)
+    temporal = ruta_cubo + '.tmp'
+    cubo.to_parquet(temporal, index=False)
+    os.replace(temporal, ruta_cubo)
+    with open(ruta_meta, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+
+
+def actualizar_cubo(engine, completo=False, ruta_cache=None):
+    """Devuelve el cubo al día, agregando solo las ventas con ID mayor a la marca de agua.
+
+    Con `ruta_cache` el cubo y su meta se guardan en esa carpeta en lugar de
+    RUTA_CUBO y RUTA_META_CUBO.
+    """
+    ruta_cubo, ruta_meta = RUTA_CUBO, RUTA_META_CUBO
+    if ruta_cache is not None:
+        ruta_cubo = os.path.join(ruta_cache, 'cubo_mensual.parquet')
+        ruta_meta = os.path.join(ruta_cache, 'cubo_mensual.json')
+    huella = huella_ventas(engine)
+    meta = None
+    if not completo and os.path.exists(ruta_meta) and os.path.exists(ruta_cubo):
+        with open(ruta_meta, encoding='utf-8') as f:
+            meta = json.load(f)
+
+    if meta is not None and meta == huella:
+        return pd.read_parquet(ruta_cubo)
+
+    if meta is not None and meta['max_id'] is not None and (huella['max_id'] or 0) >= meta['max_id']:
+        with engine.connect() as conexion:
+            nuevas_filas = conexion.execute(
+                text("SELECT COUNT(*) FROM ventas WHERE ID > :marca AND ID <= :hasta"),
+                {'marca': meta['max_id'], 'hasta': huella['max_id']}
+            ).scalar()
+        # Si solo hubo inserciones con IDs nuevos, basta con sumarlas al cubo
+        if meta['filas'] + nuevas_filas == huella['filas']:
+            cubo = _combinar(pd.read_parquet(ruta_cubo), _agregar_ventas(engine, huella['max_id'], meta['max_id']))
+            _guardar(cubo, huella, ruta_cubo, ruta_meta)
+            return cubo
+
+    cubo = _agregar_ventas(engine, huella['max_id'] or 0)
+    _guardar(cubo, huella, ruta_cubo, ruta_meta)
+    return cubo
+
+
+def resumir_cubo(cubo, por, filtros=None, **agregaciones):
+    """Misma especificación que `agregar`, resuelta sobre el cubo.
+
+    Las sumas se vuelven a sumar, los conteos suman Transacciones y los
+    promedios se calculan como suma / Transacciones.
+    """
+    columnas = list(por) + list(filtros or {})
+    if 'AñoMes' in columnas and 'AñoMes' not in cubo:
+        # La clave yyyymm se deriva del grano; int32 para que Año * 100 no desborde
+        cubo = cubo.assign(AñoMes=cubo['Año'].astype('int32') * 100 + cubo['Mes'])
+    if any(columna not in GRANO + ['AñoMes'] for columna in columnas):
+        raise ValueError(f"El cubo solo agrupa y filtra por {GRANO} y AñoMes")
+
+    traducidas = {}
+    promedios = {}
+    for nombre, (columna, funcion) in agregaciones.items():
+        if funcion == 'sum' and columna in MEDIDAS_CUBO:
+            traducidas[nombre] = (columna, 'sum')
+        elif funcion == 'count':
+            traducidas[nombre] = ('Transacciones', 'sum')
+        elif funcion == 'mean' and columna in MEDIDAS_CUBO:
+            traducidas[f'_{nombre}_suma'] = (columna, 'sum')
+            traducidas[f'_{nombre}_conteo'] = ('Transacciones', 'sum')
+            promedios[nombre] = (f'_{nombre}_suma', f'_{nombre}_conteo')
+        else:
+            raise ValueError(f"El cubo no puede resolver {funcion!r} sobre {columna!r}")
+
+    resultado = agregar_pandas(cubo, por, filtros, **traducidas)
+    for nombre, (suma, conteo) in promedios.items():
+        resultado[nombre] = resultado[suma] / resultado[conteo]
+    for nombre, (_, funcion) in agregaciones.items():
+        if funcion == 'count':
+            resultado[nombre] = resultado[nombre].astype('int64')
+    return resultado[list(agregaciones)]
+
+
+if __name__ == '__main__':
+    # Actualización del cubo: python scripts/cubo.py [--completo]
+    import argparse
+    import time
+    from datos import crear_engine
+
+    parser = argparse.ArgumentParser(description='Actualiza el cubo mensual de ventas')
+    parser.add_argument('--completo', action='store_true', help='Reconstruye el cubo desde cero')
+    args = parser.parse_args()
+
+    engine = crear_engine()
+    inicio = time.perf_counter()
+    cubo = actualizar_cubo(engine, completo=args.completo)
+    print(f"✅ Cubo con {len(cubo):,} celdas actualizado en {time.perf_counter() - inicio:.2f} s")
+    engine.dispose()
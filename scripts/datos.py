@@ -0,0 +1,408 @@
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, text
+from urllib.parse import quote_plus
+from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor
+import pyarrow as pa
+import pyarrow.parquet as pq
+import json
+import os
+import shutil
+
+load_dotenv()
+
+# ================================
+# RUTAS DEL ALMACÉN LOCAL
+# ================================
+# Ruta dinámica que funciona sin importar dónde esté el proyecto
+RUTA_BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUTA_CACHE = os.path.join(RUTA_BASE, 'cache')
+# La tabla de hechos se guarda como varias partes Parquet: la carga
+# completa es la primera y cada sincronización incremental agrega otra
+RUTA_ALMACEN = os.path.join(RUTA_CACHE, 'ventas')
+RUTA_META = os.path.join(RUTA_CACHE, 'ventas.json')
+# A partir de este número de partes se compactan en una sola
+MAX_PARTES = 30
+
+# 'join': el JOIN se hace en MySQL (CONSULTA_VENTAS)
+# 'estrella': se traen claves enteras y el JOIN se hace en el cliente (dimensiones.py)
+EXTRACCION = os.getenv('EXTRACCION_VENTAS', 'join')
+# Conexiones simultáneas para la extracción por rangos de ID (1 = una sola consulta)
+PARALELISMO = int(os.getenv('PARALELISMO_EXTRACCION', '1'))
+# Rangos por trabajador: más rangos reparten mejor los huecos de IDs
+RANGOS_POR_TRABAJADOR = 4
+# Dónde corren las consultas: 'mysql', o una copia local 'duckdb' / 'sqlite' (embebida.py)
+BACKEND = os.getenv('BACKEND_ANALISIS', 'mysql')
+
+# ================================
+# CONSULTA DE LA TABLA DE HECHOS
+# ================================
+# Un solo JOIN con todas las columnas que usan los scripts 01-04
+CONSULTA_VENTAS = """
+    SELECT
+        v.ID,
+        v.Fecha,
+        v.Cantidad,
+        v.PrecioVenta,
+        v.Descuento,
+        (v.Cantidad * v.PrecioVenta) AS TotalVenta,
+        (v.Cantidad * p.Costo) AS TotalCosto,
+        ((v.Cantidad * v.PrecioVenta) - (v.Cantidad * p.Costo)) AS Ganancia,
+        vd.Nombre AS Vendedor,
+        vd.Apellido AS ApellidoVendedor,
+        c.Nombre AS Cliente,
+        c.Apellido AS ApellidoCliente,
+        r.Nombre AS Region,
+        p.Nombre AS Producto,
+        cat.Nombre AS Categoria
+    FROM ventas v
+    LEFT JOIN vendedores vd ON v.Vendedor = vd.ID
+    LEFT JOIN clientes c ON v.Cliente = c.ID
+    LEFT JOIN productos p ON v.Producto = p.ID
+    LEFT JOIN categorias cat ON p.Categoria = cat.ID
+    LEFT JOIN regiones r ON vd.Region = r.ID
+"""
+
+
+# Columnas DECIMAL de MySQL que llegan como objetos Decimal
+COLUMNAS_DINERO = ['PrecioVenta', 'Descuento', 'TotalVenta', 'TotalCosto', 'Ganancia']
+# Nombres repetidos en cada venta: se guardan como categorías en memoria
+COLUMNAS_DIMENSION = ['Vendedor', 'ApellidoVendedor', 'Cliente', 'ApellidoCliente',
+                      'Region', 'Producto', 'Categoria']
+
+
+# Conteo de clientes por región de 03_analisis_profundo.py
+CONSULTA_CLIENTES_REGION = """
+    SELECT r.Nombre AS Region, COUNT(c.ID) AS Total_Clientes
+    FROM clientes c
+    LEFT JOIN regiones r ON c.Region = r.ID
+    GROUP BY r.Nombre
+    ORDER BY Total_Clientes DESC
+"""
+
+
+def crear_engine(driver='mysqlconnector', base=None, backend=None, **opciones):
+    backend = backend or BACKEND
+    if backend != 'mysql':
+        # Copia local de las tablas (ver embebida.py); las consultas son las mismas
+        from embebida import engine_embebido
+        return engine_embebido(backend)
+    # Para leer con cursor del servidor se usa driver='pymysql': el dialecto
+    # mysqlconnector de SQLAlchemy no soporta stream_results
+    password = quote_plus(os.getenv('DB_PASSWORD'))
+    # El pool queda acotado: nunca más conexiones que trabajadores de extracción
+    opciones.setdefault('pool_size', max(5, PARALELISMO))
+    opciones.setdefault('max_overflow', 0)
+    return create_engine(f'mysql+{driver}://{os.getenv("DB_USER")}:{password}@{os.getenv("DB_HOST")}/{base or os.getenv("DB_NAME")}',
+                         **opciones)
+
+
+def huella_ventas(engine):
+    """Resumen barato de `ventas` para saber si el snapshot sigue vigente."""
+    with engine.connect() as conexion:
+        filas, max_id, max_fecha = conexion.execute(
+            text("SELECT COUNT(*), MAX(ID), MAX(Fecha) FROM ventas")
+        ).one()
+    return {
+        'filas': int(filas),
+        'max_id': None if max_id is None else int(max_id),
+        'max_fecha': None if max_fecha is None else str(max_fecha),
+    }
+
+
+def rutas_almacen(ruta_cache=None):
+    """(carpeta de partes, archivo de meta) del almacén dentro de `ruta_cache`.
+
+    Sin `ruta_cache` son las del proyecto, RUTA_ALMACEN y RUTA_META.
+    """
+    if ruta_cache is None:
+        return RUTA_ALMACEN, RUTA_META
+    return os.path.join(ruta_cache, 'ventas'), os.path.join(ruta_cache, 'ventas.json')
+
+
+def _filas_almacen(almacen):
+    # Solo lee los pies de los archivos Parquet, no los datos
+    return sum(
+        pq.ParquetFile(os.path.join(almacen, archivo)).metadata.num_rows
+        for archivo in os.listdir(almacen) if not archivo.startswith('.')
+    )
+
+
+def _leer_meta(almacen, ruta_meta):
+    if not os.path.exists(ruta_meta) or not os.path.isdir(almacen):
+        return None
+    with open(ruta_meta, encoding='utf-8') as f:
+        meta = json.load(f)
+    # Si una compactación se cortó entre escribir la parte 0 y borrar las demás,
+    # hay filas repetidas: el almacén no cuadra con la meta y se recarga
+    if _filas_almacen(almacen) != meta['filas']:
+        return None
+    return meta
+
+
+def _guardar_meta(meta, ruta_meta):
+    temporal = ruta_meta + '.tmp'
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(temporal, ruta_meta)
+
+
+def _escribir_parte(df, almacen, nombre, esquema=None):
+    # Las categorías de cada lote pueden variar: en disco se guardan como texto
+    # y Parquet se encarga de codificarlas por diccionario
+    for columna in df.select_dtypes('category'):
+        df[columna] = df[columna].astype(object)
+    tabla = pa.Table.from_pandas(df, preserve_index=False)
+    if esquema is not None:
+        # Los DECIMAL de MySQL pueden inferirse con otra precisión en cada lote
+        tabla = tabla.cast(esquema)
+    # Los archivos que empiezan con punto no se leen como parte del almacén
+    temporal = os.path.join(almacen, '.' + nombre + '.tmp')
+    pq.write_table(tabla, temporal)
+    os.replace(temporal, os.path.join(almacen, nombre))
+
+
+def _nombre_parte(desde_id):
+    # El nombre depende de la marca de agua: repetir una sincronización
+    # interrumpida sobrescribe la misma parte en lugar de duplicar filas
+    return f'parte_{desde_id:012d}.parquet'
+
+
+def _leer_almacen(almacen, columnas=None):
+    return pd.read_parquet(almacen, columns=columnas)
+
+
+# ================================
+# EXTRACCIÓN PARALELA POR RANGOS
+# ================================
+def rangos_id(desde, hasta, partes):
+    """Divide [desde, hasta] en `partes` rangos contiguos de IDs."""
+    paso = max(1, -(-(hasta - desde + 1) // partes))
+    return [(inicio, min(inicio + paso - 1, hasta)) for inicio in range(desde, hasta + 1, paso)]
+
+
+def _leer_rango(engine, consulta, desde, hasta):
+    with engine.connect() as conexion:
+        return pd.read_sql(text(consulta + " WHERE v.ID BETWEEN :desde AND :hasta"), conexion,
+                           params={'desde': desde, 'hasta': hasta})
+
+
+def leer_hechos(engine, consulta, marca=None, trabajadores=None, hasta=None):
+    """Lee una consulta sobre `ventas v` con IDs mayores a `marca` y hasta `hasta`.
+
+    Con más de un trabajador el rango de IDs se parte y cada trozo se pide por
+    su propia conexión del pool, en paralelo; el driver libera el GIL mientras
+    espera a MySQL, así que alcanza con hilos.
+    """
+    trabajadores = trabajadores or PARALELISMO
+    condiciones, parametros = [], {}
+    if marca is not None:
+        condiciones.append("ID > :marca")
+        parametros['marca'] = marca
+    if hasta is not None:
+        condiciones.append("ID <= :hasta")
+        parametros['hasta'] = hasta
+    if trabajadores <= 1:
+        if not condiciones:
+            return pd.read_sql(consulta, engine)
+        donde = " AND ".join("v." + condicion for condicion in condiciones)
+        return pd.read_sql(text(consulta + " WHERE " + donde), engine, params=parametros)
+
+    donde = " WHERE " + " AND ".join(condiciones) if condiciones else ""
+    with engine.connect() as conexion:
+        minimo, maximo = conexion.execute(
+            text("SELECT MIN(ID), MAX(ID) FROM ventas" + donde), parametros
+        ).one()
+    if minimo is None:
+        return pd.read_sql(text(consulta + " WHERE 1 = 0"), engine)
+
+    rangos = rangos_id(int(minimo), int(maximo), trabajadores * RANGOS_POR_TRABAJADOR)
+    with ThreadPoolExecutor(max_workers=trabajadores) as ejecutor:
+        partes = list(ejecutor.map(lambda rango: _leer_rango(engine, consulta, *rango), rangos))
+    return pd.concat(partes, ignore_index=True)
+
+
+def _extraer(engine, extraccion, marca=None, trabajadores=None, hasta=None, ruta_cache=None):
+    if extraccion == 'estrella':
+        # Importado aquí porque dimensiones.py depende de este módulo
+        from dimensiones import extraer_estrella
+        return extraer_estrella(engine, marca, trabajadores, hasta, ruta_cache)
+    if extraccion != 'join':
+        raise ValueError(f"Modo de extracción desconocido: {extraccion!r}")
+    df = leer_hechos(engine, CONSULTA_VENTAS, marca, trabajadores, hasta)
+    df['Fecha'] = pd.to_datetime(df['Fecha'])
+    return df
+
+
+def _carga_completa(engine, huella, extraccion, trabajadores=None, ruta_cache=None):
+    almacen, ruta_meta = rutas_almacen(ruta_cache)
+    # Hasta el MAX(ID) de la huella que se guarda: lo insertado después queda
+    # para la próxima sincronización
+    df = _extraer(engine, extraccion, trabajadores=trabajadores, hasta=huella['max_id'] or 0,
+                  ruta_cache=ruta_cache)
+    if os.path.isdir(almacen):
+        shutil.rmtree(almacen)
+    os.makedirs(almacen)
+    _escribir_parte(df, almacen, _nombre_parte(0))
+    _guardar_meta({**huella, 'partes': 1, 'extraccion': extraccion}, ruta_meta)
+    return len(df)
+
+
+def _compactar(meta, almacen):
+    # Primero se escribe la tabla compacta completa y recién después se borran
+    # las partes: un corte a mitad de camino nunca deja filas solo en memoria
+    tabla = pq.read_table(almacen)
+    temporal = os.path.join(almacen, '.compacto.tmp')
+    pq.write_table(tabla, temporal)
+    os.replace(temporal, os.path.join(almacen, _nombre_parte(0)))
+    for archivo in os.listdir(almacen):
+        if archivo != _nombre_parte(0):
+            os.remove(os.path.join(almacen, archivo))
+    meta['partes'] = 1
+
+
+def sincronizar_ventas(engine, completa=False, extraccion=None, trabajadores=None, ruta_cache=None):
+    """Pone al día el almacén local y devuelve cuántas filas se descargaron.
+
+    La marca de agua es el MAX(ID) ya almacenado: solo se piden las ventas con
+    un ID mayor. Si el conteo no cuadra (borrados o IDs reutilizados) se hace
+    una recarga completa, igual que al cambiar el modo de extracción.
+    `trabajadores` son las conexiones para leer por rangos de ID (por defecto,
+    PARALELISMO_EXTRACCION). `ruta_cache` lleva el almacén y las dimensiones
+    a otra carpeta (ver rutas_almacen).
+    """
+    extraccion = extraccion or EXTRACCION
+    almacen, ruta_meta = rutas_almacen(ruta_cache)
+    huella = huella_ventas(engine)
+    meta = _leer_meta(almacen, ruta_meta)
+    if (completa or meta is None or meta['max_id'] is None
+            or meta.get('extraccion', 'join') != extraccion):
+        return _carga_completa(engine, huella, extraccion, trabajadores, ruta_cache)
+
+    huella_guardada = {k: meta[k] for k in huella}
+    if huella_guardada == huella:
+        return 0
+    if huella['max_id'] is None or huella['max_id'] < meta['max_id']:
+        return _carga_completa(engine, huella, extraccion, trabajadores, ruta_cache)
+
+    nuevas = _extraer(engine, extraccion, marca=meta['max_id'], trabajadores=trabajadores,
+                      hasta=huella['max_id'], ruta_cache=ruta_cache)
+    if meta['filas'] + len(nuevas) != huella['filas']:
+        return _carga_completa(engine, huella, extraccion, trabajadores, ruta_cache)
+
+    esquema = pq.read_schema(os.path.join(almacen, _nombre_parte(0)))
+    _escribir_parte(nuevas, almacen, _nombre_parte(meta['max_id'] + 1), esquema)
+    meta = {**huella, 'partes': meta['partes'] + 1, 'extraccion': extraccion}
+    if meta['partes'] > MAX_PARTES:
+        _compactar(meta, almacen)
+    _guardar_meta(meta, ruta_meta)
+    return len(nuevas)
+
+
+def cargar_ventas(engine, columnas=None, usar_cache=True, tipar=True, ruta_cache=None):
+    """Devuelve la tabla de hechos desde el almacén local, sincronizado antes con `ventas`."""
+    sincronizar_ventas(engine, completa=not usar_cache, ruta_cache=ruta_cache)
+    df = _leer_almacen(rutas_almacen(ruta_cache)[0], columnas)
+    return tipar_ventas(df) if tipar else df
+
+
+# ================================
+# TIPOS COMPACTOS EN MEMORIA
+# ================================
+def memoria_mb(df):
+    return df.memory_usage(deep=True).sum() / 1024 ** 2
+
+
+def _entero(serie, tipo):
+    # Con nulos (LEFT JOIN sin pareja) se usa el entero con máscara de pandas
+    return serie.astype(tipo.capitalize() if serie.isna().any() else tipo)
+
+
+def tipar_ventas(df, centavos=False):
+    """Convierte la tabla de hechos a tipos compactos.
+
+    Dimensiones como categorías y dinero como float64, o como enteros en
+    centavos con `centavos=True` para sumas exactas.
+    """
+    for columna in COLUMNAS_DIMENSION:
+        if columna in df and df[columna].dtype != 'category':
+            df[columna] = df[columna].astype('category')
+    for columna in COLUMNAS_DINERO:
+        if columna in df:
+            valores = df[columna].astype('float64')
+            df[columna] = _entero((valores * 100).round(), 'int64') if centavos else valores
+    if 'Cantidad' in df:
+        df['Cantidad'] = _entero(df['Cantidad'], 'int32')
+    return df
+
+
+def iterar_ventas(engine, tamano_lote=50_000, consulta=CONSULTA_VENTAS):
+    """Recorre la tabla de hechos por lotes sin traer todo el resultado a memoria.
+
+    Con un engine que soporte cursores del servidor (pymysql) las filas se van
+    leyendo de MySQL a medida que se consume cada lote.
+    """
+    with engine.connect().execution_options(stream_results=True) as conexion:
+        for lote in pd.read_sql(text(consulta), conexion, chunksize=tamano_lote):
+            for columna in COLUMNAS_DINERO:
+                if columna in lote:
+                    lote[columna] = lote[columna].astype('float64')
+            yield lote
+
+
+# ================================
+# DIMENSIÓN DE FECHAS
+# ================================
+# Año, Mes y AñoMes (yyyymm) se derivan una sola vez como enteros chicos con
+# aritmética de datetime64: contar meses desde 1970 es una división entera,
+# sin pasar por el accesor .dt ni por objetos Period. Todos los GROUP BY de
+# tiempo de 02-04 agrupan por estas claves.
+def claves_fecha(fechas):
+    """{'Año', 'Mes', 'AñoMes'} enteros para una serie de fechas; NaT queda como nulo."""
+    meses = np.asarray(fechas).astype('datetime64[M]')
+    nulas = np.isnat(meses)
+    meses = meses.astype('int64')
+    año = (meses // 12 + 1970).astype('int16')
+    mes = (meses % 12 + 1).astype('int8')
+    claves = {'Año': año, 'Mes': mes, 'AñoMes': año.astype('int32') * 100 + mes}
+    if nulas.any():
+        # Igual que _entero: con nulos se usa el entero con máscara de pandas
+        claves = {nombre: pd.arrays.IntegerArray(valores, nulas) for nombre, valores in claves.items()}
+    return claves
+
+
+def etiqueta_mes(claves):
+    """'YYYY-MM' para una serie de claves AñoMes, solo al rotular el resultado."""
+    claves = pd.Series(claves).astype('int64')
+    return (claves // 100).astype(str) + '-' + (claves % 100).astype(str).str.zfill(2)
+
+
+def enriquecer_fechas(df):
+    """Agrega Año, Mes y AñoMes a partir de Fecha."""
+    if not pd.api.types.is_datetime64_any_dtype(df['Fecha']):
+        df['Fecha'] = pd.to_datetime(df['Fecha'])
+    for nombre, valores in claves_fecha(df['Fecha']).items():
+        df[nombre] = valores
+    return df
+
+
+if __name__ == '__main__':
+    # Sincronización nocturna: python scripts/datos.py [--completa]
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description='Sincroniza el almacén local de ventas')
+    parser.add_argument('--completa', action='store_true', help='Ignora la marca de agua y recarga todo')
+    parser.add_argument('--extraccion', choices=['join', 'estrella'], default=EXTRACCION,
+                        help='JOIN en MySQL o claves enteras + JOIN local con dimensiones en caché')
+    parser.add_argument('--trabajadores', type=int, default=PARALELISMO,
+                        help='Conexiones simultáneas para leer la tabla de hechos por rangos de ID')
+    args = parser.parse_args()
+
+    engine = crear_engine(pool_size=max(5, args.trabajadores))
+    inicio = time.perf_counter()
+    filas = sincronizar_ventas(engine, completa=args.completa, extraccion=args.extraccion,
+                               trabajadores=args.trabajadores)
+    print(f"✅ {filas} filas descargadas en {time.perf_counter() - inicio:.2f} s")
+    engine.dispose()
@@ -0,0 +1,152 @@
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+import json
+import os
+
+from datos import RUTA_CACHE, leer_hechos
+
+# ================================
+# TABLAS DE DIMENSIÓN
+# ================================
+# Son tablas chicas (decenas o cientos de filas): se descargan una vez y se
+# guardan en cache/dimensiones/ mientras su conteo y MAX(ID) no cambien
+RUTA_DIMENSIONES = os.path.join(RUTA_CACHE, 'dimensiones')
+
+CONSULTAS_DIMENSIONES = {
+    'vendedores': "SELECT ID, Nombre, Apellido, Region FROM vendedores",
+    'clientes': "SELECT ID, Nombre, Apellido FROM clientes",
+    'productos': "SELECT ID, Nombre, Categoria, Costo FROM productos",
+    'categorias': "SELECT ID, Nombre FROM categorias",
+    'regiones': "SELECT ID, Nombre FROM regiones",
+}
+
+# Tabla de hechos solo con claves enteras: ningún VARCHAR viaja por la red
+CONSULTA_HECHOS_CLAVES = """
+    SELECT
+        v.ID,
+        v.Fecha,
+        v.Cliente,
+        v.Producto,
+        v.Vendedor,
+        v.Cantidad,
+        v.PrecioVenta,
+        v.Descuento
+    FROM ventas v
+"""
+
+
+def huellas_dimensiones(engine):
+    consulta = ' UNION ALL '.join(
+        f"SELECT '{tabla}', COUNT(*), MAX(ID) FROM {tabla}" for tabla in CONSULTAS_DIMENSIONES
+    )
+    with engine.connect() as conexion:
+        return {
+            tabla: [int(filas), None if max_id is None else int(max_id)]
+            for tabla, filas, max_id in conexion.execute(text(consulta))
+        }
+
+
+def cargar_dimensiones(engine, ruta_cache=None):
+    """Devuelve {tabla: DataFrame} usando la copia local de cada dimensión vigente.
+
+    Con `ruta_cache` la copia va en <ruta_cache>/dimensiones en lugar de RUTA_DIMENSIONES.
+    """
+    carpeta = RUTA_DIMENSIONES if ruta_cache is None else os.path.join(ruta_cache, 'dimensiones')
+    os.makedirs(carpeta, exist_ok=True)
+    ruta_meta = os.path.join(carpeta, 'huellas.json')
+    guardadas = {}
+    if os.path.exists(ruta_meta):
+        with open(ruta_meta, encoding='utf-8') as f:
+            guardadas = json.load(f)
+
+    huellas = huellas_dimensiones(engine)
+    dimensiones = {}
+    for tabla, consulta in CONSULTAS_DIMENSIONES.items():
+        ruta = os.path.join(carpeta, f'{tabla}.parquet')
+        if guardadas.get(tabla) == huellas[tabla] and os.path.exists(ruta):
+            dimensiones[tabla] = pd.read_parquet(ruta)
+        else:
+            df = pd.read_sql(consulta, engine)
+            if 'Costo' in df:
+                df['Costo'] = df['Costo'].astype('float64')
+            df.to_parquet(ruta, index=False)
+            dimensiones[tabla] = df
+
+    with open(ruta_meta, 'w', encoding='utf-8') as f:
+        json.dump(huellas, f, indent=2)
+    return dimensiones
+
+
+# ================================
+# JOIN LOCAL POR POSICIÓN
+# ================================
+def _posiciones(ids, claves):
+    """Posición de cada clave dentro de `ids`, o -1 si no existe (como un LEFT JOIN)."""
+    ids = np.asarray(ids, dtype=np.int64)
+    claves = np.asarray(pd.array(claves, dtype='Int64').fillna(-1), dtype=np.int64)
+    if len(ids) == 0:
+        return np.full(len(claves), -1, dtype=np.int64)
+    # Los IDs son enteros chicos: un arreglo directo ID -> posición es más
+    # rápido que un hash y se consulta con un solo `take`
+    tabla = np.full(int(ids.max()) + 2, -1, dtype=np.int64)
+    tabla[ids] = np.arange(len(ids))
+    fuera = (claves < 0) | (claves > ids.max())
+    return np.where(fuera, -1, tabla.take(np.clip(claves, 0, len(tabla) - 1)))
+
+
+def _texto(valores, posiciones):
+    codigos, categorias = pd.factorize(pd.Series(valores), use_na_sentinel=True)
+    codigos = np.append(codigos, -1).take(posiciones)
+    return pd.Categorical.from_codes(codigos, categories=categorias)
+
+
+def _numero(valores, posiciones):
+    return np.append(np.asarray(valores, dtype='float64'), np.nan).take(posiciones)
+
+
+def unir_dimensiones(hechos, dimensiones):
+    """Arma las mismas columnas que CONSULTA_VENTAS a partir de claves enteras."""
+    vendedores = dimensiones['vendedores']
+    clientes = dimensiones['clientes']
+    productos = dimensiones['productos']
+    categorias = dimensiones['categorias']
+    regiones = dimensiones['regiones']
+
+    pos_vendedor = _posiciones(vendedores['ID'], hechos['Vendedor'])
+    pos_cliente = _posiciones(clientes['ID'], hechos['Cliente'])
+    pos_producto = _posiciones(productos['ID'], hechos['Producto'])
+    # Las dimensiones de segundo nivel se resuelven encadenando posiciones
+    region_vendedor = np.append(vendedores['Region'].to_numpy(dtype='float64'), np.nan).take(pos_vendedor)
+    pos_region = _posiciones(regiones['ID'], pd.array(region_vendedor, dtype='Int64'))
+    categoria_producto = np.append(productos['Categoria'].to_numpy(dtype='float64'), np.nan).take(pos_producto)
+    pos_categoria = _posiciones(categorias['ID'], pd.array(categoria_producto, dtype='Int64'))
+
+    cantidad = hechos['Cantidad'].to_numpy(dtype='float64')
+    total_venta = cantidad * hechos['PrecioVenta'].to_numpy(dtype='float64')
+    total_costo = cantidad * _numero(productos['Costo'], pos_producto)
+
+    return pd.DataFrame({
+        'ID': hechos['ID'].to_numpy(),
+        'Fecha': pd.to_datetime(hechos['Fecha']),
+        'Cantidad': hechos['Cantidad'].to_numpy(),
+        'PrecioVenta': hechos['PrecioVenta'].astype('float64').to_numpy(),
+        'Descuento': hechos['Descuento'].astype('float64').to_numpy(),
+        'TotalVenta': total_venta,
+        'TotalCosto': total_costo,
+        'Ganancia': total_venta - total_costo,
+        'Vendedor': _texto(vendedores['Nombre'], pos_vendedor),
+        'ApellidoVendedor': _texto(vendedores['Apellido'], pos_vendedor),
+        'Cliente': _texto(clientes['Nombre'], pos_cliente),
+        'ApellidoCliente': _texto(clientes['Apellido'], pos_cliente),
+        'Region': _texto(regiones['Nombre'], pos_region),
+        'Producto': _texto(productos['Nombre'], pos_producto),
+        'Categoria': _texto(categorias['Nombre'], pos_categoria),
+    })
+
+
+def extraer_estrella(engine, marca=None, trabajadores=None, hasta=None, ruta_cache=None):
+    """Equivalente a leer CONSULTA_VENTAS, pero con el JOIN hecho en el cliente."""
+    dimensiones = cargar_dimensiones(engine, ruta_cache)
+    hechos = leer_hechos(engine, CONSULTA_HECHOS_CLAVES, marca, trabajadores, hasta)
+    return unir_dimensiones(hechos, dimensiones)
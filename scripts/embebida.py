@@ -0,0 +1,165 @@
+import pandas as pd
+from decimal import Decimal
+from sqlalchemy import create_engine, event, text
+import json
+import os
+import sqlite3
+import time
+
+from datos import RUTA_CACHE, huella_ventas
+
+# ================================
+# BASE EMBEBIDA PARA ANÁLISIS
+# ================================
+# Copia local de las tablas de MySQL para correr los scripts sin servidor y
+# sin competir con la carga transaccional. Se elige con BACKEND_ANALISIS:
+#   mysql   el servidor de .env (por defecto)
+#   duckdb  motor columnar; requiere `pip install duckdb duckdb-engine`
+#   sqlite  incluido en Python; respaldo si DuckDB no está instalado
+# Las consultas son las mismas: solo YEAR() y MONTH() se registran en SQLite.
+TABLAS = ['regiones', 'categorias', 'productos', 'vendedores', 'clientes', 'ventas']
+RUTAS_EMBEBIDAS = {
+    'duckdb': os.path.join(RUTA_CACHE, 'ventas.duckdb'),
+    'sqlite': os.path.join(RUTA_CACHE, 'ventas.sqlite'),
+}
+RUTA_META_EMBEBIDA = os.path.join(RUTA_CACHE, 'embebida.json')
+
+LOTE_SNAPSHOT = 500_000
+
+
+def duckdb_disponible():
+    try:
+        import duckdb  # noqa: F401
+        import duckdb_engine  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def resolver_backend(backend):
+    if backend == 'duckdb' and not duckdb_disponible():
+        print("⚠️ DuckDB no está instalado, se usa SQLite como base embebida")
+        return 'sqlite'
+    if backend not in RUTAS_EMBEBIDAS:
+        raise ValueError(f"Backend embebido desconocido: {backend!r}")
+    return backend
+
+
+def engine_sqlite(ruta):
+    engine = create_engine(f'sqlite:///{ruta}')
+
+    # YEAR y MONTH de MySQL, que usan las consultas de agregaciones.py
+    @event.listens_for(engine, 'connect')
+    def _funciones(conexion, _):
+        conexion.create_function('YEAR', 1, lambda fecha: None if fecha is None else int(fecha[:4]), deterministic=True)
+        conexion.create_function('MONTH', 1, lambda fecha: None if fecha is None else int(fecha[5:7]), deterministic=True)
+
+    return engine
+
+
+def engine_embebido(backend, ruta=None):
+    backend = resolver_backend(backend)
+    ruta = ruta or RUTAS_EMBEBIDAS[backend]
+    if not os.path.exists(ruta):
+        raise FileNotFoundError(
+            f"No existe la base embebida {ruta}; créala con: python scripts/embebida.py --backend {backend}"
+        )
+    if backend == 'duckdb':
+        # DuckDB ya trae year() y month()
+        return create_engine(f'duckdb:///{ruta}')
+    return engine_sqlite(ruta)
+
+
+# ================================
+# SNAPSHOT DESDE MYSQL
+# ================================
+def _normalizar(lote, backend):
+    # DECIMAL llega como objetos Decimal y DATE como datetime.date
+    for columna in lote.columns:
+        muestra = lote[columna].dropna()
+        if lote[columna].dtype != object or muestra.empty:
+            continue
+        if isinstance(muestra.iloc[0], Decimal):
+            lote[columna] = lote[columna].astype('float64')
+        elif hasattr(muestra.iloc[0], 'isoformat') and columna.startswith('Fecha'):
+            fechas = pd.to_datetime(lote[columna])
+            # En SQLite las fechas quedan como texto ISO, igual que las devuelve MySQL
+            lote[columna] = fechas.dt.strftime('%Y-%m-%d') if backend == 'sqlite' else fechas.dt.date
+    return lote
+
+
+def _copiar_duckdb(origen, ruta):
+    import duckdb
+    conexion = duckdb.connect(ruta)
+    try:
+        for tabla in TABLAS:
+            conexion.execute(f"DROP TABLE IF EXISTS {tabla}")
+            for i, lote in enumerate(pd.read_sql(text(f"SELECT * FROM {tabla} ORDER BY ID"), origen,
+                                                 chunksize=LOTE_SNAPSHOT)):
+                conexion.register('lote', _normalizar(lote, 'duckdb'))
+                conexion.execute(f"CREATE TABLE {tabla} AS SELECT * FROM lote" if i == 0
+                                 else f"INSERT INTO {tabla} SELECT * FROM lote")
+                conexion.unregister('lote')
+    finally:
+        conexion.close()
+
+
+def _copiar_sqlite(origen, ruta):
+    conexion = sqlite3.connect(ruta)
+    try:
+        for tabla in TABLAS:
+            conexion.execute(f"DROP TABLE IF EXISTS {tabla}")
+            for lote in pd.read_sql(text(f"SELECT * FROM {tabla} ORDER BY ID"), origen, chunksize=LOTE_SNAPSHOT):
+                _normalizar(lote, 'sqlite').to_sql(tabla, conexion, if_exists='append', index=False)
+            # Sin índice por ID cada LEFT JOIN recorrería la dimensión completa
+            conexion.execute(f"CREATE UNIQUE INDEX idx_{tabla}_id ON {tabla} (ID)")
+        conexion.commit()
+    finally:
+        conexion.close()
+
+
+def crear_snapshot(origen, backend='duckdb'):
+    """Copia las tablas de `origen` (MySQL) a la base embebida, por lotes.
+
+    Se escribe en un archivo temporal y se reemplaza al final, así una copia
+    a medias nunca queda como la base vigente.
+    """
+    backend = resolver_backend(backend)
+    ruta = RUTAS_EMBEBIDAS[backend]
+    temporal = ruta + '.tmp'
+    if os.path.exists(temporal):
+        os.remove(temporal)
+    os.makedirs(RUTA_CACHE, exist_ok=True)
+
+    huella = huella_ventas(origen)
+    if backend == 'duckdb':
+        _copiar_duckdb(origen, temporal)
+    else:
+        _copiar_sqlite(origen, temporal)
+    os.replace(temporal, ruta)
+
+    meta = {}
+    if os.path.exists(RUTA_META_EMBEBIDA):
+        with open(RUTA_META_EMBEBIDA, encoding='utf-8') as f:
+            meta = json.load(f)
+    meta[backend] = {'origen': huella, 'creada': time.strftime('%Y-%m-%d %H:%M:%S')}
+    with open(RUTA_META_EMBEBIDA, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+    return ruta
+
+
+if __name__ == '__main__':
+    # Snapshot nocturno: python scripts/embebida.py --backend duckdb
+    # y luego: BACKEND_ANALISIS=duckdb python scripts/02_analisis_ventas.py
+    import argparse
+    from datos import crear_engine
+
+    parser = argparse.ArgumentParser(description='Copia las tablas de MySQL a una base embebida')
+    parser.add_argument('--backend', choices=list(RUTAS_EMBEBIDAS), default='duckdb')
+    args = parser.parse_args()
+
+    origen = crear_engine(backend='mysql')
+    inicio = time.perf_counter()
+    ruta = crear_snapshot(origen, args.backend)
+    print(f"✅ Snapshot en {ruta} creado en {time.perf_counter() - inicio:.2f} s")
+    origen.dispose()
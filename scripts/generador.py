@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+
+# ================================
+# CATÁLOGOS FIJOS
+# ================================
+REGIONES = ['Norte', 'Sur', 'Este', 'Oeste', 'Centro']
+CATEGORIAS = ['Electrónica', 'Ropa', 'Hogar', 'Deportes', 'Alimentos']
+
+# PRODUCTOS con costos y precios coherentes por categoría
+PRODUCTOS = [
+    ('Laptop', 1, 800, 1200),
+    ('Smartphone', 1, 400, 650),
+    ('Tablet', 1, 300, 480),
+    ('Audífonos', 1, 50, 90),
+    ('Smart TV', 1, 500, 800),
+    ('Camisa', 2, 15, 35),
+    ('Pantalón', 2, 20, 50),
+    ('Zapatos', 2, 30, 80),
+    ('Vestido', 2, 25, 65),
+    ('Chaqueta', 2, 40, 100),
+    ('Sofá', 3, 300, 600),
+    ('Mesa', 3, 150, 300),
+    ('Lámpara', 3, 30, 70),
+    ('Silla', 3, 80, 160),
+    ('Estante', 3, 60, 120),
+    ('Bicicleta', 4, 200, 380),
+    ('Pesas', 4, 40, 80),
+    ('Tenis', 4, 45, 90),
+    ('Mochila', 4, 25, 55),
+    ('Tienda Camping', 4, 100, 200),
+    ('Arroz 5kg', 5, 5, 10),
+    ('Aceite 1L', 5, 3, 6),
+    ('Café 500g', 5, 8, 15),
+    ('Azúcar 2kg', 5, 4, 8),
+    ('Pasta 500g', 5, 2, 5),
+]
+
+# Mayoría sin descuento, igual que el generador original
+DESCUENTOS = np.array([0, 0, 0, 5, 10, 15, 20])
+
+# Tamaños con escala 1: el volumen original del proyecto
+BASE_CLIENTES = 200
+BASE_VENDEDORES = 20
+BASE_VENTAS = 2000
+
+# Nombres de respaldo si Faker no está instalado: 64 combinaciones, solo
+# sirven para pruebas chicas (crear_datos.py se niega a pasar de ahí)
+NOMBRES_RESPALDO = ['Ana', 'Luis', 'María', 'José', 'Carmen', 'Jorge', 'Lucía', 'Pedro']
+APELLIDOS_RESPALDO = ['García', 'López', 'Martínez', 'Pérez', 'Gómez', 'Díaz', 'Torres', 'Ruiz']
+
+# Rango de fechas de cada tabla
+FECHAS_VENTAS = ('2022-01-01', '2024-12-31')
+FECHAS_CLIENTES = ('2020-01-01', '2021-12-31')
+FECHAS_VENDEDORES = ('2019-01-01', '2022-12-31')
+
+
+# ================================
+# GENERACIÓN VECTORIZADA
+# ================================
+def generador(semilla, parte=0):
+    # Una semilla por partición: el resultado no depende de cuántos procesos se usen
+    return np.random.default_rng([semilla, parte])
+
+
+def tamanos(escala):
+    return {
+        'clientes': max(1, round(BASE_CLIENTES * escala)),
+        'vendedores': max(1, round(BASE_VENDEDORES * escala)),
+        'ventas': max(1, round(BASE_VENTAS * escala)),
+    }
+
+
+def _fechas(rng, n, rango):
+    inicio, fin = (np.datetime64(f, 'D') for f in rango)
+    dias = (fin - inicio).astype(int) + 1
+    return inicio + rng.integers(0, dias, size=n)
+
+
+def _nombres(semilla, cantidad=500):
+    """Listas de nombres y apellidos realistas; Faker se llama solo para armar la lista."""
+    try:
+        from faker import Faker
+    except ImportError:
+        print(f"⚠️ Faker no está instalado, los nombres salen de "
+              f"{len(NOMBRES_RESPALDO) * len(APELLIDOS_RESPALDO)} combinaciones fijas")
+        return np.array(NOMBRES_RESPALDO), np.array(APELLIDOS_RESPALDO)
+    fake = Faker('es_MX')  # Datos en español
+    fake.seed_instance(semilla)
+    nombres = np.array([fake.first_name() for _ in range(cantidad)])
+    apellidos = np.array([fake.last_name() for _ in range(cantidad)])
+    return nombres, apellidos
+
+
+def generar_personas(n, semilla, rango_fechas, id_inicial=1, con_email=False):
+    """Clientes o vendedores: ID, Nombre, Apellido, [Email], Region, Fecha."""
+    rng = generador(semilla, 0)
+    nombres, apellidos = _nombres(semilla)
+    ids = np.arange(id_inicial, id_inicial + n)
+    df = pd.DataFrame({
+        'ID': ids,
+        'Nombre': nombres[rng.integers(0, len(nombres), n)],
+        'Apellido': apellidos[rng.integers(0, len(apellidos), n)],
+    })
+    if con_email:
+        # El ID en el correo evita duplicados sin consultar a Faker por fila
+        df['Email'] = (df['Nombre'].str.lower() + '.' + df['Apellido'].str.lower()
+                       + ids.astype(str) + '@example.com')
+    df['Region'] = rng.integers(1, len(REGIONES) + 1, n)
+    df['Fecha'] = _fechas(rng, n, rango_fechas)
+    return df
+
+
+def generar_ventas(n, semilla, parte, id_inicial, n_clientes, n_vendedores):
+    """Un bloque de ventas con IDs [id_inicial, id_inicial + n)."""
+    rng = generador(semilla, parte + 1)
+    precios = np.array([p[3] for p in PRODUCTOS], dtype='float64')
+    producto = rng.integers(0, len(PRODUCTOS), n)
+    descuento = DESCUENTOS[rng.integers(0, len(DESCUENTOS), n)]
+    return pd.DataFrame({
+        'ID': np.arange(id_inicial, id_inicial + n),
+        'Fecha': _fechas(rng, n, FECHAS_VENTAS),
+        'Cliente': rng.integers(1, n_clientes + 1, n),
+        'Producto': producto + 1,
+        'Vendedor': rng.integers(1, n_vendedores + 1, n),
+        'Cantidad': rng.integers(1, 6, n),
+        'PrecioVenta': np.round(precios[producto] * (1 - descuento / 100), 2),
+        'Descuento': descuento,
+    })
+
+
+def bloques_ventas(total, tamano_bloque):
+    """Particiones (parte, id_inicial, filas) de la tabla de ventas."""
+    return [
+        (parte, inicio + 1, min(tamano_bloque, total - inicio))
+        for parte, inicio in enumerate(range(0, total, tamano_bloque))
+    ]
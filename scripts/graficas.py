@@ -0,0 +1,269 @@
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import inspect
+import json
+import os
+
+import matplotlib
+import matplotlib.pyplot as plt
+import seaborn as sns
+import numpy as np
+import pandas as pd
+
+from datos import RUTA_BASE, RUTA_CACHE
+
+# ================================
+# RENDER A ARCHIVOS (SIN PANTALLA)
+# ================================
+RUTA_GRAFICAS = os.path.join(RUTA_BASE, 'salida', 'graficas')
+RUTA_HUELLAS = os.path.join(RUTA_CACHE, 'graficas.json')
+FORMATOS = ('png', 'svg', 'pdf')
+
+meses_nombres = ['Ene','Feb','Mar','Abr','May','Jun',
+                 'Jul','Ago','Sep','Oct','Nov','Dic']
+
+
+# ================================
+# FIGURAS DE 03_analisis_profundo.py
+# ================================
+def figura_analisis_profundo(cat_region, df_2024, ventas_mes, margen_cat):
+    fig, axes = plt.subplots(2, 2, figsize=(18, 12))
+    fig.suptitle('Análisis Profundo de Ventas', fontsize=16, fontweight='bold')
+
+    # GRÁFICA 1 - Categorías por región
+    cat_region.plot(kind='bar', ax=axes[0,0], colormap='Set2')
+    axes[0,0].set_title('Ventas por Categoría y Región')
+    axes[0,0].set_xlabel('Región')
+    axes[0,0].set_ylabel('Ventas ($)')
+    axes[0,0].tick_params(axis='x', rotation=45)
+    axes[0,0].legend(title='Categoría', bbox_to_anchor=(1, 1))
+
+    # GRÁFICA 2 - Comportamiento mensual 2024
+    sns.barplot(ax=axes[0,1], x=df_2024.index, y=df_2024.values,
+                hue=df_2024.index.astype(str), palette='Blues_r', legend=False)
+    axes[0,1].set_title('Comportamiento Mensual 2024')
+    axes[0,1].set_xlabel('Mes')
+    axes[0,1].set_ylabel('Ventas ($)')
+    axes[0,1].set_xticks(range(len(df_2024)))
+    axes[0,1].set_xticklabels(meses_nombres[:len(df_2024)], rotation=45)
+
+    # GRÁFICA 3 - Tendencia 3 años con línea
+    axes[1,0].plot(ventas_mes['AñoMes'], ventas_mes['TotalVenta'],
+                   marker='o', linewidth=2, color='steelblue', label='Ventas')
+    z = np.polyfit(range(len(ventas_mes)), ventas_mes['TotalVenta'], 1)
+    p = np.poly1d(z)
+    axes[1,0].plot(ventas_mes['AñoMes'], p(range(len(ventas_mes))),
+                   linestyle='--', color='red', linewidth=1.5, label='Tendencia')
+    axes[1,0].set_title('Tendencia de Ventas 2022-2024')
+    axes[1,0].tick_params(axis='x', rotation=90)
+    axes[1,0].legend()
+    axes[1,0].grid(True, alpha=0.3)
+
+    # GRÁFICA 4 - Margen por categoría
+    sns.barplot(ax=axes[1,1], x=margen_cat.index, y=margen_cat['Margen_%'],
+                hue=margen_cat.index, palette='Greens_r', legend=False)
+    axes[1,1].set_title('Margen de Ganancia por Categoría (%)')
+    axes[1,1].set_xlabel('Categoría')
+    axes[1,1].set_ylabel('Margen (%)')
+    axes[1,1].tick_params(axis='x', rotation=45)
+
+    plt.tight_layout()
+    return fig
+
+
+def figura_comparativo(df_comparativo, clientes_region):
+    fig, axes = plt.subplots(2, 1, figsize=(14, 12))
+
+    # GRÁFICA 1 - Comparativo promedio vs 2024
+    x = range(1, 13)
+    axes[0].plot(x, df_comparativo['Promedio_3años'],
+                 marker='o', linewidth=2, color='steelblue',
+                 label='Promedio 2022-2024')
+    axes[0].plot(x, df_comparativo['Ventas_2024'],
+                 marker='s', linewidth=2, color='orange',
+                 label='2024')
+    axes[0].fill_between(x, df_comparativo['Promedio_3años'],
+                         df_comparativo['Ventas_2024'],
+                         alpha=0.2, color='green',
+                         label='Diferencia')
+    axes[0].set_title('Comparativo Ventas 2024 vs Promedio 3 Años',
+                      fontsize=14, fontweight='bold')
+    axes[0].set_xlabel('Mes')
+    axes[0].set_ylabel('Ventas ($)')
+    axes[0].set_xticks(list(x))
+    axes[0].set_xticklabels(meses_nombres)
+    axes[0].legend()
+    axes[0].grid(True, alpha=0.3)
+
+    # Línea de referencia del promedio general
+    promedio_general = df_comparativo['Promedio_3años'].mean()
+    axes[0].axhline(y=promedio_general, color='red',
+                    linestyle='--', alpha=0.5,
+                    label=f'Promedio general: ${promedio_general:,.0f}')
+    axes[0].legend()
+
+    # GRÁFICA 2 - Clientes por región
+    sns.barplot(ax=axes[1], data=clientes_region,
+                x='Region', y='Total_Clientes',
+                hue='Region', palette='Blues_r', legend=False)
+    axes[1].set_title('Cantidad de Clientes por Región',
+                      fontsize=14, fontweight='bold')
+    axes[1].set_xlabel('Región')
+    axes[1].set_ylabel('Clientes')
+    for i, row in clientes_region.iterrows():
+        axes[1].text(i, row['Total_Clientes'] + 0.5,
+                    str(int(row['Total_Clientes'])),
+                    ha='center', fontweight='bold')
+
+    plt.tight_layout()
+    return fig
+
+
+# ================================
+# FIGURA DE 04_proyeccion_2025.py
+# ================================
+def figura_proyeccion(df_proyeccion, ventas_2024):
+    fig, axes = plt.subplots(2, 1, figsize=(14, 12))
+    fig.suptitle('Proyección de Ventas 2025', fontsize=16, fontweight='bold')
+
+    # GRÁFICA 1 - Barras proyección + línea 2024
+    x = list(range(1, 13))
+    ax1 = axes[0]
+    ax2 = ax1.twinx()
+
+    # Barras
+    ax1.bar([i - 0.2 for i in x], df_proyeccion['Promedio_Historico'],
+            width=0.4, label='Promedio Histórico', color='steelblue', alpha=0.7)
+    ax1.bar([i + 0.2 for i in x], df_proyeccion['Proyeccion_2025'],
+            width=0.4, label='Proyección 2025', color='orange', alpha=0.7)
+
+    # Línea 2024
+    ax2.plot(x, ventas_2024.values,
+             marker='D', linewidth=2.5, color='red',
+             label='Real 2024', zorder=5)
+    ax2.set_ylabel('Ventas 2024 ($)', color='red')
+    ax2.tick_params(axis='y', labelcolor='red')
+
+    ax1.set_title('Histórico vs Proyección 2025 vs Real 2024')
+    ax1.set_xlabel('Mes')
+    ax1.set_ylabel('Ventas ($)')
+    ax1.set_xticks(x)
+    ax1.set_xticklabels(meses_nombres)
+    ax1.grid(True, alpha=0.3)
+
+    lines1, labels1 = ax1.get_legend_handles_labels()
+    lines2, labels2 = ax2.get_legend_handles_labels()
+    ax1.legend(lines1 + lines2, labels1 + labels2, loc='upper left')
+
+    # GRÁFICA 2 - Línea de proyección con tendencia
+    axes[1].plot(meses_nombres, df_proyeccion['Promedio_Historico'],
+                 marker='o', linewidth=2, color='steelblue', label='Promedio Histórico')
+    axes[1].plot(meses_nombres, df_proyeccion['Proyeccion_2025'],
+                 marker='s', linewidth=2, color='orange', label='Proyección 2025')
+    axes[1].fill_between(meses_nombres, df_proyeccion['Promedio_Historico'],
+                         df_proyeccion['Proyeccion_2025'],
+                         alpha=0.2, color='green')
+    axes[1].set_title('Tendencia Proyectada 2025')
+    axes[1].set_xlabel('Mes')
+    axes[1].set_ylabel('Ventas ($)')
+    axes[1].legend()
+    axes[1].grid(True, alpha=0.3)
+
+    plt.tight_layout()
+    return fig
+
+
+# ================================
+# PUBLICACIÓN: PANTALLA O ARCHIVOS
+# ================================
+def huella_figura(funcion, argumentos, formato):
+    """Hash de los agregados de entrada y del código que dibuja la figura."""
+    h = hashlib.sha256()
+    h.update(inspect.getsource(funcion).encode('utf-8'))
+    h.update(formato.encode('utf-8'))
+    for argumento in argumentos:
+        if isinstance(argumento, (pd.DataFrame, pd.Series)):
+            # hash_pandas_object no incluye los nombres de las columnas
+            nombres = list(argumento.columns) if isinstance(argumento, pd.DataFrame) else argumento.name
+            h.update(repr(nombres).encode('utf-8'))
+            h.update(pd.util.hash_pandas_object(argumento, index=True).to_numpy().tobytes())
+        else:
+            h.update(repr(argumento).encode('utf-8'))
+    return h.hexdigest()
+
+
+def _renderizar(funcion, argumentos, rutas):
+    # Cada proceso dibuja con Agg: no necesita pantalla y no bloquea
+    matplotlib.use('Agg', force=True)
+    fig = funcion(*argumentos)
+    for ruta in rutas:
+        fig.savefig(ruta, bbox_inches='tight')
+    plt.close(fig)
+    return rutas
+
+
+def renderizar(figuras, formatos=('png',), trabajadores=None):
+    """Guarda cada figura en salida/graficas/ y omite las que no cambiaron.
+
+    figuras: {nombre: (funcion, argumentos)}. Las figuras son independientes,
+    así que se dibujan en paralelo en un pool de procesos.
+    Devuelve (dibujadas, omitidas).
+    """
+    for formato in formatos:
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato no soportado: {formato!r}")
+    os.makedirs(RUTA_GRAFICAS, exist_ok=True)
+    huellas = {}
+    if os.path.exists(RUTA_HUELLAS):
+        with open(RUTA_HUELLAS, encoding='utf-8') as f:
+            huellas = json.load(f)
+
+    pendientes = {}
+    omitidas = []
+    for nombre, (funcion, argumentos) in figuras.items():
+        rutas = []
+        for formato in formatos:
+            archivo = f'{nombre}.{formato}'
+            ruta = os.path.join(RUTA_GRAFICAS, archivo)
+            huella = huella_figura(funcion, argumentos, formato)
+            if huellas.get(archivo) == huella and os.path.exists(ruta):
+                continue
+            huellas[archivo] = huella
+            rutas.append(ruta)
+        if rutas:
+            pendientes[nombre] = (funcion, argumentos, rutas)
+        else:
+            omitidas.append(nombre)
+
+    if len(pendientes) > 1 and trabajadores != 1:
+        with ProcessPoolExecutor(max_workers=trabajadores or min(len(pendientes), os.cpu_count())) as ejecutor:
+            list(ejecutor.map(_renderizar, *zip(*pendientes.values())))
+    else:
+        for funcion, argumentos, rutas in pendientes.values():
+            _renderizar(funcion, argumentos, rutas)
+
+    os.makedirs(RUTA_CACHE, exist_ok=True)
+    with open(RUTA_HUELLAS, 'w', encoding='utf-8') as f:
+        json.dump(huellas, f, indent=2)
+    return list(pendientes), omitidas
+
+
+def publicar(figuras, formatos=None, trabajadores=None):
+    """Sin formatos muestra las figuras en pantalla; con formatos las guarda en archivos."""
+    if not formatos:
+        for funcion, argumentos in figuras.values():
+            funcion(*argumentos)
+        plt.show()
+        return
+    dibujadas, omitidas = renderizar(figuras, formatos, trabajadores)
+    for nombre in dibujadas:
+        print(f"✅ Gráfica guardada: {os.path.join(RUTA_GRAFICAS, nombre)}.{{{','.join(formatos)}}}")
+    for nombre in omitidas:
+        print(f"⏭️  Gráfica sin cambios: {nombre}")
+
+
+def agregar_argumentos(parser):
+    parser.add_argument('--salida', nargs='+', choices=FORMATOS, default=None,
+                        help='Guarda las gráficas en salida/graficas/ en vez de mostrarlas (png, svg, pdf)')
+    parser.add_argument('--trabajadores-graficas', type=int, default=None,
+                        help='Procesos para dibujar las gráficas en modo --salida')
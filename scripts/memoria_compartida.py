@@ -0,0 +1,254 @@
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+from datos import RUTA_CACHE, COLUMNAS_DINERO, COLUMNAS_DIMENSION, cargar_ventas, huella_ventas, claves_fecha
+from agregaciones import agregar_pandas
+
+# ================================
+# TABLA DE HECHOS EN MEMORIA COMPARTIDA
+# ================================
+# La tabla de hechos se escribe una sola vez como un archivo .npy por columna:
+# números con su tipo, fechas como datetime64 y dimensiones de texto como
+# códigos enteros con sus categorías en esquema.json. Cada proceso abre las
+# columnas con np.load(mmap_mode='r'): las páginas salen del page cache del
+# sistema y se comparten entre todos, sin consultar la base ni deserializar
+# un DataFrame por trabajador.
+# Cada publicación va a un directorio de versión nuevo y después se cambia el
+# puntero actual.json: la versión que un proceso ya abrió nunca se modifica.
+# Las viejas se borran apenas se publica la nueva; en Linux los procesos que
+# ya las tenían mapeadas siguen leyendo las mismas páginas hasta cerrarlas,
+# y en Windows el borrado falla y el directorio queda hasta la próxima
+# publicación. Solo se publica de nuevo si cambia la huella de `ventas`.
+RUTA_COMPARTIDA = os.path.join(RUTA_CACHE, 'hechos_compartidos')
+ARCHIVO_ACTUAL = 'actual.json'
+ARCHIVO_ESQUEMA = 'esquema.json'
+COLUMNAS_COMPARTIDAS = ['ID', 'Fecha', 'Cantidad', *COLUMNAS_DINERO, *COLUMNAS_DIMENSION]
+
+# Cómo se combinan los parciales de cada rango de filas
+COMBINAR = {'sum': 'sum', 'count': 'sum', 'min': 'min', 'max': 'max'}
+
+
+def _leer_json(archivo):
+    if not os.path.exists(archivo):
+        return None
+    with open(archivo, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def version_actual(ruta=None):
+    """Directorio de la versión publicada en `ruta`, o None si no hay ninguna."""
+    ruta = ruta or RUTA_COMPARTIDA
+    actual = _leer_json(os.path.join(ruta, ARCHIVO_ACTUAL))
+    return None if actual is None else os.path.join(ruta, actual['version'])
+
+
+def _codificar(valores):
+    """({sufijo: arreglo NumPy}, esquema) de una columna de la tabla de hechos."""
+    valores = pd.Series(valores)
+    if isinstance(valores.dtype, pd.CategoricalDtype) or not (
+            pd.api.types.is_numeric_dtype(valores) or pd.api.types.is_datetime64_any_dtype(valores)):
+        # Diccionario: un código entero por fila (-1 = nulo) y la lista de nombres
+        categorias = valores.astype('category').array
+        return {'': categorias.codes}, {'tipo': 'codigos', 'categorias': categorias.categories.tolist()}
+    if pd.api.types.is_datetime64_any_dtype(valores):
+        return {'': valores.to_numpy(dtype='datetime64[us]')}, {'tipo': 'fecha'}
+    if isinstance(valores.array, pd.arrays.IntegerArray):
+        # Enteros con máscara de pandas: los valores y la máscara van en archivos aparte
+        arreglo = valores.array
+        return {'': arreglo._data, 'nulos': arreglo._mask}, {'tipo': 'entero_nulo'}
+    return {'': valores.to_numpy()}, {'tipo': 'numero'}
+
+
+def _archivo(ruta, nombre, sufijo=''):
+    return os.path.join(ruta, f"{nombre}{'.' + sufijo if sufijo else ''}.npy")
+
+
+def _borrar_versiones_viejas(ruta, vigente):
+    # Si otro proceso publicó después, su versión es la del puntero y también se conserva
+    conservar = {vigente, os.path.basename(version_actual(ruta) or '')}
+    for nombre in os.listdir(ruta):
+        directorio = os.path.join(ruta, nombre)
+        # Los que empiezan con punto son publicaciones a medio escribir de otro proceso
+        if os.path.isdir(directorio) and not nombre.startswith('.') and nombre not in conservar:
+            # En Windows un archivo mapeado no se puede borrar: queda para la próxima publicación
+            shutil.rmtree(directorio, ignore_errors=True)
+
+
+def publicar_hechos(engine, ruta=None, completa=False):
+    """Escribe la tabla de hechos como columnas mapeables y devuelve el directorio de la versión.
+
+    Si la huella de `ventas` no cambió desde la última publicación, no hace nada.
+    """
+    ruta = ruta or RUTA_COMPARTIDA
+    huella = huella_ventas(engine)
+    vigente = version_actual(ruta)
+    if not completa and vigente is not None:
+        esquema = _leer_json(os.path.join(vigente, ARCHIVO_ESQUEMA))
+        if esquema is not None and esquema['huella'] == huella:
+            return vigente
+
+    df = cargar_ventas(engine, columnas=COLUMNAS_COMPARTIDAS)
+    columnas = {nombre: df[nombre] for nombre in COLUMNAS_COMPARTIDAS}
+    columnas.update(claves_fecha(pd.to_datetime(df['Fecha'])))
+
+    # Nombre por huella y momento: una republicación con --completa tampoco
+    # toca el directorio que otros procesos pueden tener abierto
+    clave = hashlib.sha1(json.dumps(huella, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+    version = f'{clave}_{time.time_ns():x}'
+    temporal = os.path.join(ruta, '.' + version + '.tmp')
+    os.makedirs(temporal)
+    esquema = {'huella': huella, 'filas': len(df), 'columnas': {}}
+    for nombre, valores in columnas.items():
+        arreglos, info = _codificar(valores)
+        for sufijo, arreglo in arreglos.items():
+            np.save(_archivo(temporal, nombre, sufijo), np.ascontiguousarray(arreglo))
+        esquema['columnas'][nombre] = info
+    with open(os.path.join(temporal, ARCHIVO_ESQUEMA), 'w', encoding='utf-8') as f:
+        json.dump(esquema, f, ensure_ascii=False)
+    os.replace(temporal, os.path.join(ruta, version))
+
+    puntero = os.path.join(ruta, '.' + ARCHIVO_ACTUAL + '.tmp')
+    with open(puntero, 'w', encoding='utf-8') as f:
+        json.dump({'version': version}, f)
+    os.replace(puntero, os.path.join(ruta, ARCHIVO_ACTUAL))
+    _borrar_versiones_viejas(ruta, version)
+    return os.path.join(ruta, version)
+
+
+class HechosCompartidos:
+    """Columnas de la tabla de hechos mapeadas en memoria, de solo lectura.
+
+    `marco` arma un DataFrame sobre los mismos buffers, sin copiar las columnas
+    numéricas ni los códigos de las dimensiones.
+    """
+
+    def __init__(self, ruta=None):
+        # `ruta` puede ser la raíz (se sigue el puntero) o el directorio de una versión
+        ruta = version_actual(ruta) or ruta or RUTA_COMPARTIDA
+        esquema = None if ruta is None else _leer_json(os.path.join(ruta, ARCHIVO_ESQUEMA))
+        if esquema is None:
+            raise FileNotFoundError("No hay tabla de hechos publicada; corre publicar_hechos")
+        self.ruta = ruta
+        self.huella = esquema['huella']
+        self.filas = esquema['filas']
+        self.esquema = esquema['columnas']
+        self._tipos = {
+            nombre: pd.CategoricalDtype(info['categorias'])
+            for nombre, info in self.esquema.items() if info['tipo'] == 'codigos'
+        }
+        # Todas las columnas se mapean ya: el esquema y los arreglos son de la
+        # misma versión aunque después se publique otra
+        self._arreglos = {}
+        for nombre, info in self.esquema.items():
+            sufijos = ['', 'nulos'] if info['tipo'] == 'entero_nulo' else ['']
+            for sufijo in sufijos:
+                self._arreglos[(nombre, sufijo)] = np.load(_archivo(ruta, nombre, sufijo), mmap_mode='r')
+
+    @property
+    def columnas(self):
+        return list(self.esquema)
+
+    def arreglo(self, nombre, sufijo=''):
+        """El arreglo NumPy mapeado de una columna (los códigos, si es dimensión)."""
+        return self._arreglos[(nombre, sufijo)]
+
+    def columna(self, nombre, inicio=0, fin=None):
+        valores = self.arreglo(nombre)[inicio:fin]
+        tipo = self.esquema[nombre]['tipo']
+        if tipo == 'codigos':
+            return pd.Categorical.from_codes(valores, dtype=self._tipos[nombre])
+        if tipo == 'entero_nulo':
+            return pd.arrays.IntegerArray(valores, self.arreglo(nombre, 'nulos')[inicio:fin])
+        return valores
+
+    def marco(self, columnas=None, inicio=0, fin=None):
+        """DataFrame de las filas [inicio, fin) sobre la memoria compartida."""
+        columnas = columnas or self.columnas
+        return pd.DataFrame({nombre: self.columna(nombre, inicio, fin) for nombre in columnas}, copy=False)
+
+
+# ================================
+# TRABAJADORES
+# ================================
+# Cada proceso del pool abre la tabla una vez, en el inicializador; las tareas
+# solo llevan el rango de filas y la especificación de la agregación.
+_hechos = None
+
+
+def _adjuntar(ruta):
+    global _hechos
+    _hechos = HechosCompartidos(ruta)
+
+
+def _resumir_rango(inicio, fin, por, filtros, agregaciones):
+    necesarias = dict.fromkeys([*por, *(filtros or {}), *(columna for columna, _ in agregaciones.values())])
+    return agregar_pandas(_hechos.marco(list(necesarias), inicio, fin), por, filtros, **agregaciones)
+
+
+def combinar(parciales, por, agregaciones):
+    """Une los resultados por rango de filas en uno solo, como si fuera una sola pasada."""
+    funciones = {nombre: COMBINAR[funcion] for nombre, (_, funcion) in agregaciones.items()}
+    unidos = pd.concat(parciales)
+    if not por:
+        return pd.DataFrame({nombre: [unidos[nombre].agg(funcion)] for nombre, funcion in funciones.items()})
+    return unidos.groupby(level=list(por)).agg(funciones).sort_index()
+
+
+def resumir_paralelo(por, filtros=None, ruta=None, trabajadores=None, partes=None, **agregaciones):
+    """Misma especificación que `agregar`, repartida por rangos de filas en un pool de procesos.
+
+    Solo admite funciones que se combinan entre partes (sum, count, min, max).
+    """
+    for nombre, (_, funcion) in agregaciones.items():
+        if funcion not in COMBINAR:
+            raise ValueError(f"{nombre}: '{funcion}' no se puede combinar entre partes")
+    por = list(por)
+    hechos = HechosCompartidos(ruta)
+    trabajadores = trabajadores or os.cpu_count()
+    cortes = np.linspace(0, hechos.filas, (partes or trabajadores) + 1).astype('int64')
+    with ProcessPoolExecutor(max_workers=trabajadores, initializer=_adjuntar,
+                             initargs=(hechos.ruta,)) as ejecutor:
+        parciales = list(ejecutor.map(_resumir_rango, cortes[:-1], cortes[1:],
+                                      repeat(por), repeat(filtros), repeat(agregaciones)))
+    return combinar(parciales, por, agregaciones)
+
+
+if __name__ == '__main__':
+    # Uso: python scripts/memoria_compartida.py [--trabajadores 4] [--completa] [--validar]
+    import argparse
+    from datos import crear_engine
+
+    parser = argparse.ArgumentParser(description='Tabla de hechos en memoria compartida para análisis en paralelo')
+    parser.add_argument('--trabajadores', type=int, default=None, help='Procesos (por defecto, uno por CPU)')
+    parser.add_argument('--completa', action='store_true', help='Reescribe las columnas aunque la huella no cambie')
+    parser.add_argument('--validar', action='store_true', help='Compara contra pandas sobre la tabla completa')
+    args = parser.parse_args()
+
+    engine = crear_engine()
+    inicio = time.perf_counter()
+    ruta = publicar_hechos(engine, completa=args.completa)
+    hechos = HechosCompartidos(ruta)
+    tamano = sum(os.path.getsize(os.path.join(ruta, archivo)) for archivo in os.listdir(ruta))
+    print(f"✅ {hechos.filas:,} ventas publicadas en {ruta} ({tamano / 1024 ** 2:.1f} MB) "
+          f"en {time.perf_counter() - inicio:.2f} s")
+
+    agregaciones = {'Ventas': ('TotalVenta', 'sum'), 'Ganancia': ('Ganancia', 'sum'),
+                    'Transacciones': ('TotalVenta', 'count')}
+    inicio = time.perf_counter()
+    resultado = resumir_paralelo(['Region', 'Categoria'], trabajadores=args.trabajadores, **agregaciones)
+    print(f"\n=== VENTAS POR REGIÓN Y CATEGORÍA ({time.perf_counter() - inicio:.2f} s) ===")
+    print(resultado.round(2))
+
+    if args.validar:
+        esperado = agregar_pandas(cargar_ventas(engine), ['Region', 'Categoria'], **agregaciones)
+        pd.testing.assert_frame_equal(resultado, esperado, check_dtype=False, check_index_type=False)
+        print("\n✅ Coincide con pandas sobre la tabla completa")
+    engine.dispose()
@@ -0,0 +1,80 @@
+import numpy as np
+import json
+import os
+
+from datos import RUTA_CACHE, huella_ventas
+from cubo import actualizar_cubo, resumir_cubo
+from proyeccion import FACTORES, crecimiento_base, proyectar
+
+# ================================
+# MÉTRICAS DEL REPORTE EJECUTIVO
+# ================================
+# Las cifras del reporte salen del cubo mensual y se guardan junto con la
+# huella de `ventas`; mientras la tabla no cambie el reporte se arma solo
+# con este archivo, sin consultar ni agregar nada.
+RUTA_METRICAS = os.path.join(RUTA_CACHE, 'metricas_reporte.json')
+
+MESES = ['Enero', 'Febrero', 'Marzo', 'Abril', 'Mayo', 'Junio', 'Julio',
+         'Agosto', 'Septiembre', 'Octubre', 'Noviembre', 'Diciembre']
+
+# Variación del ticket promedio entre regiones por debajo de la cual se
+# considera que el poder adquisitivo es uniforme
+UMBRAL_UNIFORME = 0.10
+
+
+def calcular_metricas(cubo, meses_fuertes=4, meses_retadores=3):
+    """Cifras del reporte a partir del cubo mensual."""
+    anual = resumir_cubo(cubo, ['Año'], TotalVenta=('TotalVenta', 'sum'))['TotalVenta']
+    total = resumir_cubo(cubo, [], TotalVenta=('TotalVenta', 'sum'), Ganancia=('Ganancia', 'sum')).iloc[0]
+
+    region = resumir_cubo(cubo, ['Region'], TotalVenta=('TotalVenta', 'sum'),
+                          Transacciones=('TotalVenta', 'count'))
+    region = region.sort_values('TotalVenta', ascending=False)
+    ticket = region['TotalVenta'] / region['Transacciones']
+
+    categoria = resumir_cubo(cubo, ['Categoria'], TotalVenta=('TotalVenta', 'sum'),
+                             Ganancia=('Ganancia', 'sum'))
+    margen_categoria = categoria['Ganancia'] / categoria['TotalVenta']
+
+    # Mismo promedio mensual histórico que 04_proyeccion_2025.py
+    mensual = resumir_cubo(cubo, ['Año', 'Mes'], TotalVenta=('TotalVenta', 'sum'))['TotalVenta']
+    promedio_mensual = mensual.groupby(level='Mes').mean().reindex(range(1, 13), fill_value=0).round(2)
+    orden_meses = promedio_mensual.sort_values(ascending=False).index
+    proyeccion_2025 = proyectar(promedio_mensual.values, [crecimiento_base], FACTORES)[0].round(2)
+    pendiente = np.polyfit(np.arange(len(mensual)), mensual.values, 1)[0]
+
+    ultimo = int(anual.index.max())
+    promedio_anual = anual.mean()
+    return {
+        'inicio': int(anual.index.min()),
+        'fin': ultimo,
+        'total_ventas': float(total['TotalVenta']),
+        'margen': float(total['Ganancia'] / total['TotalVenta'] * 100),
+        'crecimiento_ultimo': float((anual[ultimo] / promedio_anual - 1) * 100),
+        'crecimiento_proyectado': float((proyeccion_2025.sum() / promedio_mensual.sum() - 1) * 100),
+        'region_lider': str(region.index[0]),
+        'regiones_rezagadas': [str(r) for r in region.index[-2:][::-1]],
+        'ticket_uniforme': bool(ticket.std() / ticket.mean() < UMBRAL_UNIFORME),
+        'categoria_volumen': str(categoria['TotalVenta'].idxmax()),
+        'categoria_margen': str(margen_categoria.idxmax()),
+        'categoria_menor_volumen': str(categoria['TotalVenta'].idxmin()),
+        'meses_fuertes': [MESES[m - 1] for m in sorted(orden_meses[:meses_fuertes])],
+        'meses_retadores': [MESES[m - 1] for m in sorted(orden_meses[-meses_retadores:])],
+        'tendencia_positiva': bool(pendiente > 0),
+    }
+
+
+def cargar_metricas(engine, recalcular=False):
+    """Métricas al día: se recalculan solo si cambió la huella de `ventas`."""
+    huella = huella_ventas(engine)
+    if not recalcular and os.path.exists(RUTA_METRICAS):
+        with open(RUTA_METRICAS, encoding='utf-8') as f:
+            guardadas = json.load(f)
+        if guardadas['huella'] == huella:
+            return guardadas['metricas']
+
+    metricas = calcular_metricas(actualizar_cubo(engine))
+    os.makedirs(RUTA_CACHE, exist_ok=True)
+    with open(RUTA_METRICAS, 'w', encoding='utf-8') as f:
+        json.dump({'huella': huella, 'metricas': metricas}, f, indent=2, ensure_ascii=False)
+    return metricas
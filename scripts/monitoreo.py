@@ -0,0 +1,318 @@
+from collections import deque
+import datetime
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from datos import RUTA_CACHE, CONSULTA_VENTAS, COLUMNAS_DINERO, huella_ventas, enriquecer_fechas
+from agregaciones import agregar, agregar_pandas
+
+# ================================
+# MONITOREO DE KPIs EN VIVO
+# ================================
+# Proceso de larga duración que mantiene los KPIs al día sin volver a correr
+# los scripts por lotes. Lee solo las ventas nuevas, ya sea sondeando MySQL
+# por encima de una marca de agua (ID) o siguiendo un archivo local de
+# cambios, y suma cada lote a totales en memoria. Cada `intervalo` segundos
+# escribe una foto de los KPIs en cache/monitoreo/.
+RUTA_MONITOREO = os.path.join(RUTA_CACHE, 'monitoreo')
+RUTA_SNAPSHOT = os.path.join(RUTA_MONITOREO, 'kpis.json')
+RUTA_HISTORIAL = os.path.join(RUTA_MONITOREO, 'kpis.jsonl')
+
+VENTANAS = (7, 30)
+# Latencias guardadas para los percentiles de cada foto
+MAX_LATENCIAS = 10_000
+
+MEDIDAS = {
+    'TotalVenta': ('TotalVenta', 'sum'),
+    'Ganancia': ('Ganancia', 'sum'),
+    'Transacciones': ('TotalVenta', 'count'),
+}
+
+
+def _dias(fechas):
+    """Días desde 1970 como enteros, para indexar las ventanas."""
+    return np.asarray(pd.to_datetime(pd.Series(fechas)), dtype='datetime64[D]').astype('int64')
+
+
+def _kpis(ventas, ganancia, transacciones):
+    return {
+        'ventas': round(float(ventas), 2),
+        'ganancia': round(float(ganancia), 2),
+        'transacciones': int(transacciones),
+        'margen_%': round(float(ganancia / ventas * 100), 1) if ventas else None,
+        'ticket': round(float(ventas / transacciones), 2) if transacciones else None,
+    }
+
+
+# ================================
+# VENTANAS MÓVILES
+# ================================
+class VentanaMovil:
+    """Ventas, ganancia y transacciones de los últimos `dias` días.
+
+    Buffer circular con un casillero por día: cada evento suma en el casillero
+    de su fecha y, cuando llega un día nuevo, solo se limpian los casilleros que
+    salen de la ventana. El costo por evento es O(1) y no depende de cuántas
+    ventas hay dentro. La ventana termina en la fecha más reciente vista.
+    """
+
+    def __init__(self, dias):
+        self.dias = dias
+        self.casilleros = np.zeros((dias, 3))
+        self.total = np.zeros(3)
+        self.ultimo = None
+
+    def agregar(self, dia, ventas, ganancia, transacciones=1):
+        """Suma un evento (o un día ya agregado); devuelve False si es más viejo que la ventana."""
+        if self.ultimo is None:
+            self.ultimo = dia
+        if dia > self.ultimo:
+            # Como mucho se recorren `dias` casilleros, aunque el salto sea mayor
+            for saliente in range(self.ultimo + 1, min(dia, self.ultimo + self.dias) + 1):
+                self.casilleros[saliente % self.dias] = 0
+            self.ultimo = dia
+            self.total = self.casilleros.sum(axis=0)
+        elif dia <= self.ultimo - self.dias:
+            return False
+        valores = (ventas, ganancia, transacciones)
+        self.casilleros[dia % self.dias] += valores
+        self.total += valores
+        return True
+
+    def resumen(self):
+        hasta = None if self.ultimo is None else str(np.datetime64(self.ultimo, 'D'))
+        return {'hasta': hasta, **_kpis(*self.total)}
+
+
+# ================================
+# TOTALES ACUMULADOS
+# ================================
+class MonitorKPI:
+    """Totales generales, por región y del mes en curso por categoría, más las ventanas."""
+
+    def __init__(self, ventanas=VENTANAS):
+        self.total = np.zeros(3)
+        self.por_region = {}
+        self.por_mes_categoria = {}
+        self.ventanas = {dias: VentanaMovil(dias) for dias in ventanas}
+        self.mes_actual = None
+        self.eventos = 0
+        self.latencias = deque(maxlen=MAX_LATENCIAS)
+
+    @staticmethod
+    def _sumar(totales, parcial):
+        for clave, fila in zip(parcial.index, parcial[list(MEDIDAS)].to_numpy(dtype='float64')):
+            totales[clave] = totales.get(clave, 0) + fila
+
+    def _sumar_dias(self, por_dia):
+        for dia, fila in zip(_dias(por_dia.index), por_dia[list(MEDIDAS)].to_numpy(dtype='float64')):
+            for ventana in self.ventanas.values():
+                ventana.agregar(int(dia), *fila)
+
+    def sembrar(self, engine, huella):
+        """Parte de los totales hasta la marca de agua, con GROUP BY en la base."""
+        if huella['max_id'] is None:
+            return
+        filtro = {'ID': ('<=', huella['max_id'])}
+        total = agregar(engine, [], filtro, **MEDIDAS).fillna(0)
+        self.total += total[list(MEDIDAS)].to_numpy(dtype='float64')[0]
+        self._sumar(self.por_region, agregar(engine, ['Region'], filtro, **MEDIDAS))
+        self._sumar(self.por_mes_categoria, agregar(engine, ['AñoMes', 'Categoria'], filtro, **MEDIDAS))
+        if self.por_mes_categoria:
+            self.mes_actual = int(max(mes for mes, _ in self.por_mes_categoria))
+
+        desde = np.datetime64(str(huella['max_fecha'])[:10], 'D') - (max(self.ventanas) - 1)
+        self._sumar_dias(agregar(engine, ['Fecha'], {**filtro, 'Fecha': ('>=', str(desde))}, **MEDIDAS))
+        self.eventos = int(self.total[2])
+
+    def agregar(self, lote, insertado=None):
+        """Suma un lote de ventas nuevas; `insertado` es el momento (epoch) en que entraron."""
+        if lote.empty:
+            return
+        lote = enriquecer_fechas(lote)
+        self.total += [lote['TotalVenta'].sum(), lote['Ganancia'].sum(), lote['TotalVenta'].count()]
+        self._sumar(self.por_region, agregar_pandas(lote, ['Region'], **MEDIDAS))
+        self._sumar(self.por_mes_categoria, agregar_pandas(lote, ['AñoMes', 'Categoria'], **MEDIDAS))
+        self.mes_actual = max(self.mes_actual or 0, int(lote['AñoMes'].max()))
+        self._sumar_dias(agregar_pandas(lote, ['Fecha'], **MEDIDAS))
+        self.eventos += len(lote)
+
+        if insertado is not None:
+            # Latencia de inserción a KPI visible: termina cuando el lote ya está sumado
+            visible = time.time()
+            self.latencias.extend(np.broadcast_to(visible - np.asarray(insertado, dtype='float64'), len(lote)))
+
+    def snapshot(self, marca=None):
+        latencias = np.asarray(self.latencias)
+        return {
+            'momento': datetime.datetime.now().isoformat(timespec='seconds'),
+            'marca': marca,
+            'eventos': self.eventos,
+            'total': _kpis(*self.total),
+            'por_region': {region: _kpis(*fila) for region, fila in sorted(self.por_region.items())},
+            'mes_en_curso': self.mes_actual,
+            'categoria_mes': {categoria: _kpis(*fila)
+                              for (mes, categoria), fila in sorted(self.por_mes_categoria.items())
+                              if mes == self.mes_actual},
+            'ventanas': {f'{dias}d': ventana.resumen() for dias, ventana in self.ventanas.items()},
+            'latencia_ms': None if latencias.size == 0 else {
+                'p50': round(float(np.percentile(latencias, 50)) * 1000, 1),
+                'p95': round(float(np.percentile(latencias, 95)) * 1000, 1),
+                'max': round(float(latencias.max()) * 1000, 1),
+                'muestras': int(latencias.size),
+            },
+        }
+
+
+# ================================
+# FUENTES DE VENTAS NUEVAS
+# ================================
+class SondeoVentas:
+    """Lee de la base las ventas con ID mayor a la marca de agua, por lotes.
+
+    `ventas` no guarda la hora de inserción: la latencia se mide desde el
+    sondeo anterior, que es la cota superior de cuándo entró cada fila.
+    """
+
+    def __init__(self, engine, marca=None, lote=10_000):
+        self.engine = engine
+        self.marca = marca or 0
+        self.lote = lote
+        self.sondeo_anterior = time.time()
+
+    def leer(self):
+        inicio = time.time()
+        consulta = CONSULTA_VENTAS + '\n    WHERE v.ID > :marca\n    ORDER BY v.ID\n    LIMIT :lote'
+        df = pd.read_sql(text(consulta), self.engine, params={'marca': self.marca, 'lote': self.lote})
+        for columna in COLUMNAS_DINERO:
+            df[columna] = df[columna].astype('float64')
+        insertado = self.sondeo_anterior
+        self.sondeo_anterior = inicio
+        if not df.empty:
+            self.marca = int(df['ID'].max())
+        return df, insertado
+
+
+class FeedLocal:
+    """Sigue un archivo de cambios en JSON lines, como `tail -f`.
+
+    Cada línea es una venta con las columnas de CONSULTA_VENTAS (al menos
+    Fecha, TotalVenta, Ganancia, Region y Categoria) y `insertado`, la hora
+    epoch en que el productor la escribió. La marca de agua es el byte leído.
+    """
+
+    def __init__(self, ruta, posicion=0, lote=10_000):
+        self.ruta = ruta
+        self.marca = posicion
+        self.lote = lote
+
+    def leer(self):
+        eventos = []
+        if os.path.exists(self.ruta):
+            with open(self.ruta, 'rb') as f:
+                f.seek(self.marca)
+                while len(eventos) < self.lote:
+                    linea = f.readline()
+                    # Una línea sin salto todavía se está escribiendo
+                    if not linea.endswith(b'\n'):
+                        break
+                    self.marca += len(linea)
+                    if linea.strip():
+                        eventos.append(json.loads(linea))
+        df = pd.DataFrame(eventos)
+        insertado = df.pop('insertado').to_numpy() if 'insertado' in df else None
+        return df, insertado
+
+
+def publicar_eventos(ruta, ventas):
+    """Agrega ventas (DataFrame) al archivo de cambios con su hora de inserción."""
+    os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+    ventas = ventas.assign(insertado=time.time())
+    with open(ruta, 'a', encoding='utf-8') as f:
+        f.write(ventas.to_json(orient='records', lines=True, date_format='iso', force_ascii=False))
+        if not ventas.empty:
+            f.write('\n')
+
+
+# ================================
+# CICLO PRINCIPAL
+# ================================
+def guardar_snapshot(snapshot):
+    os.makedirs(RUTA_MONITOREO, exist_ok=True)
+    temporal = RUTA_SNAPSHOT + '.tmp'
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(snapshot, f, indent=2, ensure_ascii=False)
+    os.replace(temporal, RUTA_SNAPSHOT)
+    with open(RUTA_HISTORIAL, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(snapshot, ensure_ascii=False) + '\n')
+
+
+def monitorear(fuente, monitor, intervalo=5.0, sondeo=1.0, duracion=None):
+    """Lee, suma y publica fotos cada `intervalo` segundos hasta `duracion` o Ctrl+C."""
+    fin = None if duracion is None else time.monotonic() + duracion
+    proxima_foto = time.monotonic() + intervalo
+    try:
+        while fin is None or time.monotonic() < fin:
+            lote, insertado = fuente.leer()
+            monitor.agregar(lote, insertado)
+            if time.monotonic() >= proxima_foto:
+                _publicar(monitor.snapshot(fuente.marca))
+                while proxima_foto <= time.monotonic():
+                    proxima_foto += intervalo
+            # Con un lote lleno hay más filas pendientes: se vuelve a leer sin esperar
+            if len(lote) < fuente.lote:
+                time.sleep(sondeo)
+    except KeyboardInterrupt:
+        pass
+    foto = monitor.snapshot(fuente.marca)
+    _publicar(foto)
+    return foto
+
+
+def _publicar(foto):
+    guardar_snapshot(foto)
+    total = foto['total']
+    latencia = '-' if foto['latencia_ms'] is None else f"{foto['latencia_ms']['p50']}/{foto['latencia_ms']['p95']} ms"
+    print(f"[{foto['momento']}] {foto['eventos']:,} ventas  "
+          f"Ventas: ${total['ventas']:,.2f}  Margen: {total['margen_%']}%  "
+          f"7d: ${foto['ventanas'].get('7d', {}).get('ventas', 0):,.2f}  "
+          f"Latencia p50/p95: {latencia}", flush=True)
+
+
+if __name__ == '__main__':
+    # Uso: python scripts/monitoreo.py [--intervalo 5] [--feed cambios.jsonl]
+    import argparse
+    from datos import crear_engine
+
+    parser = argparse.ArgumentParser(description='KPIs de ventas en vivo, actualizados con cada venta nueva')
+    parser.add_argument('--feed', help='Archivo JSON lines de cambios a seguir en lugar de sondear MySQL')
+    parser.add_argument('--intervalo', type=float, default=5.0, help='Segundos entre fotos de los KPIs')
+    parser.add_argument('--sondeo', type=float, default=1.0, help='Segundos de espera cuando no hay ventas nuevas')
+    parser.add_argument('--lote', type=int, default=10_000, help='Máximo de ventas por lectura')
+    parser.add_argument('--desde-cero', action='store_true',
+                        help='No parte de los totales históricos: cuenta solo las ventas nuevas')
+    parser.add_argument('--duracion', type=float, help='Segundos a monitorear (por defecto, hasta Ctrl+C)')
+    args = parser.parse_args()
+
+    monitor = MonitorKPI()
+    engine = None
+    if args.feed:
+        fuente = FeedLocal(args.feed, lote=args.lote)
+    else:
+        engine = crear_engine()
+        huella = huella_ventas(engine)
+        if not args.desde_cero:
+            inicio = time.perf_counter()
+            monitor.sembrar(engine, huella)
+            print(f"✅ Totales hasta ID {huella['max_id']} cargados en {time.perf_counter() - inicio:.2f} s")
+        fuente = SondeoVentas(engine, huella['max_id'], lote=args.lote)
+
+    monitorear(fuente, monitor, args.intervalo, args.sondeo, args.duracion)
+    print(f"✅ Última foto en: {RUTA_SNAPSHOT}")
+    if engine is not None:
+        engine.dispose()
@@ -0,0 +1,152 @@
+from contextlib import contextmanager
+import cProfile
+import datetime
+import io
+import json
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+
+from datos import RUTA_CACHE
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# ================================
+# PERFILADO POR ETAPA
+# ================================
+# Se activa con la variable de entorno PERFIL:
+#   PERFIL=1            tiempo, filas, filas/s, pico de RSS y bytes leídos
+#   PERFIL=cprofile     además, las funciones con más tiempo acumulado
+#   PERFIL=tracemalloc  además, las líneas que más memoria reservaron
+# Cada etapa agrega una línea JSON a cache/perfil.jsonl (o a PERFIL_SALIDA).
+PERFIL = os.getenv('PERFIL', '').lower()
+RUTA_PERFIL = os.getenv('PERFIL_SALIDA', os.path.join(RUTA_CACHE, 'perfil.jsonl'))
+TOP_FUNCIONES = int(os.getenv('PERFIL_TOP', '15'))
+
+# Un identificador por corrida para agrupar las etapas del mismo script
+CORRIDA = datetime.datetime.now().isoformat(timespec='seconds')
+
+
+class Medicion:
+    """Lo que la etapa informa mientras corre; por ahora, las filas procesadas."""
+
+    def __init__(self, nombre, filas=None):
+        self.nombre = nombre
+        self.filas = filas
+
+
+def pico_rss_mb():
+    """Pico de memoria residente del proceso hasta ahora."""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux lo da en KB y macOS en bytes
+    return round(pico / 1024 ** 2 if sys.platform == 'darwin' else pico / 1024, 1)
+
+
+def bytes_leidos():
+    """Bytes leídos por el proceso (socket de MySQL y archivos), de /proc/self/io."""
+    try:
+        with open('/proc/self/io', encoding='ascii') as f:
+            for linea in f:
+                if linea.startswith('rchar:'):
+                    return int(linea.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+def _top_cprofile(perfil):
+    salida = io.StringIO()
+    estadisticas = pstats.Stats(perfil, stream=salida)
+    filas = []
+    for (archivo, linea, funcion), (_, llamadas, propio, acumulado, _) in estadisticas.stats.items():
+        filas.append({
+            'funcion': f'{os.path.basename(archivo)}:{linea}({funcion})',
+            'llamadas': llamadas,
+            'propio_s': round(propio, 4),
+            'acumulado_s': round(acumulado, 4),
+        })
+    filas.sort(key=lambda fila: fila['acumulado_s'], reverse=True)
+    return filas[:TOP_FUNCIONES]
+
+
+FILTROS_TRACEMALLOC = [
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, tracemalloc.__file__),
+]
+
+
+def _top_tracemalloc(antes, despues):
+    antes = antes.filter_traces(FILTROS_TRACEMALLOC)
+    despues = despues.filter_traces(FILTROS_TRACEMALLOC)
+    diferencias = despues.compare_to(antes, 'lineno')[:TOP_FUNCIONES]
+    return [{'linea': str(d.traceback), 'kb': round(d.size_diff / 1024, 1), 'bloques': d.count_diff}
+            for d in diferencias]
+
+
+def _escribir(registro):
+    os.makedirs(os.path.dirname(RUTA_PERFIL) or '.', exist_ok=True)
+    with open(RUTA_PERFIL, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(registro, ensure_ascii=False) + '\n')
+
+
+@contextmanager
+def etapa(nombre, filas=None):
+    """Mide un bloque del script. Sin PERFIL no hace nada.
+
+    with etapa('carga') as medicion:
+        df = cargar_ventas(engine)
+        medicion.filas = len(df)
+    """
+    medicion = Medicion(nombre, filas)
+    if not PERFIL:
+        yield medicion
+        return
+
+    perfil = None
+    instantanea = None
+    if PERFIL == 'cprofile':
+        perfil = cProfile.Profile()
+    elif PERFIL == 'tracemalloc':
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        instantanea = tracemalloc.take_snapshot()
+
+    leidos = bytes_leidos()
+    inicio = time.perf_counter()
+    if perfil is not None:
+        perfil.enable()
+    try:
+        yield medicion
+    finally:
+        if perfil is not None:
+            perfil.disable()
+        segundos = time.perf_counter() - inicio
+        leidos_fin = bytes_leidos()
+
+        registro = {
+            'corrida': CORRIDA,
+            'script': os.path.basename(sys.argv[0]),
+            'etapa': nombre,
+            'segundos': round(segundos, 4),
+            'filas': medicion.filas,
+            'filas_s': round(medicion.filas / segundos, 1) if medicion.filas and segundos > 0 else None,
+            'pico_rss_mb': pico_rss_mb(),
+            'bytes_leidos': None if leidos is None or leidos_fin is None else leidos_fin - leidos,
+        }
+        if perfil is not None:
+            registro['funciones'] = _top_cprofile(perfil)
+        if instantanea is not None:
+            registro['pico_python_mb'] = round(tracemalloc.get_traced_memory()[1] / 1024 ** 2, 2)
+            registro['asignaciones'] = _top_tracemalloc(instantanea, tracemalloc.take_snapshot())
+        _escribir(registro)
+        print(f"⏱️  {nombre}: {segundos:.3f} s"
+              + (f", {medicion.filas:,} filas" if medicion.filas else ''), file=sys.stderr)
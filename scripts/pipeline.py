@@ -0,0 +1,251 @@
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import pickle
+import time
+
+import pandas as pd
+
+from datos import (crear_engine, cargar_ventas, enriquecer_fechas, etiqueta_mes, huella_ventas,
+                   RUTA_BASE, RUTA_CACHE, CONSULTA_CLIENTES_REGION, EXTRACCION)
+from agregaciones import agregar_pandas
+from cache_consultas import leer_sql
+from cubo import GRANO, MEDIDAS_CUBO, resumir_cubo
+from proyeccion import tabla_proyeccion
+from metricas import calcular_metricas
+
+# ================================
+# PIPELINE 01-05 CON CACHÉ POR ETAPA
+# ================================
+# Cada etapa tiene una clave: el hash de su código y del de los módulos que
+# usa, de sus parámetros y de las claves de las etapas de las que depende. La clave de la extracción
+# sale de la huella de `ventas`, así que si la tabla no cambió ninguna
+# clave cambia y todo el pipeline se omite sin leer datos.
+RUTA_PIPELINE = os.path.join(RUTA_CACHE, 'pipeline')
+RUTA_CLAVES = os.path.join(RUTA_CACHE, 'pipeline.json')
+RUTA_REPORTE = os.path.join(RUTA_BASE, 'salida', 'reporte_ejecutivo.txt')
+
+COLUMNAS = ['Fecha', 'Cantidad', 'TotalVenta', 'TotalCosto', 'Ganancia', 'Region', 'Producto', 'Categoria']
+
+
+class Etapa:
+    """Paso del pipeline.
+
+    funcion(contexto, **resultados) recibe los resultados de `depende` por nombre.
+    Las etapas con `persistir` guardan su resultado para que una etapa posterior
+    pueda correr sin repetirlas; `salidas` son archivos que deben existir para
+    poder omitirla. `modulos` son los módulos cuyo código entra a la clave:
+    cambiar un ayudante (metricas, graficas...) invalida la etapa igual que
+    cambiar su función.
+    """
+
+    def __init__(self, nombre, funcion, depende=(), parametros=None, persistir=True, salidas=(), modulos=()):
+        self.nombre = nombre
+        self.funcion = funcion
+        self.depende = list(depende)
+        self.modulos = list(modulos)
+        self.parametros = parametros or (lambda contexto: None)
+        self.persistir = persistir
+        self.salidas = list(salidas)
+
+
+# ================================
+# ETAPAS
+# ================================
+def extraer(contexto):
+    # 01: sincroniza el almacén local y lee la tabla de hechos tipada
+    return cargar_ventas(contexto['engine'], columnas=COLUMNAS)
+
+
+def fechas(contexto, extraer):
+    return enriquecer_fechas(extraer)
+
+
+def agregar(contexto, fechas):
+    # 02/03: todo se resume desde el cubo mensual, calculado una sola vez
+    cubo = agregar_pandas(fechas, GRANO, **MEDIDAS_CUBO).reset_index()
+    clientes_region = leer_sql(contexto['engine'], CONSULTA_CLIENTES_REGION)
+    return {'cubo': cubo, 'clientes_region': clientes_region}
+
+
+def proyectar(contexto, agregar):
+    # 04: escenario base de la proyección 2025
+    cubo = agregar['cubo']
+    promedio_mensual = (resumir_cubo(cubo, ['Año', 'Mes'], TotalVenta=('TotalVenta', 'sum'))
+                        .reset_index().groupby('Mes')['TotalVenta'].mean().round(2))
+    ventas_2024 = resumir_cubo(cubo, ['Mes'], {'Año': 2024}, TotalVenta=('TotalVenta', 'sum'))['TotalVenta'].round(2)
+    return {'df_proyeccion': tabla_proyeccion(promedio_mensual), 'promedio_mensual': promedio_mensual,
+            'ventas_2024': ventas_2024}
+
+
+def graficar(contexto, agregar, proyectar):
+    # Mismas figuras que 03 y 04 con --salida
+    from graficas import (figura_analisis_profundo, figura_comparativo, figura_proyeccion,
+                          renderizar)
+    cubo = agregar['cubo']
+    cat_region = resumir_cubo(cubo, ['Region', 'Categoria'], TotalVenta=('TotalVenta', 'sum'))['TotalVenta'].round(2).unstack()
+    ventas_mes = resumir_cubo(cubo, ['AñoMes'], TotalVenta=('TotalVenta', 'sum')).reset_index()
+    ventas_mes['AñoMes'] = etiqueta_mes(ventas_mes['AñoMes'])
+    margen_cat = resumir_cubo(cubo, ['Categoria'], Ventas=('TotalVenta', 'sum'), Ganancia=('Ganancia', 'sum')).round(2)
+    margen_cat['Margen_%'] = (margen_cat['Ganancia'] / margen_cat['Ventas'] * 100).round(1)
+    df_comparativo = pd.DataFrame({
+        'Promedio_3años': proyectar['promedio_mensual'],
+        'Ventas_2024': proyectar['ventas_2024']
+    }).fillna(0)
+    return renderizar({
+        'analisis_profundo': (figura_analisis_profundo, (cat_region, proyectar['ventas_2024'], ventas_mes, margen_cat)),
+        'comparativo_clientes': (figura_comparativo, (df_comparativo, agregar['clientes_region'])),
+        'proyeccion_2025': (figura_proyeccion, (proyectar['df_proyeccion'], proyectar['ventas_2024'])),
+    }, contexto['formatos'])
+
+
+def reportar(contexto, agregar):
+    # 05: el nombre del módulo empieza con un dígito, por eso import_module
+    conclusiones = importlib.import_module('05_conclusiones')
+    texto = conclusiones.redactar(calcular_metricas(agregar['cubo']))
+    with open(RUTA_REPORTE, 'w', encoding='utf-8') as f:
+        f.write(texto)
+    return RUTA_REPORTE
+
+
+def crear_etapas(formatos=('png',)):
+    return [
+        Etapa('extraer', extraer, persistir=False,
+              parametros=lambda contexto: [huella_ventas(contexto['engine']), EXTRACCION, COLUMNAS],
+              modulos=['datos', 'dimensiones']),
+        Etapa('fechas', fechas, ['extraer'], persistir=False, modulos=['datos']),
+        Etapa('agregar', agregar, ['fechas'], modulos=['agregaciones', 'cubo', 'datos']),
+        Etapa('proyectar', proyectar, ['agregar'], modulos=['cubo', 'proyeccion']),
+        Etapa('graficar', graficar, ['agregar', 'proyectar'],
+              parametros=lambda contexto: list(contexto['formatos']),
+              salidas=[os.path.join('salida', 'graficas', f'{nombre}.{formato}')
+                       for nombre in ('analisis_profundo', 'comparativo_clientes', 'proyeccion_2025')
+                       for formato in formatos],
+              modulos=['cubo', 'datos', 'graficas']),
+        Etapa('reportar', reportar, ['agregar'], salidas=[os.path.join('salida', 'reporte_ejecutivo.txt')],
+              modulos=['metricas', '05_conclusiones']),
+    ]
+
+
+# ================================
+# EJECUCIÓN
+# ================================
+def _clave(etapa, contexto, claves):
+    h = hashlib.sha256()
+    h.update(inspect.getsource(etapa.funcion).encode('utf-8'))
+    for modulo in etapa.modulos:
+        h.update(inspect.getsource(importlib.import_module(modulo)).encode('utf-8'))
+    h.update(json.dumps(etapa.parametros(contexto), default=str).encode('utf-8'))
+    for dependencia in etapa.depende:
+        h.update(claves[dependencia].encode('utf-8'))
+    return h.hexdigest()
+
+
+def _ruta_resultado(nombre):
+    return os.path.join(RUTA_PIPELINE, f'{nombre}.pkl')
+
+
+def _vigente(etapa, clave, guardadas):
+    if guardadas.get(etapa.nombre) != clave:
+        return False
+    if etapa.persistir and not os.path.exists(_ruta_resultado(etapa.nombre)):
+        return False
+    return all(os.path.exists(os.path.join(RUTA_BASE, salida)) for salida in etapa.salidas)
+
+
+def ejecutar(etapas, contexto, forzar=(), trabajadores=4):
+    """Corre solo las etapas cuya clave cambió; las independientes van en paralelo.
+
+    Devuelve {etapa: (estado, segundos)} con estado 'ejecutada', 'cargada' u 'omitida'.
+    """
+    por_nombre = {etapa.nombre: etapa for etapa in etapas}
+    guardadas = {}
+    if os.path.exists(RUTA_CLAVES):
+        with open(RUTA_CLAVES, encoding='utf-8') as f:
+            guardadas = json.load(f)
+
+    # Las etapas vienen en orden topológico
+    claves = {}
+    pendientes = set()
+    for etapa in etapas:
+        claves[etapa.nombre] = _clave(etapa, contexto, claves)
+        if etapa.nombre in forzar or not _vigente(etapa, claves[etapa.nombre], guardadas):
+            pendientes.add(etapa.nombre)
+
+    # Una etapa pendiente necesita los resultados de sus dependencias: las
+    # persistidas se leen del disco y las demás se vuelven a correr
+    for etapa in reversed(etapas):
+        if etapa.nombre in pendientes:
+            for dependencia in etapa.depende:
+                if not por_nombre[dependencia].persistir:
+                    pendientes.add(dependencia)
+
+    resultados = {}
+    tiempos = {etapa.nombre: ('omitida', 0.0) for etapa in etapas}
+    for etapa in etapas:
+        if etapa.nombre not in pendientes and any(
+                etapa.nombre in por_nombre[p].depende for p in pendientes):
+            inicio = time.perf_counter()
+            with open(_ruta_resultado(etapa.nombre), 'rb') as f:
+                resultados[etapa.nombre] = pickle.load(f)
+            tiempos[etapa.nombre] = ('cargada', time.perf_counter() - inicio)
+
+    def correr(etapa):
+        inicio = time.perf_counter()
+        resultado = etapa.funcion(contexto, **{d: resultados[d] for d in etapa.depende})
+        if etapa.persistir:
+            os.makedirs(RUTA_PIPELINE, exist_ok=True)
+            temporal = _ruta_resultado(etapa.nombre) + '.tmp'
+            with open(temporal, 'wb') as f:
+                pickle.dump(resultado, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporal, _ruta_resultado(etapa.nombre))
+        return resultado, time.perf_counter() - inicio
+
+    terminadas = set()
+    en_curso = {}
+    with ThreadPoolExecutor(max_workers=trabajadores) as ejecutor:
+        while len(terminadas) < len(pendientes):
+            for nombre in [e.nombre for e in etapas]:
+                etapa = por_nombre[nombre]
+                if (nombre in pendientes and nombre not in terminadas and nombre not in en_curso.values()
+                        and all(d not in pendientes or d in terminadas for d in etapa.depende)):
+                    en_curso[ejecutor.submit(correr, etapa)] = nombre
+            listas, _ = wait(en_curso, return_when=FIRST_COMPLETED)
+            for futuro in listas:
+                nombre = en_curso.pop(futuro)
+                resultados[nombre], segundos = futuro.result()
+                tiempos[nombre] = ('ejecutada', segundos)
+                terminadas.add(nombre)
+                guardadas[nombre] = claves[nombre]
+                os.makedirs(RUTA_CACHE, exist_ok=True)
+                with open(RUTA_CLAVES, 'w', encoding='utf-8') as f:
+                    json.dump(guardadas, f, indent=2)
+    return tiempos
+
+
+if __name__ == '__main__':
+    # Uso: python scripts/pipeline.py [--forzar agregar] [--formato png svg]
+    import argparse
+
+    etapas = crear_etapas()
+    parser = argparse.ArgumentParser(description='Corre los scripts 01-05 como un pipeline con caché por etapa')
+    parser.add_argument('--forzar', nargs='*', default=[], choices=[e.nombre for e in etapas],
+                        help='Etapas a correr aunque sus entradas no hayan cambiado')
+    parser.add_argument('--formato', nargs='+', default=['png'], choices=['png', 'svg', 'pdf'],
+                        help='Formatos de las gráficas')
+    parser.add_argument('--trabajadores', type=int, default=4, help='Etapas independientes en paralelo')
+    args = parser.parse_args()
+
+    engine = crear_engine()
+    inicio = time.perf_counter()
+    tiempos = ejecutar(crear_etapas(args.formato), {'engine': engine, 'formatos': args.formato},
+                       forzar=args.forzar, trabajadores=args.trabajadores)
+    engine.dispose()
+
+    print("=== PIPELINE 01-05 ===")
+    for nombre, (estado, segundos) in tiempos.items():
+        print(f"{nombre:<10} {estado:<10} {segundos:8.2f} s")
+    print(f"{'total':<10} {'':<10} {time.perf_counter() - inicio:8.2f} s")
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+
+# ================================
+# FACTORES ESTACIONALES POR MES
+# ================================
+# Basado en el análisis de temporadas comerciales
+factores_estacionales = {
+    1: 0.90,   # Enero - inicio de año, liquidaciones
+    2: 1.20,   # Febrero - San Valentín, demostró ser fuerte
+    3: 1.05,   # Marzo - Día de la Mujer, oportunidad
+    4: 1.10,   # Abril - Semana Santa
+    5: 1.25,   # Mayo - Día de la Madre, muy fuerte
+    6: 0.95,   # Junio - cayó en 2024, reforzar
+    7: 1.00,   # Julio - vacaciones
+    8: 1.15,   # Agosto - regreso a clases
+    9: 1.05,   # Septiembre - fiestas
+    10: 1.20,  # Octubre - Halloween, demostró ser fuerte
+    11: 1.25,  # Noviembre - Black Friday, oportunidad
+    12: 1.35,  # Diciembre - Navidad, el más fuerte
+}
+FACTORES = np.array([factores_estacionales[mes] for mes in range(1, 13)])
+
+# Crecimiento del 10% sobre el promedio histórico
+crecimiento_base = 1.10
+
+
+# ================================
+# MOTOR DE PROYECCIÓN POR LOTES
+# ================================
+def proyectar(promedios, crecimientos, factores):
+    """Evalúa todos los escenarios a la vez con broadcasting.
+
+    promedios: (12,) o (series, 12) promedio histórico por mes
+    crecimientos: (escenarios,)
+    factores: (12,) o (escenarios, 12) factores estacionales
+    Devuelve (escenarios, 12) o (escenarios, series, 12).
+    """
+    promedios = np.asarray(promedios, dtype='float64')
+    crecimientos = np.asarray(crecimientos, dtype='float64')
+    factores = np.broadcast_to(np.asarray(factores, dtype='float64'), (len(crecimientos), 12))
+    escalas = crecimientos[:, None] * factores
+    if promedios.ndim == 1:
+        return escalas * promedios
+    return escalas[:, None, :] * promedios[None, :, :]
+
+
+def muestrear_escenarios(n, crecimiento=(1.00, 1.20), ruido_estacional=0.05, semilla=None):
+    """Muestra Monte Carlo: crecimiento uniforme y factores estacionales perturbados."""
+    rng = np.random.default_rng(semilla)
+    crecimientos = rng.uniform(*crecimiento, size=n)
+    # Ruido multiplicativo lognormal: los factores nunca quedan negativos
+    factores = FACTORES * rng.lognormal(0.0, ruido_estacional, size=(n, 12))
+    return crecimientos, factores
+
+
+def malla_escenarios(crecimientos, escalas_estacionales):
+    """Todas las combinaciones de crecimiento y de intensidad de la estacionalidad.
+
+    Una escala de 0 aplana la estacionalidad, 1 la deja igual y 2 la duplica.
+    """
+    c, e = np.meshgrid(np.asarray(crecimientos, dtype='float64'),
+                       np.asarray(escalas_estacionales, dtype='float64'), indexing='ij')
+    factores = 1 + e.reshape(-1, 1) * (FACTORES - 1)
+    return c.ravel(), factores
+
+
+def bandas(proyecciones, percentiles=(10, 50, 90)):
+    """Percentiles por mes (y por serie) sobre el eje de escenarios."""
+    return np.percentile(proyecciones, percentiles, axis=0)
+
+
+def tabla_bandas(proyecciones, percentiles=(10, 50, 90)):
+    valores = bandas(proyecciones, percentiles)
+    return pd.DataFrame(valores.T, index=range(1, 13), columns=[f'P{p}' for p in percentiles]).round(2)
+
+
+def tabla_proyeccion(promedio_mensual):
+    """Proyección 2025 del escenario base, como la imprime 04_proyeccion_2025.py."""
+    # Aplicamos crecimiento del 10% sobre el promedio histórico
+    # más los factores estacionales (un solo escenario del motor de proyección)
+    proyeccion_2025 = proyectar(promedio_mensual.values, [crecimiento_base], FACTORES)[0].round(2)
+
+    df_proyeccion = pd.DataFrame({
+        'Mes': promedio_mensual.index,
+        'Proyeccion_2025': proyeccion_2025,
+        'Promedio_Historico': promedio_mensual.values
+    })
+
+    df_proyeccion['Crecimiento_%'] = ((df_proyeccion['Proyeccion_2025'] - df_proyeccion['Promedio_Historico']) / df_proyeccion['Promedio_Historico'] * 100).round(1)
+    return df_proyeccion
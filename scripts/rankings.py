@@ -0,0 +1,227 @@
+import numpy as np
+import pandas as pd
+import json
+import os
+import shutil
+from sqlalchemy import text
+
+from datos import RUTA_CACHE, huella_ventas
+from acumuladores import AcumuladorGrupos
+from agregaciones import construir_consulta
+from dimensiones import cargar_dimensiones
+
+# ================================
+# RANKINGS TOP-K
+# ================================
+# Mejores vendedores por ganancia en cada región y mes, mejores clientes por
+# gasto y productos con peor margen. Los totales por clave se acumulan desde
+# GROUP BY en la base y el top-K sale de una selección parcial (argpartition),
+# sin ordenar todo el resultado agrupado: O(n) en vez de O(n log n).
+# Vendedores y clientes se agrupan por ID (los nombres se repiten entre
+# personas) y los nombres se agregan solo al mostrar el resultado.
+# Los totales se guardan en Parquet con la huella de `ventas`; si solo hubo
+# ventas nuevas, la siguiente corrida agrupa únicamente las filas con ID
+# mayor a la marca.
+RUTA_RANKINGS = os.path.join(RUTA_CACHE, 'rankings')
+RUTA_META_RANKINGS = os.path.join(RUTA_CACHE, 'rankings.json')
+
+# Filas por lote al leer cada GROUP BY
+LOTE_RANKINGS = 200_000
+
+
+def top_k(valores, k, mayores=True):
+    """Posiciones de los k mayores (o menores) de `valores`, ya ordenadas.
+
+    argpartition deja los k primeros en O(n) y solo esos k se ordenan. Los
+    nulos van siempre al final.
+    """
+    valores = np.asarray(valores, dtype='float64')
+    claves = -valores if mayores else valores.copy()
+    claves[np.isnan(claves)] = np.inf
+    if k < len(claves):
+        candidatos = np.argpartition(claves, k - 1)[:k]
+    else:
+        candidatos = np.arange(len(claves))
+    return candidatos[np.argsort(claves[candidatos], kind='stable')]
+
+
+def seleccionar(totales, grupo, puntaje, k, mayores=True):
+    """Top-K de `totales` por `puntaje` dentro de cada combinación de `grupo`."""
+    totales = totales.reset_index()
+    valores = totales[puntaje].to_numpy(dtype='float64')
+    if grupo:
+        # indices agrupa por hash; cada grupo se selecciona por separado
+        grupos = totales.groupby(grupo, sort=True, observed=True).indices.values()
+    else:
+        grupos = [np.arange(len(totales))]
+    elegidas = [posiciones[top_k(valores[posiciones], k, mayores)] for posiciones in grupos]
+    if not elegidas:
+        return totales.head(0)
+    top = totales.take(np.concatenate(elegidas))
+    top.insert(len(grupo), 'Posicion', np.concatenate([np.arange(1, len(p) + 1) for p in elegidas]))
+    return top.set_index(list(grupo) + ['Posicion'])
+
+
+class Ranking:
+    """Top-K de `clave` por `puntaje` en cada `grupo`, con totales que se actualizan por lotes.
+
+    Las agregaciones usan la forma de `DataFrame.agg` con nombre y deben ser
+    sumables; `derivadas` calcula columnas sobre los totales (por ejemplo, un
+    margen) antes de seleccionar.
+    """
+
+    def __init__(self, clave, puntaje, grupo=(), k=10, mayores=True, derivadas=None, **agregaciones):
+        self.clave = list(clave)
+        self.grupo = list(grupo)
+        self.puntaje = puntaje
+        self.k = k
+        self.mayores = mayores
+        self.derivadas = derivadas or {}
+        self.agregaciones = agregaciones
+        self.acumulador = AcumuladorGrupos(self.grupo + self.clave, **agregaciones)
+
+    def sumar(self, parcial):
+        self.acumulador.sumar(parcial)
+
+    def totales(self):
+        return self.acumulador.resultado()
+
+    def resultado(self, k=None):
+        totales = self.totales()
+        for nombre, funcion in self.derivadas.items():
+            totales[nombre] = funcion(totales)
+        return seleccionar(totales, self.grupo, self.puntaje, k or self.k, self.mayores)
+
+
+def _margen(totales):
+    return (totales['Ganancia'] / totales['Ventas'] * 100).round(1)
+
+
+def crear_rankings(k=10):
+    return {
+        'vendedores': Ranking(
+            ['IDVendedor'], 'Ganancia', grupo=['Region', 'AñoMes'], k=k,
+            Ganancia=('Ganancia', 'sum'), Ventas=('TotalVenta', 'sum'),
+        ),
+        'clientes': Ranking(
+            ['IDCliente'], 'Gasto', k=k,
+            Gasto=('TotalVenta', 'sum'), Compras=('TotalVenta', 'count'),
+        ),
+        'productos': Ranking(
+            ['Producto', 'Categoria'], 'Margen_%', k=k, mayores=False,
+            derivadas={'Margen_%': _margen},
+            Ventas=('TotalVenta', 'sum'), Ganancia=('Ganancia', 'sum'),
+        ),
+    }
+
+
+def con_nombres(top, dimensiones, tabla, clave):
+    """Agrega Nombre y Apellido de `tabla` junto a la columna de IDs `clave`."""
+    personas = dimensiones[tabla].set_index('ID')
+    ids = top[clave]
+    posicion = top.columns.get_loc(clave) + 1
+    top.insert(posicion, 'Nombre', ids.map(personas['Nombre']))
+    top.insert(posicion + 1, 'Apellido', ids.map(personas['Apellido']))
+    return top
+
+
+# ================================
+# ACTUALIZACIÓN INCREMENTAL
+# ================================
+def _agrupar(engine, rankings, filtros):
+    # Cada ranking es un GROUP BY en la base, leído por lotes
+    for ranking in rankings.values():
+        consulta, parametros = construir_consulta(ranking.grupo + ranking.clave, filtros, **ranking.agregaciones)
+        for parcial in pd.read_sql(consulta, engine, params=parametros, chunksize=LOTE_RANKINGS):
+            for nombre, (columna, funcion) in ranking.agregaciones.items():
+                if funcion == 'sum':
+                    parcial[nombre] = parcial[nombre].astype('float64')
+            parcial = parcial.dropna(subset=ranking.grupo + ranking.clave)
+            ranking.sumar(parcial.set_index(ranking.grupo + ranking.clave))
+
+
+def _leer_totales(rankings):
+    # Los objetos salen siempre de crear_rankings(); del disco solo vienen los totales
+    for nombre, ranking in rankings.items():
+        ranking.sumar(pd.read_parquet(os.path.join(RUTA_RANKINGS, f'{nombre}.parquet')))
+
+
+def _guardar_totales(rankings, huella):
+    temporal = RUTA_RANKINGS + '.tmp'
+    shutil.rmtree(temporal, ignore_errors=True)
+    os.makedirs(temporal)
+    for nombre, ranking in rankings.items():
+        ranking.totales().to_parquet(os.path.join(temporal, f'{nombre}.parquet'))
+    # La meta se borra antes de cambiar los totales y se escribe al final: un
+    # corte a mitad de camino deja la caché sin meta y fuerza una recarga
+    if os.path.exists(RUTA_META_RANKINGS):
+        os.remove(RUTA_META_RANKINGS)
+    shutil.rmtree(RUTA_RANKINGS, ignore_errors=True)
+    os.replace(temporal, RUTA_RANKINGS)
+    with open(RUTA_META_RANKINGS, 'w', encoding='utf-8') as f:
+        json.dump(huella, f, indent=2)
+
+
+def actualizar_rankings(engine, completo=False):
+    """Rankings al día: suma solo las ventas nuevas desde la última corrida."""
+    huella = huella_ventas(engine)
+    meta = None
+    if not completo and os.path.exists(RUTA_META_RANKINGS) and os.path.isdir(RUTA_RANKINGS):
+        with open(RUTA_META_RANKINGS, encoding='utf-8') as f:
+            meta = json.load(f)
+
+    rankings = crear_rankings()
+    if meta is not None and meta['max_id'] is not None and (huella['max_id'] or 0) >= meta['max_id']:
+        nuevas_filas = 0
+        if meta != huella:
+            with engine.connect() as conexion:
+                nuevas_filas = conexion.execute(
+                    text("SELECT COUNT(*) FROM ventas WHERE ID > :marca AND ID <= :hasta"),
+                    {'marca': meta['max_id'], 'hasta': huella['max_id']}
+                ).scalar()
+        # Igual que el cubo: si solo hubo inserciones con IDs nuevos, basta con sumarlas
+        if meta['filas'] + nuevas_filas == huella['filas']:
+            _leer_totales(rankings)
+            if meta == huella:
+                return rankings
+            _agrupar(engine, rankings, {'ID': ('BETWEEN', (meta['max_id'] + 1, huella['max_id']))})
+            _guardar_totales(rankings, huella)
+            return rankings
+        rankings = crear_rankings()
+
+    if huella['max_id'] is not None:
+        _agrupar(engine, rankings, {'ID': ('<=', huella['max_id'])})
+    _guardar_totales(rankings, huella)
+    return rankings
+
+
+if __name__ == '__main__':
+    # Uso: python scripts/rankings.py [--k 10] [--mes 202412] [--completo]
+    import argparse
+    import time
+    from datos import crear_engine
+
+    parser = argparse.ArgumentParser(description='Rankings top-K de vendedores, clientes y productos')
+    parser.add_argument('--k', type=int, default=10, help='Posiciones por ranking')
+    parser.add_argument('--mes', type=int, help='Mes (AAAAMM) del ranking de vendedores; por defecto, el último')
+    parser.add_argument('--completo', action='store_true', help='Reconstruye los totales desde cero')
+    args = parser.parse_args()
+
+    engine = crear_engine()
+    inicio = time.perf_counter()
+    rankings = actualizar_rankings(engine, completo=args.completo)
+    print(f"✅ Rankings actualizados en {time.perf_counter() - inicio:.2f} s")
+    dimensiones = cargar_dimensiones(engine)
+    engine.dispose()
+
+    vendedores = con_nombres(rankings['vendedores'].resultado(args.k), dimensiones, 'vendedores', 'IDVendedor')
+    mes = args.mes or (int(vendedores.index.get_level_values('AñoMes').max()) if len(vendedores) else None)
+    print(f"\n=== TOP {args.k} VENDEDORES POR GANANCIA, {mes} ===")
+    if mes is not None:
+        print(vendedores.xs(mes, level='AñoMes').round(2))
+
+    print(f"\n=== TOP {args.k} CLIENTES POR GASTO ===")
+    print(con_nombres(rankings['clientes'].resultado(args.k), dimensiones, 'clientes', 'IDCliente').round(2))
+
+    print(f"\n=== {args.k} PRODUCTOS CON MENOR MARGEN ===")
+    print(rankings['productos'].resultado(args.k).round(2))
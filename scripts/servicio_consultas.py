@@ -0,0 +1,337 @@
+from collections import OrderedDict, deque
+import hashlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+from datos import RUTA_CACHE, crear_engine, cargar_ventas, enriquecer_fechas, huella_ventas
+from agregaciones import agregar_pandas
+from cubo import GRANO, MEDIDAS_CUBO, actualizar_cubo, resumir_cubo
+
+# ================================
+# SERVICIO LOCAL DE AGREGADOS
+# ================================
+# Responde preguntas chicas ("ventas por región en 2024") sin volver a correr
+# el JOIN completo. Cada consulta usa la misma especificación que `agregar`:
+#   GET /agregado?por=Region,Categoria&Año=2024&Region=Norte,Sur&medidas=TotalVenta,Ganancia
+# Si todas las dimensiones están en el grano del cubo se responde desde el
+# cubo mensual; si no (Vendedor, o min/max), desde la tabla de hechos en
+# memoria, ordenada por AñoMes para que los filtros de fecha sean un rango.
+# Las respuestas quedan en una caché LRU en memoria, válida mientras la huella
+# de `ventas` no cambie.
+DIMENSIONES_SERVICIO = ['Año', 'Mes', 'Region', 'Categoria', 'Producto', 'Vendedor']
+MEDIDAS_SERVICIO = ['TotalVenta', 'TotalCosto', 'Ganancia', 'Cantidad']
+FUNCIONES_SERVICIO = {'sum', 'count', 'mean', 'min', 'max'}
+COLUMNAS_HECHOS = ['Fecha', 'Cantidad', 'TotalVenta', 'TotalCosto', 'Ganancia',
+                   'Vendedor', 'Region', 'Producto', 'Categoria']
+
+MAX_RESPUESTAS = int(os.getenv('SERVICIO_RESPUESTAS', '1024'))
+# Cada cuántos segundos se revisa si `ventas` cambió
+VIGENCIA_DATOS = float(os.getenv('SERVICIO_VIGENCIA', '5'))
+MAX_LATENCIAS = 10_000
+
+
+class ConsultaInvalida(ValueError):
+    pass
+
+
+def leer_parametros(parametros):
+    """Traduce los parámetros de la URL a (por, filtros, agregaciones)."""
+    parametros = {clave: ','.join(valores) for clave, valores in parametros.items()}
+    por = [d for d in parametros.pop('por', '').split(',') if d]
+    medidas = [m for m in parametros.pop('medidas', 'TotalVenta').split(',') if m]
+
+    for dimension in por:
+        if dimension not in DIMENSIONES_SERVICIO:
+            raise ConsultaInvalida(f"Dimensión desconocida: {dimension!r}")
+
+    filtros = {}
+    for columna, texto in parametros.items():
+        if columna not in DIMENSIONES_SERVICIO:
+            raise ConsultaInvalida(f"Filtro desconocido: {columna!r}")
+        valores = texto.split(',')
+        if columna in ('Año', 'Mes'):
+            try:
+                valores = [int(valor) for valor in valores]
+            except ValueError:
+                raise ConsultaInvalida(f"{columna} debe ser entero: {texto!r}") from None
+        filtros[columna] = valores[0] if len(valores) == 1 else valores
+
+    agregaciones = {}
+    for medida in medidas:
+        # 'Transacciones' es el conteo; 'Ganancia:mean' pide otra función
+        if medida == 'Transacciones':
+            agregaciones['Transacciones'] = ('TotalVenta', 'count')
+            continue
+        columna, _, funcion = medida.partition(':')
+        funcion = funcion or 'sum'
+        if columna not in MEDIDAS_SERVICIO or funcion not in FUNCIONES_SERVICIO:
+            raise ConsultaInvalida(f"Medida no soportada: {medida!r}")
+        agregaciones[columna if funcion == 'sum' else f'{columna}_{funcion}'] = (columna, funcion)
+    return por, filtros, agregaciones
+
+
+# ================================
+# TABLA DE HECHOS INDEXADA
+# ================================
+class AlmacenIndexado:
+    """Tabla de hechos en memoria ordenada por AñoMes.
+
+    Un filtro de Año se resuelve con dos búsquedas binarias sobre AñoMes y
+    un corte contiguo; los demás filtros se aplican solo sobre ese corte, y
+    las dimensiones de texto comparan códigos de categoría.
+    """
+
+    def __init__(self, df):
+        df = enriquecer_fechas(df)
+        self.df = df.sort_values('AñoMes', kind='stable').reset_index(drop=True)
+        # Las fechas nulas quedan al final del orden; como entero máximo siguen ordenadas
+        self.meses = self.df['AñoMes'].to_numpy(dtype='int64', na_value=np.iinfo('int64').max)
+
+    def filtrar(self, filtros):
+        inicio, fin = 0, len(self.df)
+        if 'Año' in filtros:
+            años = np.atleast_1d(filtros['Año'])
+            inicio = np.searchsorted(self.meses, años.min() * 100 + 1, side='left')
+            fin = np.searchsorted(self.meses, años.max() * 100 + 12, side='right')
+        corte = self.df.iloc[inicio:fin]
+        mascara = np.ones(len(corte), dtype=bool)
+        for columna, valor in filtros.items():
+            valores = valor if isinstance(valor, list) else [valor]
+            mascara &= corte[columna].isin(valores).to_numpy()
+        return corte[mascara]
+
+    def resumir(self, por, filtros, **agregaciones):
+        return agregar_pandas(self.filtrar(filtros), por, **agregaciones)
+
+
+# ================================
+# SERVICIO
+# ================================
+class ServicioAgregados:
+    """Resuelve consultas sobre el cubo o la tabla indexada, con caché de respuestas."""
+
+    def __init__(self, engine, ruta_cache=None):
+        self.engine = engine
+        # Carpeta del cubo, el almacén y las dimensiones; None usa las del proyecto
+        self.ruta_cache = ruta_cache
+        # `_candado` solo protege el estado compartido y nunca se retiene durante
+        # una consulta a la base; cada reconstrucción tiene su propio candado para
+        # que dos hilos no escriban los mismos archivos de caché a la vez
+        self._candado = threading.Lock()
+        self._construcciones = {'_cubo': threading.Lock(), '_almacen': threading.Lock()}
+        self._cubo = None
+        self._almacen = None
+        self.huella = None
+        self._revisada = float('-inf')
+        self.respuestas = OrderedDict()
+        self.latencias = deque(maxlen=MAX_LATENCIAS)
+        self.consultas = 0
+        self.aciertos = 0
+
+    def _al_dia(self):
+        # Si `ventas` cambió se descartan el cubo, la tabla y las respuestas
+        with self._candado:
+            if time.monotonic() - self._revisada < VIGENCIA_DATOS:
+                return
+            # Marcada antes de consultar: los demás hilos siguen con la huella
+            # vigente en lugar de repetir la misma consulta
+            self._revisada = time.monotonic()
+        huella = huella_ventas(self.engine)
+        with self._candado:
+            if huella != self.huella:
+                self.huella = huella
+                self._cubo = None
+                self._almacen = None
+                self.respuestas.clear()
+
+    def _construido(self, atributo, construir):
+        with self._candado:
+            valor = getattr(self, atributo)
+        if valor is not None:
+            return valor
+        with self._construcciones[atributo]:
+            with self._candado:
+                # Otro hilo pudo terminarlo mientras se esperaba el turno
+                valor, huella = getattr(self, atributo), self.huella
+            if valor is not None:
+                return valor
+            valor = construir()
+            with self._candado:
+                # Si la huella cambió mientras tanto, _al_dia ya lo descartó
+                if self.huella == huella:
+                    setattr(self, atributo, valor)
+            return valor
+
+    def cubo(self):
+        return self._construido('_cubo', lambda: actualizar_cubo(self.engine, ruta_cache=self.ruta_cache))
+
+    def almacen(self):
+        return self._construido('_almacen', lambda: AlmacenIndexado(
+            cargar_ventas(self.engine, columnas=COLUMNAS_HECHOS, ruta_cache=self.ruta_cache)))
+
+    @staticmethod
+    def _en_cubo(por, filtros, agregaciones):
+        dimensiones = set(por) | set(filtros)
+        return dimensiones <= set(GRANO) and all(
+            funcion == 'count' or (funcion in ('sum', 'mean') and columna in MEDIDAS_CUBO)
+            for columna, funcion in agregaciones.values()
+        )
+
+    def consultar(self, por, filtros, agregaciones):
+        """DataFrame con el resultado y la fuente que lo resolvió."""
+        if self._en_cubo(por, filtros, agregaciones):
+            return resumir_cubo(self.cubo(), por, filtros, **agregaciones), 'cubo'
+        return self.almacen().resumir(por, filtros, **agregaciones), 'hechos'
+
+    def responder(self, parametros):
+        """(código HTTP, cuerpo JSON en bytes) para los parámetros de /agregado."""
+        inicio = time.perf_counter()
+        try:
+            por, filtros, agregaciones = leer_parametros(parametros)
+        except ConsultaInvalida as error:
+            return 400, json.dumps({'error': str(error)}, ensure_ascii=False).encode('utf-8')
+
+        self._al_dia()
+        clave = json.dumps([por, filtros, agregaciones], sort_keys=True, ensure_ascii=False)
+        with self._candado:
+            # La huella con la que se calcula: si cambia a mitad de camino, la
+            # respuesta no entra a la caché nueva
+            huella = self.huella
+            cuerpo = self.respuestas.get(clave)
+            if cuerpo is not None:
+                self.respuestas.move_to_end(clave)
+
+        if cuerpo is None:
+            resultado, fuente = self.consultar(por, filtros, agregaciones)
+            if por:
+                resultado = resultado.reset_index()
+            cuerpo = json.dumps({
+                'fuente': fuente,
+                'huella': huella,
+                'filas': json.loads(resultado.round(2).to_json(orient='records', force_ascii=False)),
+            }, ensure_ascii=False).encode('utf-8')
+            with self._candado:
+                if self.huella == huella:
+                    self.respuestas[clave] = cuerpo
+                    while len(self.respuestas) > MAX_RESPUESTAS:
+                        self.respuestas.popitem(last=False)
+                en_cache = False
+        else:
+            en_cache = True
+
+        with self._candado:
+            self.consultas += 1
+            self.aciertos += en_cache
+            self.latencias.append(time.perf_counter() - inicio)
+        return 200, cuerpo
+
+    def metricas(self):
+        with self._candado:
+            latencias = np.asarray(self.latencias)
+            return {
+                'consultas': self.consultas,
+                'aciertos_cache': self.aciertos,
+                'tasa_aciertos': self.aciertos / self.consultas if self.consultas else None,
+                'respuestas_en_cache': len(self.respuestas),
+                'latencia_ms': None if latencias.size == 0 else {
+                    'p50': round(float(np.percentile(latencias, 50)) * 1000, 3),
+                    'p99': round(float(np.percentile(latencias, 99)) * 1000, 3),
+                    'max': round(float(latencias.max()) * 1000, 3),
+                },
+                'huella': self.huella,
+            }
+
+
+def ruta_cache_engine(engine):
+    """cache/servicio/<url de engine>: carpeta para el cubo, el almacén y las dimensiones.
+
+    Con otra base (--base) el servicio no debe pisar las cachés del proyecto,
+    que corresponden a la base de MySQL.
+    """
+    url = engine.url.render_as_string(hide_password=True)
+    ruta = os.path.join(RUTA_CACHE, 'servicio', hashlib.sha1(url.encode('utf-8')).hexdigest()[:12])
+    os.makedirs(ruta, exist_ok=True)
+    return ruta
+
+
+# ================================
+# HTTP
+# ================================
+class _Manejador(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlparse(self.path)
+        servicio = self.server.servicio
+        if url.path == '/agregado':
+            estado, cuerpo = servicio.responder(parse_qs(url.query))
+        elif url.path == '/metricas':
+            estado, cuerpo = 200, json.dumps(servicio.metricas(), ensure_ascii=False).encode('utf-8')
+        elif url.path == '/salud':
+            estado, cuerpo = 200, b'{"estado": "ok"}'
+        else:
+            estado, cuerpo = 404, b'{"error": "ruta desconocida"}'
+        self.send_response(estado)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, formato, *args):
+        # Sin una línea por consulta; la latencia se ve en /metricas
+        pass
+
+
+class _Servidor(ThreadingHTTPServer):
+    daemon_threads = True
+    # Con la cola por defecto (5) las conexiones simultáneas que no entran
+    # esperan el reintento de TCP, de un segundo
+    request_queue_size = 128
+
+
+def crear_servidor(servicio, host='127.0.0.1', puerto=8765):
+    """Servidor HTTP con un hilo por conexión; puerto=0 elige uno libre."""
+    servidor = _Servidor((host, puerto), _Manejador)
+    servidor.servicio = servicio
+    return servidor
+
+
+if __name__ == '__main__':
+    # Uso: python scripts/servicio_consultas.py [--puerto 8765] [--base cache/ventas.sqlite]
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Servicio HTTP local de agregados de ventas')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--puerto', type=int, default=8765)
+    parser.add_argument('--base', help='Archivo SQLite local (por ejemplo, el snapshot de embebida.py) en lugar de MySQL')
+    parser.add_argument('--precargar', action='store_true', help='Carga el cubo y la tabla de hechos al iniciar')
+    args = parser.parse_args()
+
+    if args.base:
+        from embebida import engine_sqlite
+        engine = engine_sqlite(args.base)
+        ruta_cache = ruta_cache_engine(engine)
+    else:
+        engine = crear_engine()
+        ruta_cache = None
+
+    servicio = ServicioAgregados(engine, ruta_cache)
+    if args.precargar:
+        inicio = time.perf_counter()
+        servicio._al_dia()
+        servicio.cubo()
+        servicio.almacen()
+        print(f"✅ Cubo y tabla de hechos cargados en {time.perf_counter() - inicio:.2f} s")
+
+    servidor = crear_servidor(servicio, args.host, args.puerto)
+    print(f"✅ Servicio en http://{args.host}:{servidor.server_port}/agregado?por=Region&Año=2024")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    servidor.server_close()
+    engine.dispose()